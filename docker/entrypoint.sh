@@ -59,6 +59,20 @@ init_database() {
         ln -sf /app/public/news.db /usr/share/nginx/html/news.db
         log_success "创建数据库软链接"
     fi
+
+    # 静态分片目录软链接
+    if [ ! -L "/usr/share/nginx/html/shards" ]; then
+        mkdir -p /app/public/shards
+        ln -sfn /app/public/shards /usr/share/nginx/html/shards
+        log_success "创建静态分片软链接"
+    fi
+
+    # 新闻图片缓存目录软链接
+    if [ ! -L "/usr/share/nginx/html/images" ]; then
+        mkdir -p /app/public/images
+        ln -sfn /app/public/images /usr/share/nginx/html/images
+        log_success "创建图片缓存软链接"
+    fi
 }
 
 start_cron() {
@@ -89,13 +103,16 @@ start_nginx() {
     fi
 }
 
-run_initial_scrape() {
-    log_info "运行初始新闻抓取..."
+start_scraper_daemon() {
+    log_info "启动新闻抓取守护进程..."
     
+    # 守护进程启动时立即抓取一次，之后按 settings.json 中的 scheduleInterval 定时抓取
     cd /app/scripts
-    python3 news_scraper.py > /app/logs/initial_scrape.log 2>&1 &
+    /app/venv/bin/python news_scraper.py --daemon >> /app/logs/scraper.log 2>&1 &
+    SCRAPER_PID=$!
+    cd /
     
-    log_success "初始新闻抓取已在后台启动"
+    log_success "新闻抓取守护进程已启动 (PID: $SCRAPER_PID)"
 }
 
 show_status() {
@@ -106,7 +123,7 @@ show_status() {
     echo "  📊 Web 服务: http://localhost (端口 80)"
     echo "  🗄️  数据库: /app/public/news.db"
     echo "  📝 日志目录: /app/logs"
-    echo "  ⏰ 定时任务: 每30分钟抓取新闻"
+    echo "  ⏰ 新闻抓取: 守护进程按 settings.json 中的 scheduleInterval 定时抓取"
     echo
     log_info "容器健康检查: curl -f http://localhost/"
     echo
@@ -116,6 +133,12 @@ show_status() {
 handle_signal() {
     log_info "接收到停止信号，正在优雅关闭..."
     
+    # 通知抓取守护进程完成当前抓取后退出
+    if [ -n "$SCRAPER_PID" ]; then
+        kill -TERM "$SCRAPER_PID" 2>/dev/null || true
+        wait "$SCRAPER_PID" 2>/dev/null || true
+    fi
+    
     # 停止 nginx
     nginx -s quit
     
@@ -141,15 +164,16 @@ main() {
     start_cron
     start_nginx
     
-    # 运行初始抓取
-    run_initial_scrape
+    # 启动抓取守护进程
+    start_scraper_daemon
     
     # 显示状态
     show_status
     
-    # 启动 Nginx（前台运行）
+    # 启动 Nginx（不使用exec，保留信号处理以便关闭抓取守护进程）
     log_info "启动 Nginx 前台进程..."
-    exec nginx -g "daemon off;"
+    nginx -g "daemon off;" &
+    wait $!
 }
 
 # 执行主函数
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+端到端离线基准测试
+
+启动本地模拟API提供商服务器（benchmarks/mock_provider.py），不访问任何真实API：
+    scrape  以 10/100/1000 个关键词驱动 NewsScraper.run 完整抓取和保存
+    save    预先写入 1k~1M 行数据，再用 NewsStorage.save_news 保存一批新闻（一半更新、一半新增）
+    import  在新的解释器中导入 news_scraper 并创建 NewsAPI（加载选用的提供商），重复多次取中位数，
+            衡量定时任务的冷启动时间
+每个场景在独立子进程中运行，结果（耗时、条数/秒、峰值内存、存储大小）按行输出为JSON，便于对比不同版本。
+使用方法：
+    python benchmarks/bench_end_to_end.py [--keywords 10,100,1000] [--rows 1000,10000,100000,1000000]
+        [--providers brave,bing,newsapi] [--latency 50] [--error-rate 0.01] [--import-runs 20]
+        [--output results.jsonl]
+"""
+
+import os
+import sys
+import json
+import statistics
+import platform
+import argparse
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MOCK_SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mock_provider.py")
+PRELOAD_BATCH_SIZE = 50000
+
+
+def peak_rss_mb() -> Optional[float]:
+    """当前进程的峰值内存（MB），不支持的平台返回None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux单位为KB，macOS为字节
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def storage_size_mb(settings: Dict[str, Any]) -> float:
+    """存储文件总大小（MB），包括SQLite的检索数据库"""
+    paths = [settings["dbPath"], os.path.join(os.path.dirname(settings["dbPath"]), "news_search.db"),
+             settings["jsonPath"], settings["jsonlPath"], settings["jsonlPath"] + ".idx"]
+    return round(sum(os.path.getsize(path) for path in paths if os.path.exists(path)) / 1024 / 1024, 2)
+
+
+def write_settings(tmp_dir: str, args: argparse.Namespace, extra: Dict[str, Any]) -> Dict[str, Any]:
+    """生成测试用的设置文件"""
+    providers = args.providers.split(",")
+    settings = {
+        "keywords": "",
+        "apiProvider": providers[0],
+        "providers": providers,
+        "apiKeys": {provider: "benchmark" for provider in providers},
+        "apiUrls": {provider: f"http://127.0.0.1:{args.port}/{provider}" for provider in providers},
+        # 不限速，测量抓取器本身的吞吐量
+        "rateLimits": {provider: 0 for provider in providers},
+        "storageType": args.storage,
+        "dbPath": os.path.join(tmp_dir, "news.db"),
+        "jsonPath": os.path.join(tmp_dir, "news.json"),
+        "jsonlPath": os.path.join(tmp_dir, "news.jsonl"),
+        "maxResults": args.items,
+        "concurrency": args.concurrency,
+        "retryBackoff": 0.05,
+        "cache": False,
+        "incremental": False,
+        "queryPacking": not args.no_query_packing,
+        "export": False
+    }
+    settings.update(extra)
+    with open(os.path.join(tmp_dir, "settings.json"), 'w', encoding='utf-8') as f:
+        json.dump(settings, f, ensure_ascii=False)
+    return settings
+
+
+def make_items(start: int, count: int, content_size: int) -> List[Dict[str, Any]]:
+    """生成待保存的新闻数据"""
+    return [
+        {
+            "title": f"基准测试新闻 #{i}",
+            "source": "基准测试",
+            "link": f"https://news.example.com/bench/{i}",
+            "publishedAt": datetime.fromtimestamp(1700000000 + i * 60).isoformat(),
+            "tags": ["AI", f"标签{i % 50}"],
+            "imageUrl": f"https://img.example.com/{i}.jpg",
+            "content": ("基准测试内容" * (content_size // 6 + 1))[:content_size]
+        }
+        for i in range(start, start + count)
+    ]
+
+
+def run_scrape(args: argparse.Namespace, tmp_dir: str) -> Dict[str, Any]:
+    """scrape场景：完整运行一次NewsScraper"""
+    from news_scraper import NewsScraper, NewsStorage, NewsSettings
+
+    keywords = [f"关键词{i}" for i in range(args.size)]
+    settings = write_settings(tmp_dir, args, {"keywords": ",".join(keywords)})
+    settings_file = os.path.join(tmp_dir, "settings.json")
+
+    scraper = NewsScraper(settings_file, use_cache=False)
+    start = time.perf_counter()
+    scraper.run()
+    wall = time.perf_counter() - start
+
+    fetched = sum(stats["items"] for stats in scraper.api.provider_stats.values())
+    requests_sent = sum(stats["requests"] for stats in scraper.api.request_stats.values())
+    storage = NewsStorage(NewsSettings(settings_file))
+    stored = sum(1 for _ in storage.iter_news())
+    storage.close()
+    return {
+        "keywords": args.size,
+        "requests": requests_sent,
+        "items_fetched": fetched,
+        "items_stored": stored,
+        "wall_s": round(wall, 3),
+        "items_per_s": round(fetched / wall, 1) if wall else None,
+        "peak_rss_mb": peak_rss_mb(),
+        "storage_mb": storage_size_mb(settings)
+    }
+
+
+def run_save(args: argparse.Namespace, tmp_dir: str) -> Dict[str, Any]:
+    """save场景：在已有数据上保存一批新闻"""
+    from news_scraper import NewsStorage, NewsSettings
+
+    settings = write_settings(tmp_dir, args, {})
+    storage = NewsStorage(NewsSettings(os.path.join(tmp_dir, "settings.json")))
+
+    start = time.perf_counter()
+    for offset in range(0, args.size, PRELOAD_BATCH_SIZE):
+        storage.save_news(make_items(offset, min(PRELOAD_BATCH_SIZE, args.size - offset), args.content_size))
+    preload = time.perf_counter() - start
+
+    # 一半更新已有新闻，一半新增
+    batch = make_items(args.size - args.batch // 2, args.batch, args.content_size)
+    start = time.perf_counter()
+    storage.save_news(batch)
+    wall = time.perf_counter() - start
+    storage.close()
+    return {
+        "rows": args.size,
+        "batch": args.batch,
+        "preload_s": round(preload, 1),
+        "wall_s": round(wall, 3),
+        "items_per_s": round(args.batch / wall, 1) if wall else None,
+        "peak_rss_mb": peak_rss_mb(),
+        "storage_mb": storage_size_mb(settings)
+    }
+
+
+def run_import(args: argparse.Namespace, tmp_dir: str) -> Dict[str, Any]:
+    """import场景：导入 news_scraper 并创建 NewsAPI 的耗时"""
+    modules_before = len(sys.modules)
+    start = time.perf_counter()
+    import news_scraper
+    imported = time.perf_counter() - start
+    import logging
+    logging.getLogger("news_scraper").setLevel(logging.ERROR)
+
+    write_settings(tmp_dir, args, {})
+    start = time.perf_counter()
+    api = news_scraper.NewsAPI(news_scraper.NewsSettings(os.path.join(tmp_dir, "settings.json")), use_cache=False)
+    created = time.perf_counter() - start
+    api.close()
+    return {
+        "import_ms": round(imported * 1000, 2),
+        "api_init_ms": round(created * 1000, 2),
+        "modules": len(sys.modules) - modules_before,
+        # 只有发送请求或启用对应功能时才需要的重量级依赖
+        "requests_loaded": "requests" in sys.modules,
+        "pil_loaded": "PIL" in sys.modules
+    }
+
+
+def summarize_imports(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """汇总多次import场景的结果"""
+    import_ms = [result["import_ms"] for result in results]
+    api_init_ms = [result["api_init_ms"] for result in results]
+    return {
+        "runs": len(results),
+        "import_ms_median": round(statistics.median(import_ms), 2),
+        "import_ms_min": min(import_ms),
+        "import_ms_max": max(import_ms),
+        "api_init_ms_median": round(statistics.median(api_init_ms), 2),
+        "modules": results[-1]["modules"],
+        "requests_loaded": results[-1]["requests_loaded"],
+        "pil_loaded": results[-1]["pil_loaded"]
+    }
+
+
+def run_scenario(args: argparse.Namespace) -> None:
+    """子进程入口：运行单个场景并输出JSON"""
+    sys.path.insert(0, SCRIPTS_DIR)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # news_scraper在导入时于当前目录创建日志文件
+        os.chdir(tmp_dir)
+        if args.scenario == "import":
+            result = run_import(args, tmp_dir)
+            os.chdir(SCRIPTS_DIR)
+            print(json.dumps(result, ensure_ascii=False))
+            return
+        import logging
+        import news_scraper  # noqa: F401
+        logging.getLogger("news_scraper").setLevel(logging.ERROR)
+        result = run_scrape(args, tmp_dir) if args.scenario == "scrape" else run_save(args, tmp_dir)
+        os.chdir(SCRIPTS_DIR)
+    print(json.dumps(result, ensure_ascii=False))
+
+
+def git_revision() -> Optional[str]:
+    """当前代码版本"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=SCRIPTS_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_child(args: argparse.Namespace, scenario: str, size: int, port: int) -> Dict[str, Any]:
+    """在子进程中运行单个场景，返回其输出的结果"""
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__),
+         "--providers", args.providers, "--storage", args.storage, "--concurrency", str(args.concurrency),
+         "--items", str(args.items), "--content-size", str(args.content_size), "--batch", str(args.batch),
+         "--scenario", scenario, "--size", str(size), "--port", str(port)]
+        + (["--no-query-packing"] if args.no_query_packing else []),
+        capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="端到端离线基准测试")
+    parser.add_argument("--keywords", default="10,100,1000", help="scrape场景的关键词数量（逗号分隔，空为跳过）")
+    parser.add_argument("--rows", default="1000,10000,100000,1000000", help="save场景的已有行数（逗号分隔，空为跳过）")
+    parser.add_argument("--providers", default="brave,bing,newsapi", help="模拟的API提供商（逗号分隔）")
+    parser.add_argument("--storage", default="sqlite", choices=["json", "jsonl", "sqlite"], help="存储类型")
+    parser.add_argument("--concurrency", type=int, default=8, help="并发抓取的线程数")
+    parser.add_argument("--items", type=int, default=20, help="每次请求返回的新闻条数")
+    parser.add_argument("--content-size", type=int, default=300, help="每条新闻内容的字符数")
+    parser.add_argument("--batch", type=int, default=1000, help="save场景每次保存的条数")
+    parser.add_argument("--latency", type=float, default=50, help="模拟接口的平均延迟（毫秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="模拟接口返回503的比例（0-1）")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="模拟智谱清言流式响应每段之间的间隔（毫秒）")
+    parser.add_argument("--no-query-packing", action="store_true", help="每个关键词单独请求，不合并为OR查询")
+    parser.add_argument("--import-runs", type=int, default=20, help="import场景的重复次数（0为跳过）")
+    parser.add_argument("--output", help="追加结果到指定的JSONL文件")
+    # 以下参数由主进程传给子进程
+    parser.add_argument("--scenario", choices=["scrape", "save", "import"], help=argparse.SUPPRESS)
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario:
+        run_scenario(args)
+        return
+
+    server = subprocess.Popen(
+        [sys.executable, MOCK_SERVER, "--latency", str(args.latency), "--error-rate", str(args.error_rate),
+         "--items", str(args.items), "--content-size", str(args.content_size), "--token-delay", str(args.token_delay)],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+    )
+    try:
+        port = int(server.stdout.readline())
+        meta = {
+            "version": git_revision(),
+            "python": platform.python_version(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "storage": args.storage,
+            "providers": args.providers,
+            "latency_ms": args.latency,
+            "error_rate": args.error_rate,
+            "query_packing": not args.no_query_packing
+        }
+        plan = [("import", args.import_runs)] if args.import_runs > 0 else []
+        plan += [("scrape", int(n)) for n in args.keywords.split(",") if n] + [("save", int(n)) for n in args.rows.split(",") if n]
+        for scenario, size in plan:
+            if scenario == "import":
+                # 每次在新的解释器中导入，取中位数
+                results = [run_child(args, scenario, 0, port) for _ in range(size)]
+                errors = [result for result in results if "error" in result]
+                result = errors[0] if errors else summarize_imports(results)
+            else:
+                result = run_child(args, scenario, size, port)
+            line = json.dumps({"scenario": scenario, **meta, **result}, ensure_ascii=False)
+            print(line, flush=True)
+            if args.output:
+                with open(args.output, 'a', encoding='utf-8') as f:
+                    f.write(line + "\n")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
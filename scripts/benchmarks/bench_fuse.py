@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+多源合并去重基准测试
+
+模拟多个提供商返回同一关键词的结果（部分链接相同、部分为改动少量文字的转载稿），
+对比原先的合并方式（每条新闻都对标题和全文计算SimHash，逐位累加）与 fuse_results
+（链接未命中时才计算指纹，只取标题和内容开头，按位展开后整数累加）的每条新闻耗时，
+并输出两者保留的条数和实际不同的新闻数（distinct），保留条数少于 distinct 说明误合并了不同的新闻。
+使用方法：
+    python benchmarks/bench_fuse.py [--providers 3,5] [--items 20,65] [--content-size 1600]
+"""
+
+import os
+import sys
+import json
+import random
+import hashlib
+import argparse
+import time
+from typing import List, Dict, Any, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from news_dedup import fuse_results, canonicalize_url, NearDuplicateIndex, _shingles  # noqa: E402
+
+WORDS = ["发布", "突破", "芯片", "模型", "训练", "推理", "开源", "融资", "监管", "应用", "算力", "数据",
+         "model", "release", "chip", "training", "open", "source", "funding", "policy"]
+
+
+def make_article(rng: random.Random, index: int, content_size: int) -> Dict[str, Any]:
+    """生成一篇新闻"""
+    content = ""
+    while len(content) < content_size:
+        content += rng.choice(WORDS) + rng.choice("，。 ")
+    return {
+        "title": "".join(rng.choice(WORDS) for _ in range(rng.randint(6, 12))) + f" #{index}",
+        "link": f"https://news.example.com/{index}",
+        "content": content[:content_size],
+        "tags": ["AI"]
+    }
+
+
+def make_results(providers: int, items: int, content_size: int, rng: random.Random) -> List[Tuple[str, List[Dict[str, Any]]]]:
+    """生成各提供商的结果：约三成与其他提供商链接相同（带跟踪参数），一成为转载稿（链接不同、文字略有改动）"""
+    pool = [make_article(rng, i, content_size) for i in range(items * providers)]
+    result_lists = []
+    for p in range(providers):
+        items_list = []
+        for i in range(items):
+            kind = rng.random()
+            if kind < 0.3:
+                article = dict(rng.choice(pool[:items]))
+                article["link"] += f"?utm_source=p{p}"
+            elif kind < 0.4:
+                article = dict(rng.choice(pool[:items]))
+                article["link"] = f"https://mirror{p}.example.com/{i}"
+                article["content"] = article["content"][:-10] + "（转载）"
+            else:
+                article = dict(pool[p * items + i])
+            items_list.append(article)
+        result_lists.append((f"provider{p}", items_list))
+    return result_lists
+
+
+def legacy_simhash(text: str) -> int:
+    """原先的SimHash：对每个n-gram逐位累加64次"""
+    weights = [0] * 64
+    for shingle in _shingles(text):
+        value = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def legacy_fuse(result_lists: List[Tuple[str, List[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+    """原先的合并方式：每条新闻都计算全文指纹，并重复切分一次n-gram判断是否为空"""
+    fused: List[Dict[str, Any]] = []
+    by_link: Dict[str, int] = {}
+    index = NearDuplicateIndex(3)
+    for _, items in result_lists:
+        for item in items:
+            link = canonicalize_url(item.get("link", ""))
+            position = by_link.get(link) if link else None
+            text = f"{item.get('title', '')} {item.get('content', '')}"
+            fingerprint = legacy_simhash(text) if _shingles(text) else None
+            if position is None and fingerprint is not None:
+                position = index.find(fingerprint)
+            if position is not None:
+                continue
+            position = len(fused)
+            if fingerprint is not None:
+                index.add(position, fingerprint)
+            fused.append(item)
+            if link:
+                by_link[link] = position
+    return fused
+
+
+def best_of(func, repeat: int = 3) -> float:
+    """多次运行取最短耗时（毫秒）"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="多源合并去重基准测试")
+    parser.add_argument("--providers", default="3,5", help="提供商数量（逗号分隔）")
+    parser.add_argument("--items", default="20,65", help="每个提供商返回的新闻条数（逗号分隔）")
+    parser.add_argument("--content-size", type=int, default=1600, help="每条新闻内容的字符数")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    for provider_count in [int(n) for n in args.providers.split(",") if n]:
+        for item_count in [int(n) for n in args.items.split(",") if n]:
+            result_lists = make_results(provider_count, item_count, args.content_size, rng)
+            total = provider_count * item_count
+            legacy_ms = best_of(lambda: legacy_fuse(result_lists))
+            fuse_ms = best_of(lambda: fuse_results(result_lists))
+            print(json.dumps({
+                "providers": provider_count,
+                "items_per_provider": item_count,
+                "content_size": args.content_size,
+                # 转载稿与原稿标题相同，标题数即实际不同的新闻数
+                "distinct": len({item["title"] for _, items in result_lists for item in items}),
+                "legacy_kept": len(legacy_fuse(result_lists)),
+                "kept": len(fuse_results(result_lists)[0]),
+                "legacy_ms_per_item": round(legacy_ms / total, 3),
+                "ms_per_item": round(fuse_ms / total, 3),
+                "speedup": round(legacy_ms / fuse_ms, 1) if fuse_ms else None
+            }, ensure_ascii=False), flush=True)
+
+
+if __name__ == "__main__":
+    main()
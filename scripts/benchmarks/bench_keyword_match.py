@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+多关键词匹配基准测试
+
+对比聚合数据头条原先的逐关键词子串扫描（每个关键词扫描一遍全部标题，共 N×M 次）
+与 KeywordMatcher 一次扫描匹配全部关键词（含构建自动机的时间）的耗时，并核对两者的匹配结果一致。
+使用方法：
+    python benchmarks/bench_keyword_match.py [--keywords 100,300,1000] [--titles 30,500]
+"""
+
+import os
+import sys
+import json
+import random
+import argparse
+import time
+from typing import List, Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from news_match import KeywordMatcher  # noqa: E402
+
+WORDS = ["发布", "突破", "芯片", "模型", "训练", "推理", "开源", "融资", "监管", "应用", "算力", "数据",
+         "model", "release", "chip", "training", "open", "source", "funding", "policy"]
+
+
+def make_keywords(count: int, rng: random.Random) -> List[str]:
+    """生成关键词：单个词、两个词的组合和不会出现的词"""
+    keywords = list(WORDS)
+    while len(keywords) < count:
+        kind = rng.random()
+        if kind < 0.6:
+            keywords.append(rng.choice(WORDS) + rng.choice(WORDS))
+        else:
+            keywords.append(f"关键词{len(keywords)}")
+    return list(dict.fromkeys(keywords))[:count]
+
+
+def make_titles(count: int, rng: random.Random) -> List[str]:
+    """生成标题，长度与头条新闻标题相近"""
+    return ["".join(rng.choice(WORDS) for _ in range(rng.randint(4, 10))) + f" #{i}" for i in range(count)]
+
+
+def naive_match(keywords: List[str], titles: List[str]) -> Dict[int, List[str]]:
+    """原先的方式：每个关键词扫描一遍全部标题"""
+    matched: Dict[int, List[str]] = {}
+    for keyword in keywords:
+        for i, title in enumerate(titles):
+            if keyword.lower() in title.lower():
+                matched.setdefault(i, []).append(keyword)
+    return matched
+
+
+def matcher_match(keywords: List[str], titles: List[str]) -> Dict[int, List[str]]:
+    """构建自动机后一次扫描每个标题"""
+    matcher = KeywordMatcher(keywords)
+    matched: Dict[int, List[str]] = {}
+    for i, title in enumerate(titles):
+        found = matcher.match(title)
+        if found:
+            matched[i] = found
+    return matched
+
+
+def best_of(func, repeat: int = 5) -> float:
+    """多次运行取最短耗时（毫秒）"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return round(min(timings) * 1000, 2)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="多关键词匹配基准测试")
+    parser.add_argument("--keywords", default="100,300,1000", help="关键词数量（逗号分隔）")
+    parser.add_argument("--titles", default="30,500", help="头条标题数量（逗号分隔）")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    for keyword_count in [int(n) for n in args.keywords.split(",") if n]:
+        keywords = make_keywords(keyword_count, rng)
+        for title_count in [int(n) for n in args.titles.split(",") if n]:
+            titles = make_titles(title_count, rng)
+            assert naive_match(keywords, titles) == matcher_match(keywords, titles)
+            naive_ms = best_of(lambda: naive_match(keywords, titles))
+            matcher_ms = best_of(lambda: matcher_match(keywords, titles))
+            print(json.dumps({
+                "keywords": keyword_count,
+                "titles": title_count,
+                "naive_ms": naive_ms,
+                "matcher_ms": matcher_ms,
+                "build_ms": best_of(lambda: KeywordMatcher(keywords)),
+                "speedup": round(naive_ms / matcher_ms, 1) if matcher_ms else None
+            }, ensure_ascii=False), flush=True)
+
+
+if __name__ == "__main__":
+    main()
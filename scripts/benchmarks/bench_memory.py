@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+存储内存基准测试
+
+测量在已有 1k~1M 行数据的情况下，用 NewsStorage.save_news 保存一批新闻（一半更新、一半新增）
+以及用 iter_news 遍历全部新闻时的峰值内存。预先写入数据在单独的子进程中完成，
+测量在新的子进程中进行，baseline_rss_mb 为导入模块后的内存，peak_rss_mb 为操作完成后的峰值内存。
+--scripts-dir 可指向其他版本的 scripts 目录（例如 git worktree），便于对比修改前后的内存占用。
+使用方法：
+    python benchmarks/bench_memory.py [--storage json,sqlite] [--rows 10000,100000,500000]
+        [--batch 1000] [--scripts-dir ../other/scripts] [--output results.jsonl]
+"""
+
+import os
+import sys
+import json
+import platform
+import argparse
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PRELOAD_BATCH_SIZE = 50000
+
+
+def peak_rss_mb() -> Optional[float]:
+    """当前进程的峰值内存（MB），不支持的平台返回None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux单位为KB，macOS为字节
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def make_items(start: int, count: int, content_size: int) -> List[Dict[str, Any]]:
+    """生成待保存的新闻数据，来源和标签取值有限，与真实数据的重复程度相近"""
+    return [
+        {
+            "title": f"基准测试新闻 #{i}",
+            "source": f"来源{i % 20}",
+            "link": f"https://news.example.com/bench/{i}",
+            "publishedAt": datetime.fromtimestamp(1700000000 + i * 60).isoformat(),
+            "tags": ["AI", f"标签{i % 50}"],
+            "imageUrl": f"https://img.example.com/{i}.jpg",
+            "content": ("基准测试内容" * (content_size // 6 + 1))[:content_size]
+        }
+        for i in range(start, start + count)
+    ]
+
+
+def write_settings(tmp_dir: str, storage: str) -> str:
+    """生成测试用的设置文件"""
+    settings_file = os.path.join(tmp_dir, "settings.json")
+    with open(settings_file, 'w', encoding='utf-8') as f:
+        json.dump({
+            "storageType": storage,
+            "dbPath": os.path.join(tmp_dir, "news.db"),
+            "jsonPath": os.path.join(tmp_dir, "news.json"),
+            "jsonlPath": os.path.join(tmp_dir, "news.jsonl")
+        }, f)
+    return settings_file
+
+
+def run_phase(args: argparse.Namespace) -> None:
+    """子进程入口：预先写入数据，或测量一次保存/遍历的峰值内存"""
+    sys.path.insert(0, args.scripts_dir)
+    # news_scraper在导入时于当前目录创建日志文件
+    os.chdir(args.data_dir)
+    import logging
+    from news_scraper import NewsStorage, NewsSettings
+    logging.getLogger("news_scraper").setLevel(logging.ERROR)
+
+    storage = NewsStorage(NewsSettings(write_settings(args.data_dir, args.storage)))
+    if args.phase == "preload":
+        for offset in range(0, args.size, PRELOAD_BATCH_SIZE):
+            storage.save_news(make_items(offset, min(PRELOAD_BATCH_SIZE, args.size - offset), args.content_size))
+        storage.close()
+        return
+
+    if args.phase == "save":
+        # 一半更新已有新闻，一半新增
+        batch = make_items(args.size - args.batch // 2, args.batch, args.content_size)
+        baseline = peak_rss_mb()
+        start = time.perf_counter()
+        ok = storage.save_news(batch)
+        count = len(batch)
+    else:
+        baseline = peak_rss_mb()
+        start = time.perf_counter()
+        count = sum(1 for _ in storage.iter_news())
+        ok = count > 0
+    wall = time.perf_counter() - start
+    storage.close()
+    print(json.dumps({
+        "ok": ok,
+        "items": count,
+        "wall_s": round(wall, 3),
+        "baseline_rss_mb": baseline,
+        "peak_rss_mb": peak_rss_mb()
+    }))
+
+
+def git_revision(path: str) -> Optional[str]:
+    """被测代码的版本"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=path, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="存储内存基准测试")
+    parser.add_argument("--storage", default="json,sqlite", help="存储类型（逗号分隔）")
+    parser.add_argument("--rows", default="10000,100000,500000", help="已有行数（逗号分隔）")
+    parser.add_argument("--batch", type=int, default=1000, help="每次保存的条数")
+    parser.add_argument("--content-size", type=int, default=300, help="每条新闻内容的字符数")
+    parser.add_argument("--scripts-dir", default=SCRIPTS_DIR, help="被测代码的 scripts 目录")
+    parser.add_argument("--output", help="追加结果到指定的JSONL文件")
+    # 以下参数由主进程传给子进程
+    parser.add_argument("--phase", choices=["preload", "save", "iter"], help=argparse.SUPPRESS)
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--data-dir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    args.scripts_dir = os.path.abspath(args.scripts_dir)
+
+    if args.phase:
+        run_phase(args)
+        return
+
+    meta = {
+        "version": git_revision(args.scripts_dir),
+        "python": platform.python_version(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "batch": args.batch
+    }
+    for storage in args.storage.split(","):
+        for size in [int(n) for n in args.rows.split(",") if n]:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                common = [sys.executable, os.path.abspath(__file__), "--storage", storage,
+                          "--batch", str(args.batch), "--content-size", str(args.content_size),
+                          "--scripts-dir", args.scripts_dir, "--size", str(size), "--data-dir", tmp_dir]
+                subprocess.run(common + ["--phase", "preload"], check=True, capture_output=True)
+                for phase in ("save", "iter"):
+                    proc = subprocess.run(common + ["--phase", phase], capture_output=True, text=True)
+                    if proc.returncode != 0:
+                        result = {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"}
+                    else:
+                        result = json.loads(proc.stdout.strip().splitlines()[-1])
+                    line = json.dumps({"storage": storage, "phase": phase, "rows": size, **meta, **result}, ensure_ascii=False)
+                    print(line, flush=True)
+                    if args.output:
+                        with open(args.output, 'a', encoding='utf-8') as f:
+                            f.write(line + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SQLite查询性能基准测试
+
+生成指定行数的新闻数据库，对比前端当前的全表查询与 NewsStorage.query_news
+（发布时间索引、标签表、FTS5全文索引、分页）的查询延迟。
+使用方法：
+    python benchmarks/bench_sqlite_query.py [--rows 1000000]
+"""
+
+import os
+import sys
+import json
+import random
+import argparse
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from news_scraper import NewsSettings, NewsStorage, NewsItem  # noqa: E402
+
+TAGS = ["AI", "人工智能", "机器学习", "深度学习", "科技", "芯片", "大模型", "机器人", "自动驾驶", "云计算"]
+WORDS = ["发布", "突破", "芯片", "模型", "训练", "推理", "开源", "融资", "监管", "应用", "算力", "数据"]
+BATCH_SIZE = 50000
+
+
+def make_items(start: int, count: int, rng: random.Random) -> List[NewsItem]:
+    """生成测试新闻数据"""
+    base = datetime(2024, 1, 1)
+    return [
+        {
+            "title": f"{''.join(rng.sample(WORDS, 3))}新闻 #{i}",
+            "source": "基准测试",
+            "link": f"https://example.com/bench/{i}",
+            "publishedAt": (base + timedelta(minutes=i)).isoformat(),
+            "tags": rng.sample(TAGS, 2),
+            "imageUrl": "https://via.placeholder.com/300x200/3b82f6/ffffff?text=News",
+            "content": "".join(rng.choices(WORDS, k=30))
+        }
+        for i in range(start, start + count)
+    ]
+
+
+def timed(func: Callable[[], object], repeat: int = 5) -> float:
+    """多次运行取中位数（毫秒）"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(durations), 2)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="SQLite查询性能基准测试")
+    parser.add_argument("--rows", type=int, default=1000000, help="生成的新闻行数")
+    args = parser.parse_args()
+    rows = args.rows
+    rng = random.Random(42)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        settings_file = os.path.join(tmp_dir, "settings.json")
+        with open(settings_file, 'w', encoding='utf-8') as f:
+            json.dump({"storageType": "sqlite", "dbPath": os.path.join(tmp_dir, "news.db")}, f)
+        storage = NewsStorage(NewsSettings(settings_file))
+
+        start = time.perf_counter()
+        for offset in range(0, rows, BATCH_SIZE):
+            storage.save_news(make_items(offset, min(BATCH_SIZE, rows - offset), rng))
+        load_seconds = round(time.perf_counter() - start, 1)
+
+        conn = storage._get_connection()
+        since = (datetime(2024, 1, 1) + timedelta(minutes=rows // 2)).isoformat()
+        until = (datetime(2024, 1, 1) + timedelta(minutes=rows // 2 + 60 * 24)).isoformat()
+        result = {
+            "rows": rows,
+            "load_s": load_seconds,
+            "full_scan_ms": timed(lambda: conn.execute("SELECT * FROM news ORDER BY publishedAt DESC").fetchall(), 1),
+            "latest_page_ms": timed(lambda: storage.query_news()),
+            "deep_page_ms": timed(lambda: storage.query_news(page=1000)),
+            "tag_page_ms": timed(lambda: storage.query_news(tag="大模型")),
+            "text_search_ms": timed(lambda: storage.query_news("开源芯片")),
+            "rare_text_search_ms": timed(lambda: storage.query_news(f"新闻 #{rows // 3}")),
+            "text_and_tag_ms": timed(lambda: storage.query_news("开源芯片", tag="大模型")),
+            "date_range_ms": timed(lambda: storage.query_news(since=since, until=until))
+        }
+        # 关闭时WAL合并到主文件后再统计；前端下载的 news.db 与不下载的检索数据库（全文索引和标签表）分别统计
+        storage.close()
+        result["db_size_mb"] = round(os.path.getsize(os.path.join(tmp_dir, "news.db")) / 1024 / 1024, 1)
+        result["search_db_size_mb"] = round(os.path.getsize(os.path.join(tmp_dir, "news_search.db")) / 1024 / 1024, 1)
+
+    print(json.dumps(result, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
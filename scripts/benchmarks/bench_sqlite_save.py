@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SQLite保存性能基准测试
+
+对比旧的逐行 SELECT + UPDATE/INSERT 循环与 NewsStorage 的批量 upsert。
+两者都使用 NewsStorage 打开的连接（相同的表结构，写入同样经过触发器同步检索数据库），只有保存逻辑不同。
+每个规模先写入一半数据，再保存整批数据（一半更新、一半新增）。
+使用方法：
+    python benchmarks/bench_sqlite_save.py [行数 ...]
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import time
+from datetime import datetime
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from news_scraper import NewsSettings, NewsStorage, NewsItem  # noqa: E402
+
+
+def make_items(count: int, tag: str) -> List[NewsItem]:
+    """生成测试新闻数据"""
+    return [
+        {
+            "title": f"测试新闻 #{i}",
+            "source": "基准测试",
+            "link": f"https://example.com/bench/{i}",
+            "publishedAt": datetime.now().isoformat(),
+            "tags": [tag, "AI"],
+            "imageUrl": "https://via.placeholder.com/300x200/3b82f6/ffffff?text=News",
+            "content": f"基准测试新闻内容 #{i}" * 5
+        }
+        for i in range(count)
+    ]
+
+
+def open_storage(db_path: str) -> NewsStorage:
+    """创建使用该数据库的 NewsStorage"""
+    settings_file = os.path.join(os.path.dirname(db_path), "settings.json")
+    with open(settings_file, 'w', encoding='utf-8') as f:
+        json.dump({"storageType": "sqlite", "dbPath": db_path}, f)
+    return NewsStorage(NewsSettings(settings_file))
+
+
+def legacy_save(db_path: str, news_items: List[NewsItem]) -> None:
+    """旧版逐行保存逻辑"""
+    storage = open_storage(db_path)
+    conn = storage._get_connection()
+    cursor = conn.cursor()
+    for item in news_items:
+        cursor.execute("SELECT id, tags FROM news WHERE link = ?", (item.get("link", ""),))
+        existing = cursor.fetchone()
+        if existing:
+            existing_id, existing_tags_str = existing
+            existing_tags = json.loads(existing_tags_str) if existing_tags_str else []
+            merged_tags = list(set(existing_tags + item.get("tags", [])))
+            cursor.execute(
+                "UPDATE news SET title=?, source=?, publishedAt=?, tags=?, imageUrl=?, content=? WHERE id=?",
+                (item["title"], item["source"], item["publishedAt"],
+                 json.dumps(merged_tags, ensure_ascii=False), item["imageUrl"], item["content"], existing_id)
+            )
+        else:
+            cursor.execute(
+                "INSERT INTO news (title, source, link, publishedAt, tags, imageUrl, content) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (item["title"], item["source"], item["link"], item["publishedAt"],
+                 json.dumps(item["tags"], ensure_ascii=False), item["imageUrl"], item["content"])
+            )
+    conn.commit()
+    storage.close()
+
+
+def batch_save(db_path: str, news_items: List[NewsItem]) -> None:
+    """NewsStorage批量保存"""
+    storage = open_storage(db_path)
+    storage.save_news(news_items)
+    storage.close()
+
+
+def run(count: int) -> dict:
+    """运行单个规模的对比测试"""
+    result = {"rows": count}
+    for name, save in (("legacy", legacy_save), ("batch", batch_save)):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = os.path.join(tmp_dir, "news.db")
+            save(db_path, make_items(count // 2, "旧标签"))
+            items = make_items(count, "新标签")
+            start = time.perf_counter()
+            save(db_path, items)
+            result[name] = round(time.perf_counter() - start, 3)
+    result["speedup"] = round(result["legacy"] / result["batch"], 2) if result["batch"] else None
+    return result
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="SQLite保存性能基准测试")
+    parser.add_argument("rows", type=int, nargs="*", default=[10000, 100000], help="测试的行数")
+    args = parser.parse_args()
+    for count in args.rows:
+        print(json.dumps(run(count), ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
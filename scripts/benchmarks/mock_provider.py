@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+本地模拟API提供商服务器
+
+按 Brave、Bing、NewsAPI、聚合数据和智谱清言的响应格式返回生成的新闻，
+可配置响应延迟、错误率、每页条数/内容长度和流式输出速度，用于离线基准测试。
+智谱清言支持批量提示词（每个关键词5条新闻）和 max_tokens 截断，
+Brave、Bing、NewsAPI 支持合并的OR查询。
+每个提供商的接口地址为 http://127.0.0.1:<端口>/<提供商>，填入 settings.json 的 apiUrls 即可。
+使用方法：
+    python benchmarks/mock_provider.py [--port 8000] [--latency 50] [--error-rate 0.01]
+"""
+
+import re
+import sys
+import json
+import random
+import argparse
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Dict, Any, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs, quote
+
+PROVIDERS = ["brave", "bing", "newsapi", "juhe", "zhipu"]
+WORDS = ["发布", "突破", "芯片", "模型", "训练", "推理", "开源", "融资", "监管", "应用", "算力", "数据",
+         "model", "release", "chip", "training", "open", "source", "funding", "policy"]
+
+# 流式响应每段的字符数，近似大模型每次输出的token
+STREAM_CHUNK_CHARS = 8
+
+# 聚合数据为头条接口，不支持关键词检索，每次返回的新闻条数
+JUHE_FEED_SIZE = 30
+
+
+class MockConfig:
+    """模拟服务器配置"""
+
+    def __init__(self, latency: float = 50, error_rate: float = 0.0, items: int = 20, content_size: int = 300,
+                 token_delay: float = 0.0, seed: int = 42):
+        """初始化配置，latency为平均延迟（毫秒），token_delay为流式响应每段之间的间隔（毫秒）"""
+        self.latency = latency
+        self.token_delay = token_delay
+        self.error_rate = error_rate
+        self.items = items
+        self.content_size = content_size
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+    def next_random(self) -> Tuple[float, float]:
+        """获取本次请求的延迟系数和错误判定随机数"""
+        with self.lock:
+            self.requests += 1
+            return self.rng.uniform(0.5, 1.5), self.rng.random()
+
+
+def sse_chunks(content: str, finish_reason: str = "stop") -> List[bytes]:
+    """将智谱清言的回复内容切分为SSE流式响应，最后一段带有结束原因和token用量"""
+    chunks = []
+    for i in range(0, len(content), STREAM_CHUNK_CHARS):
+        delta = {"choices": [{"index": 0, "delta": {"role": "assistant", "content": content[i:i + STREAM_CHUNK_CHARS]}}]}
+        chunks.append(f"data: {json.dumps(delta, ensure_ascii=False)}\n\n".encode('utf-8'))
+    final = {
+        "choices": [{"index": 0, "finish_reason": finish_reason, "delta": {"role": "assistant", "content": ""}}],
+        "usage": {"completion_tokens": len(chunks)}
+    }
+    chunks.append(f"data: {json.dumps(final)}\n\n".encode('utf-8'))
+    chunks.append(b"data: [DONE]\n\n")
+    return chunks
+
+
+def zhipu_keywords(prompt: str) -> List[str]:
+    """从智谱清言的提示词中提取关键词，批量请求的关键词以JSON数组给出"""
+    marker = "主题列表："
+    if marker in prompt:
+        keywords, _ = json.JSONDecoder().raw_decode(prompt, prompt.index(marker) + len(marker))
+        return keywords
+    match = re.search(r"'([^']*)'", prompt)
+    return [match.group(1) if match else ""]
+
+
+def zhipu_reply(content: str, max_tokens: Optional[int]) -> Tuple[str, str, int]:
+    """按输出token上限截断回复，每段流式输出计为一个token，返回(内容, 结束原因, token数)"""
+    tokens = -(-len(content) // STREAM_CHUNK_CHARS)
+    if max_tokens and tokens > max_tokens:
+        return content[:max_tokens * STREAM_CHUNK_CHARS], "length", max_tokens
+    return content, "stop", tokens
+
+
+def make_text(seed: str, size: int) -> str:
+    """根据种子生成固定长度的文本"""
+    rng = random.Random(seed)
+    text = ""
+    while len(text) < size:
+        text += rng.choice(WORDS)
+    return text[:size]
+
+
+def query_terms(query: str) -> List[str]:
+    """拆分OR查询中的关键词（去掉括号和引号）"""
+    return [term.strip().strip('"()') for term in query.split(" OR ")]
+
+
+def make_items(config: MockConfig, provider: str, keyword: str, offset: int, count: int) -> List[Dict[str, Any]]:
+    """生成通用的新闻条目，同一关键词和位置的新闻链接固定，重复请求会命中已保存的新闻。
+    OR查询轮流返回各关键词的新闻，与逐个关键词查询得到的新闻相同"""
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    terms = query_terms(keyword)
+    items = []
+    for i in range(offset, offset + count):
+        term, j = terms[i % len(terms)], i // len(terms)
+        items.append({
+            "title": f"{term} {make_text(f'{provider}{term}{j}', 16)} #{j}",
+            "url": f"https://news.example.com/{provider}/{quote(term)}/{j}",
+            "source": f"{provider}-source-{j % 7}",
+            "publishedAt": (now - timedelta(minutes=j)).isoformat().replace("+00:00", "Z"),
+            "image": f"https://img.example.com/{provider}/{j}.jpg",
+            "description": make_text(f"{term}{j}", config.content_size)
+        })
+    return items
+
+
+def render(config: MockConfig, provider: str, query: Dict[str, str], body: Dict[str, Any]) -> Dict[str, Any]:
+    """按提供商的响应格式生成响应体"""
+    keyword = query.get("q", "")
+    count = int(query.get("count") or query.get("pageSize") or config.items)
+
+    if provider == "brave":
+        items = make_items(config, provider, keyword, int(query.get("offset", 0)) * count, count)
+        return {"results": [
+            {"title": item["title"], "url": item["url"], "source": item["source"],
+             "published_time": item["publishedAt"], "thumbnail": {"src": item["image"]},
+             "description": item["description"]}
+            for item in items
+        ]}
+
+    if provider == "bing":
+        items = make_items(config, provider, keyword, int(query.get("offset", 0)), count)
+        return {"value": [
+            {"name": item["title"], "url": item["url"], "provider": [{"name": item["source"]}],
+             "datePublished": item["publishedAt"], "image": {"thumbnail": {"contentUrl": item["image"]}},
+             "description": item["description"]}
+            for item in items
+        ]}
+
+    if provider == "newsapi":
+        items = make_items(config, provider, keyword, (int(query.get("page", 1)) - 1) * count, count)
+        return {"status": "ok", "totalResults": 10000, "articles": [
+            {"title": item["title"], "url": item["url"], "source": {"name": item["source"]},
+             "publishedAt": item["publishedAt"], "urlToImage": item["image"],
+             "description": item["description"]}
+            for item in items
+        ]}
+
+    if provider == "juhe":
+        # 头条接口与关键词无关，按分钟滚动返回最新新闻
+        offset = int(time.time() // 60)
+        items = make_items(config, provider, "头条", offset, JUHE_FEED_SIZE)
+        return {"error_code": 0, "reason": "success", "result": {"data": [
+            {"title": item["title"], "url": item["url"], "author_name": item["source"],
+             "date": item["publishedAt"], "thumbnail_pic_s": item["image"]}
+            for item in items
+        ]}}
+
+    if provider == "zhipu":
+        prompt = body.get("messages", [{}])[-1].get("content", "")
+        keywords = zhipu_keywords(prompt)
+        content = json.dumps([
+            {**({"keyword": keyword} if len(keywords) > 1 else {}),
+             "title": item["title"], "source": item["source"], "content": item["description"],
+             "publishedAt": item["publishedAt"], "imageUrl": item["image"], "link": item["url"]}
+            for keyword in keywords
+            for item in make_items(config, provider, keyword, 0, 5)
+        ], ensure_ascii=False)
+        return {"choices": [{"index": 0, "message": {"role": "assistant", "content": f"```json\n{content}\n```"}}]}
+
+    raise KeyError(provider)
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """模拟API请求处理器"""
+
+    protocol_version = "HTTP/1.1"
+    config: MockConfig = MockConfig()
+
+    def log_message(self, format, *args):
+        """不输出访问日志"""
+
+    def _handle(self) -> None:
+        """处理请求"""
+        parts = urlsplit(self.path)
+        provider = parts.path.strip("/").split("/")[0]
+        query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        raw_body = self.rfile.read(length) if length else b""
+
+        factor, roll = self.config.next_random()
+        time.sleep(self.config.latency * factor / 1000)
+
+        if provider not in PROVIDERS:
+            status, payload = 404, {"error": "unknown provider"}
+        elif roll < self.config.error_rate:
+            with self.config.lock:
+                self.config.errors += 1
+            status, payload = 503, {"error": "mock error"}
+        else:
+            body = json.loads(raw_body) if raw_body else {}
+            status, payload = 200, render(self.config, provider, query, body)
+            if provider == "zhipu":
+                message = payload["choices"][0]
+                content, finish_reason, tokens = zhipu_reply(message["message"]["content"], body.get("max_tokens"))
+                if body.get("stream"):
+                    self._send_stream(content, finish_reason)
+                    return
+                # 非流式响应需要等待全部内容生成完毕
+                time.sleep(self.config.token_delay * tokens / 1000)
+                message["message"]["content"] = content
+                message["finish_reason"] = finish_reason
+                payload["usage"] = {"completion_tokens": tokens}
+
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, content: str, finish_reason: str) -> None:
+        """以SSE格式逐段发送回复内容"""
+        chunks = sse_chunks(content, finish_reason)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Content-Length", str(sum(len(chunk) for chunk in chunks)))
+        self.end_headers()
+        for chunk in chunks:
+            self.wfile.write(chunk)
+            self.wfile.flush()
+            if self.config.token_delay:
+                time.sleep(self.config.token_delay / 1000)
+
+    do_GET = _handle
+    do_POST = _handle
+
+
+def start_server(config: MockConfig, port: int = 0) -> ThreadingHTTPServer:
+    """在后台线程启动模拟服务器，port为0时自动分配端口"""
+    handler = type("ConfiguredMockHandler", (MockHandler,), {"config": config})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def api_urls(port: int) -> Dict[str, str]:
+    """各提供商的模拟接口地址，用于 settings.json 的 apiUrls"""
+    return {provider: f"http://127.0.0.1:{port}/{provider}" for provider in PROVIDERS}
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="本地模拟API提供商服务器")
+    parser.add_argument("--port", type=int, default=0, help="监听端口（0为自动分配）")
+    parser.add_argument("--latency", type=float, default=50, help="平均响应延迟（毫秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="返回503的比例（0-1）")
+    parser.add_argument("--items", type=int, default=20, help="请求未指定条数时每页返回的新闻条数")
+    parser.add_argument("--content-size", type=int, default=300, help="每条新闻内容的字符数")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="智谱清言流式响应每段之间的间隔（毫秒）")
+    args = parser.parse_args()
+
+    config = MockConfig(args.latency, args.error_rate, args.items, args.content_size, args.token_delay)
+    server = start_server(config, args.port)
+    port = server.server_address[1]
+    # 第一行输出端口，供基准测试脚本读取
+    print(port, flush=True)
+    print(json.dumps({"apiUrls": api_urls(port)}, ensure_ascii=False), file=sys.stderr, flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
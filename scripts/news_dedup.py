@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+新闻去重工具
+
+提供URL规范化和基于SimHash的近似重复检测，用于合并多个API提供商返回的结果。
+同一篇新闻常以不同URL出现（跟踪参数、AMP页面、移动端域名），
+转载稿的标题和内容也只有细微差别。
+"""
+
+import re
+import hashlib
+from typing import List, Dict, Any, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# 需要去掉的跟踪参数
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "ref", "ref_src", "referrer", "spm", "from", "share", "share_source", "ocid", "cmpid"
+}
+
+# 移动端域名前缀
+MOBILE_HOST_PREFIXES = ("m.", "mobile.", "amp.", "www.")
+
+# SimHash位数与分段数：汉明距离不超过 BANDS-1 的两个指纹必有一段完全相同
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 4
+
+# 指纹只取标题和内容开头的字符数；转载稿的差别通常在开头就能体现，正文全文不必逐字计算
+SIMHASH_CONTENT_CHARS = 200
+
+# 按位计数时每一位占用的整数位宽：所有n-gram的哈希按位展开后直接相加，每一位的计数各占一段，
+# 不需要逐位循环；16位可容纳65535个n-gram，超出时分块累加
+SIMHASH_LANE_BITS = 16
+SIMHASH_LANE_MASK = (1 << SIMHASH_LANE_BITS) - 1
+SIMHASH_MAX_CHUNK = SIMHASH_LANE_MASK
+
+
+def _spread_table(shift: int) -> List[int]:
+    """字节取值 -> 各位展开到对应计数段后的整数，shift为该字节在64位哈希中的起始位"""
+    table = []
+    for value in range(256):
+        spread = 0
+        for bit in range(8):
+            if value >> bit & 1:
+                spread |= 1 << ((shift + bit) * SIMHASH_LANE_BITS)
+        table.append(spread)
+    return table
+
+
+# 64位哈希的8个字节（小端序）各一张查找表
+_SPREAD_TABLES = [_spread_table(byte * 8) for byte in range(SIMHASH_BITS // 8)]
+
+
+def canonicalize_url(url: str) -> str:
+    """规范化新闻链接，用于识别同一篇新闻的不同URL"""
+    if not url:
+        return ""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url
+
+    host = (parts.hostname or "").lower()
+    for prefix in MOBILE_HOST_PREFIXES:
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+
+    # 去掉AMP路径
+    path = re.sub(r"/amp(/|$)", "/", parts.path)
+    path = re.sub(r"\.amp(\.html?)?$", r"\1", path)
+    path = path.rstrip("/") or "/"
+
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS and key.lower() != "amp"
+    ]
+    query.sort()
+
+    # 统一scheme，去掉fragment
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+
+def _shingles(text: str, size: int = 3) -> List[str]:
+    """将文本切分为字符n-gram（兼容中英文）"""
+    text = re.sub(r"\W+", "", text.lower())
+    if len(text) <= size:
+        return [text] if text else []
+    return [text[i:i + size] for i in range(len(text) - size + 1)]
+
+
+def simhash(text: str) -> int:
+    """计算文本的64位SimHash指纹"""
+    return _simhash_shingles(_shingles(text))
+
+
+def _simhash_shingles(shingles: List[str]) -> int:
+    """由n-gram计算SimHash：某一位为1的n-gram多于一半时指纹的该位为1"""
+    t0, t1, t2, t3, t4, t5, t6, t7 = _SPREAD_TABLES
+    counts = [0] * SIMHASH_BITS
+    for start in range(0, len(shingles), SIMHASH_MAX_CHUNK):
+        total = 0
+        for shingle in shingles[start:start + SIMHASH_MAX_CHUNK]:
+            d = hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest()
+            total += t0[d[7]] + t1[d[6]] + t2[d[5]] + t3[d[4]] + t4[d[3]] + t5[d[2]] + t6[d[1]] + t7[d[0]]
+        for bit in range(SIMHASH_BITS):
+            counts[bit] += total >> (bit * SIMHASH_LANE_BITS) & SIMHASH_LANE_MASK
+    fingerprint = 0
+    for bit, count in enumerate(counts):
+        if count * 2 > len(shingles):
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def _fingerprint(item: Dict[str, Any]) -> Optional[int]:
+    """新闻的SimHash指纹（标题和内容开头），标题和内容都为空时返回None"""
+    content = item.get('content') or ''
+    shingles = _shingles(f"{item.get('title', '')} {content[:SIMHASH_CONTENT_CHARS]}")
+    return _simhash_shingles(shingles) if shingles else None
+
+
+class NearDuplicateIndex:
+    """SimHash近似重复索引
+
+    将指纹分为若干段建立倒排表，只与至少一段相同的候选比较汉明距离，
+    整体开销近似线性，而不是两两比较。
+    """
+
+    def __init__(self, max_distance: int = 3):
+        """初始化索引，max_distance须小于分段数"""
+        self.max_distance = min(max_distance, SIMHASH_BANDS - 1)
+        self.band_bits = SIMHASH_BITS // SIMHASH_BANDS
+        self.bands: List[Dict[int, List[int]]] = [{} for _ in range(SIMHASH_BANDS)]
+        self.fingerprints: Dict[int, int] = {}
+
+    def _band_keys(self, fingerprint: int) -> List[int]:
+        """获取指纹的各段取值"""
+        mask = (1 << self.band_bits) - 1
+        return [fingerprint >> (i * self.band_bits) & mask for i in range(SIMHASH_BANDS)]
+
+    def find(self, fingerprint: int) -> Optional[int]:
+        """查找近似重复的已有条目，返回其编号"""
+        for band, key in zip(self.bands, self._band_keys(fingerprint)):
+            for doc_id in band.get(key, ()):
+                if bin(self.fingerprints[doc_id] ^ fingerprint).count("1") <= self.max_distance:
+                    return doc_id
+        return None
+
+    def add(self, doc_id: int, fingerprint: int) -> None:
+        """以指定编号添加指纹"""
+        self.fingerprints[doc_id] = fingerprint
+        for band, key in zip(self.bands, self._band_keys(fingerprint)):
+            band.setdefault(key, []).append(doc_id)
+
+
+def fuse_results(result_lists: List[Tuple[str, List[Dict[str, Any]]]], max_distance: int = 3) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """合并多个提供商的结果，折叠相同链接和近似重复的新闻
+
+    按传入顺序保留首次出现的条目，重复条目的标签合并到保留条目中。
+    返回 (合并后的新闻列表, 各提供商保留的条目数)。
+    """
+    fused: List[Dict[str, Any]] = []
+    kept: Dict[str, int] = {provider: 0 for provider, _ in result_lists}
+    by_link: Dict[str, int] = {}
+    index = NearDuplicateIndex(max_distance)
+
+    for provider, items in result_lists:
+        for item in items:
+            link = canonicalize_url(item.get("link", ""))
+            position = by_link.get(link) if link else None
+            fingerprint = None
+            if position is None:
+                # 链接未命中时才计算指纹；标题和内容都为空时无法判断相似度，只按链接去重
+                fingerprint = _fingerprint(item)
+                if fingerprint is not None:
+                    position = index.find(fingerprint)
+
+            if position is not None:
+                existing = fused[position]
+                tags = existing.setdefault("tags", [])
+                tags.extend(tag for tag in item.get("tags", []) if tag not in tags)
+                continue
+
+            position = len(fused)
+            if fingerprint is not None:
+                index.add(position, fingerprint)
+            fused.append(item)
+            kept[provider] += 1
+            if link:
+                by_link[link] = position
+
+    return fused, kept
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+新闻正文补全
+
+部分提供商只返回标题或很短的摘要（聚合数据以标题作为内容，NewsAPI.org截断为200字）。
+抓取完成后访问这些新闻的原文页面，提取正文保存到独立的数据库中，列表查询和前端下载的
+news.db 不受正文大小影响：
+
+- 只抓取尚未补全的链接；已补全的链接超过重新验证时间后带 ETag / Last-Modified 条件请求，
+  返回304时不重新下载
+- 遵守 robots.txt（按网站缓存）和 Crawl-delay，每个网站限制并发数和请求间隔
+- 使用标准库 html.parser 提取段落文本，不依赖第三方解析库
+"""
+
+import os
+import re
+import time
+import sqlite3
+import logging
+import threading
+import requests
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+
+logger = logging.getLogger("news_scraper")
+
+# robots.txt 缓存时间（秒）；无法获取时（网络错误、5xx）暂时视为禁止抓取，较短时间后重试
+ROBOTS_TTL = 24 * 60 * 60
+ROBOTS_ERROR_TTL = 60 * 60
+
+# 单个页面最大下载字节数
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+
+# 正文最大保存字数
+MAX_ARTICLE_CHARS = 20000
+
+# 短于该字数的段落视为导航、按钮等页面元素
+MIN_PARAGRAPH_CHARS = 20
+
+# <article> 中的文本达到该字数时只使用 <article> 中的段落
+MIN_ARTICLE_CHARS = 200
+
+# 不包含正文的标签
+SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "nav", "header", "footer", "aside", "form", "button", "select", "textarea", "iframe"}
+
+# 块级标签，开始和结束时分段
+BLOCK_TAGS = {"p", "div", "section", "article", "main", "li", "ul", "ol", "blockquote", "pre", "br", "td", "tr", "table",
+              "h1", "h2", "h3", "h4", "h5", "h6", "figcaption"}
+
+# 页面中声明的字符集
+META_CHARSET = re.compile(rb"<meta[^>]+charset=[\"']?([\w-]+)", re.IGNORECASE)
+
+
+class _TextExtractor(HTMLParser):
+    """收集页面中的段落文本"""
+
+    def __init__(self):
+        """初始化解析器"""
+        super().__init__(convert_charrefs=True)
+        self.skip_depth = 0
+        self.article_depth = 0
+        self.current: List[str] = []
+        # (是否在<article>中, 段落文本)
+        self.paragraphs: List[Tuple[bool, str]] = []
+        self.description = ""
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        """开始标签"""
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+        elif tag == "article":
+            self.article_depth += 1
+        elif tag == "meta":
+            attributes = dict(attrs)
+            if (attributes.get("name") or attributes.get("property") or "").lower() in ("description", "og:description"):
+                self.description = self.description or (attributes.get("content") or "").strip()
+        if tag in BLOCK_TAGS:
+            self._flush()
+
+    def handle_endtag(self, tag: str) -> None:
+        """结束标签"""
+        if tag in BLOCK_TAGS:
+            self._flush()
+        if tag in SKIP_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+        elif tag == "article" and self.article_depth:
+            self.article_depth -= 1
+
+    def handle_data(self, data: str) -> None:
+        """文本内容"""
+        if not self.skip_depth:
+            self.current.append(data)
+
+    def _flush(self) -> None:
+        """结束当前段落"""
+        text = " ".join("".join(self.current).split())
+        self.current = []
+        if text:
+            self.paragraphs.append((self.article_depth > 0, text))
+
+
+def extract_text(html: str) -> str:
+    """从HTML页面中提取正文，没有足够长的段落时使用页面描述"""
+    parser = _TextExtractor()
+    try:
+        parser.feed(html)
+        parser.close()
+    except Exception as e:
+        logger.debug(f"解析页面失败: {e}")
+    parser._flush()
+
+    paragraphs = [text for in_article, text in parser.paragraphs if in_article]
+    if sum(len(text) for text in paragraphs) < MIN_ARTICLE_CHARS:
+        paragraphs = [text for _, text in parser.paragraphs]
+    # 去掉过短的段落和重复段落（如图片说明、分享按钮）
+    paragraphs = list(dict.fromkeys(text for text in paragraphs if len(text) >= MIN_PARAGRAPH_CHARS))
+    text = "\n\n".join(paragraphs) or parser.description
+    return text[:MAX_ARTICLE_CHARS]
+
+
+class ArticleStore:
+    """新闻正文数据库，按链接保存正文和条件请求的验证器"""
+
+    def __init__(self, db_path: str):
+        """初始化数据库"""
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS articles (
+            link TEXT PRIMARY KEY,
+            status INTEGER NOT NULL,
+            text TEXT,
+            etag TEXT,
+            lastModified TEXT,
+            fetchedAt REAL NOT NULL
+        )
+        """)
+        self.conn.commit()
+
+    def pending(self, links: List[str], revalidate: float) -> List[Dict[str, Any]]:
+        """筛选需要抓取的链接：未抓取过的链接，以及超过重新验证时间的链接（带验证器）"""
+        jobs = []
+        now = time.time()
+        for link in dict.fromkeys(links):
+            row = self.conn.execute(
+                "SELECT etag, lastModified, fetchedAt FROM articles WHERE link = ?", (link,)
+            ).fetchone()
+            if row is None:
+                jobs.append({"link": link})
+            elif revalidate and now - row[2] >= revalidate:
+                jobs.append({"link": link, "etag": row[0], "lastModified": row[1]})
+        return jobs
+
+    def save(self, result: Dict[str, Any]) -> None:
+        """保存抓取结果，304时只刷新抓取时间"""
+        now = time.time()
+        if result["status"] == 304:
+            self.conn.execute("UPDATE articles SET fetchedAt = ? WHERE link = ?", (now, result["link"]))
+            return
+        self.conn.execute(
+            "INSERT OR REPLACE INTO articles (link, status, text, etag, lastModified, fetchedAt) VALUES (?, ?, ?, ?, ?, ?)",
+            (result["link"], result["status"], result.get("text"), result.get("etag"), result.get("lastModified"), now)
+        )
+
+    def commit(self) -> None:
+        """提交写入"""
+        self.conn.commit()
+
+    def get_texts(self, links: List[str]) -> Dict[str, str]:
+        """批量读取正文"""
+        texts = {}
+        for link in dict.fromkeys(links):
+            row = self.conn.execute("SELECT text FROM articles WHERE link = ? AND text IS NOT NULL", (link,)).fetchone()
+            if row:
+                texts[link] = row[0]
+        return texts
+
+    def delete(self, links: List[str]) -> None:
+        """删除指定链接的正文"""
+        with self.conn:
+            self.conn.executemany("DELETE FROM articles WHERE link = ?", [(link,) for link in links])
+
+    def close(self) -> None:
+        """关闭数据库"""
+        self.conn.close()
+
+
+def _robots_agent(user_agent: str) -> str:
+    """robots.txt 规则匹配使用的爬虫名称，如 "Mozilla/5.0 (compatible; NewsScraperBot/1.0)" 为 NewsScraperBot"""
+    match = re.search(r"compatible;\s*([\w-]+)", user_agent)
+    return match.group(1) if match else user_agent.split("/")[0]
+
+
+class _HostLimiter:
+    """限制对同一网站的并发数和请求间隔"""
+
+    def __init__(self, concurrency: int, delay: float):
+        """初始化限制器"""
+        self.concurrency = max(1, concurrency)
+        self.delay = delay
+        self.lock = threading.Lock()
+        # 网站 -> (并发信号量, 间隔锁, [上次请求时间])
+        self.hosts: Dict[str, Tuple[threading.Semaphore, threading.Lock, List[float]]] = {}
+
+    @contextmanager
+    def slot(self, host: str, delay: Optional[float] = None) -> Iterator[None]:
+        """占用一个请求名额，距离上次请求不足间隔时等待"""
+        with self.lock:
+            if host not in self.hosts:
+                self.hosts[host] = (threading.Semaphore(self.concurrency), threading.Lock(), [0.0])
+            semaphore, interval_lock, last = self.hosts[host]
+        delay = max(self.delay, delay or 0)
+        with semaphore:
+            with interval_lock:
+                wait = last[0] + delay - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                last[0] = time.monotonic()
+            yield
+
+
+class ArticleEnricher:
+    """新闻原文抓取器"""
+
+    def __init__(self, user_agent: str, concurrency: int = 8, host_concurrency: int = 2, delay: float = 1.0,
+                 timeout: Tuple[float, float] = (5, 15)):
+        """初始化抓取器"""
+        self.robots_agent = _robots_agent(user_agent)
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.limiter = _HostLimiter(host_concurrency, delay)
+        self.robots: Dict[str, Tuple[Optional[RobotFileParser], float]] = {}
+        self.robots_lock = threading.Lock()
+        self.robots_fetching: Dict[str, threading.Lock] = {}
+        adapter = HTTPAdapter(pool_connections=self.concurrency, pool_maxsize=self.concurrency)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "User-Agent": user_agent,
+            "Accept": "text/html,application/xhtml+xml",
+            "Accept-Encoding": "gzip, deflate"
+        })
+
+    def fetch_all(self, jobs: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """并发抓取链接，按完成顺序产出结果"""
+        # 各网站的链接交替排列，避免线程集中等待同一网站
+        by_host: Dict[str, List[Dict[str, Any]]] = {}
+        for job in jobs:
+            by_host.setdefault(urlsplit(job["link"]).netloc.lower(), []).append(job)
+        queues = list(by_host.values())
+        ordered = [queue[i] for i in range(max((len(queue) for queue in queues), default=0)) for queue in queues if i < len(queue)]
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = [executor.submit(self._fetch, job) for job in ordered]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def _get_robots(self, scheme: str, host: str) -> Optional[RobotFileParser]:
+        """获取网站的robots.txt规则（带缓存），无法获取时返回None表示暂不抓取"""
+        key = f"{scheme}://{host}"
+        with self.robots_lock:
+            fetch_lock = self.robots_fetching.setdefault(key, threading.Lock())
+        # 同一网站的robots.txt只请求一次，其他线程等待结果
+        with fetch_lock:
+            with self.robots_lock:
+                cached = self.robots.get(key)
+            if cached and cached[1] > time.time():
+                return cached[0]
+            return self._fetch_robots(key, host)
+
+    def _fetch_robots(self, key: str, host: str) -> Optional[RobotFileParser]:
+        """请求并缓存robots.txt"""
+        parser: Optional[RobotFileParser] = RobotFileParser(f"{key}/robots.txt")
+        ttl = ROBOTS_TTL
+        try:
+            with self.limiter.slot(host):
+                response = self.session.get(f"{key}/robots.txt", timeout=self.timeout)
+            if response.status_code >= 500:
+                parser, ttl = None, ROBOTS_ERROR_TTL
+            elif response.status_code in (401, 403):
+                parser.disallow_all = True
+            elif response.status_code >= 400:
+                parser.allow_all = True
+            else:
+                parser.parse(response.text.splitlines())
+        except requests.RequestException as e:
+            logger.warning(f"获取 {key}/robots.txt 失败: {e}")
+            parser, ttl = None, ROBOTS_ERROR_TTL
+
+        with self.robots_lock:
+            self.robots[key] = (parser, time.time() + ttl)
+        return parser
+
+    def _fetch(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """抓取单个链接并提取正文；status为HTTP状态码，0为网络错误，-1为robots.txt禁止"""
+        link = job["link"]
+        parts = urlsplit(link)
+        host = parts.netloc.lower()
+        result: Dict[str, Any] = {"link": link, "status": 0}
+        try:
+            robots = self._get_robots(parts.scheme, host)
+            if robots is None:
+                return result
+            if not robots.can_fetch(self.robots_agent, link):
+                result["status"] = -1
+                return result
+
+            headers = {}
+            if job.get("etag"):
+                headers["If-None-Match"] = job["etag"]
+            if job.get("lastModified"):
+                headers["If-Modified-Since"] = job["lastModified"]
+
+            crawl_delay = robots.crawl_delay(self.robots_agent)
+            with self.limiter.slot(host, float(crawl_delay) if crawl_delay else None):
+                with self.session.get(link, headers=headers, timeout=self.timeout, stream=True) as response:
+                    result["status"] = response.status_code
+                    if response.status_code != 200:
+                        return result
+                    content_type = response.headers.get("Content-Type", "")
+                    if content_type and "html" not in content_type:
+                        return result
+                    body = response.raw.read(MAX_PAGE_BYTES, decode_content=True)
+                    result["etag"] = response.headers.get("ETag")
+                    result["lastModified"] = response.headers.get("Last-Modified")
+                    encoding = response.encoding if "charset" in content_type.lower() else None
+
+            if encoding is None:
+                match = META_CHARSET.search(body[:4096])
+                encoding = match.group(1).decode("ascii") if match else "utf-8"
+            try:
+                html = body.decode(encoding, errors="replace")
+            except LookupError:
+                html = body.decode("utf-8", errors="replace")
+            result["text"] = extract_text(html)
+        except requests.RequestException as e:
+            logger.warning(f"抓取原文失败 {link}: {e}")
+            result["status"] = 0
+        return result
+
+    def close(self) -> None:
+        """关闭HTTP会话"""
+        self.session.close()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+新闻静态分片导出
+
+将新闻导出为分页的静态JSON分片，前端只需下载当前渲染的内容，而不是整个 news.db 或 news.json：
+
+    manifest.json              清单（不缓存），列出所有分页文件及条数
+    latest/<序号>.<哈希>.json   按发布时间倒序的分页（文件名含内容哈希，可长期缓存）
+    tags/<标签哈希>/<序号>.<哈希>.json  各标签的分页
+    items/<ID>.json            单条新闻详情
+
+每个文件同时生成 .gz 预压缩版本（安装了 brotli 时还会生成 .br），供 nginx 的 gzip_static 直接使用。
+"""
+
+import os
+import json
+import gzip
+import hashlib
+import logging
+import tempfile
+from datetime import datetime
+from typing import List, Dict, Any, Callable, Iterable, Set
+
+# brotli为可选依赖，未安装时只生成gzip版本
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger("news_scraper")
+
+MANIFEST_VERSION = 1
+
+# 列表分页中的内容摘要长度，完整内容在详情文件中
+SUMMARY_LENGTH = 200
+
+# 详情文件哈希记录（以点开头，nginx默认禁止访问）
+DETAIL_HASHES_FILE = ".detail_hashes.json"
+
+
+def _write_file(path: str, data: bytes) -> None:
+    """原子写入文件及其预压缩版本"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    variants = [(path, data), (path + ".gz", gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append((path + ".br", brotli.compress(data)))
+    for target, content in variants:
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(target))
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, target)
+
+
+def _encode(data: Any) -> bytes:
+    """紧凑编码JSON"""
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
+
+
+def _content_hash(data: bytes) -> str:
+    """计算内容哈希"""
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def _summarize(item: Dict[str, Any]) -> Dict[str, Any]:
+    """列表分页中的新闻条目，只保留内容摘要"""
+    content = item.get("content") or ""
+    if len(content) > SUMMARY_LENGTH:
+        item = {**item, "content": content[:SUMMARY_LENGTH] + "..."}
+    return item
+
+
+class _PageStream:
+    """一个分页序列（最新列表或某个标签）
+
+    分页从最旧的新闻开始对齐：除最新一页外每页都是满页，新增新闻只会改变最前面的页，
+    较旧的分页内容和文件名保持不变，浏览器和CDN缓存可以长期有效。
+    """
+
+    def __init__(self, exporter: "ShardExporter", directory: str, total: int):
+        """初始化分页序列"""
+        self.exporter = exporter
+        self.directory = directory
+        self.total = total
+        page_size = exporter.page_size
+        self.chunk_count = max(1, -(-total // page_size))
+        # 最新一页的条数为余数
+        self.next_size = total - (self.chunk_count - 1) * page_size
+        self.buffer: List[Dict[str, Any]] = []
+        self.pages: List[str] = []
+
+    def add(self, item: Dict[str, Any]) -> None:
+        """追加一条新闻（按发布时间倒序）"""
+        self.buffer.append(item)
+        if len(self.buffer) >= self.next_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """写出当前页"""
+        chunk = self.chunk_count - len(self.pages)
+        self.pages.append(self.exporter.write_page(self.directory, chunk, self.buffer))
+        self.buffer = []
+        self.next_size = self.exporter.page_size
+
+
+class ShardExporter:
+    """静态分片导出器"""
+
+    def __init__(self, export_path: str, page_size: int = 30):
+        """初始化导出器"""
+        self.export_path = export_path
+        self.page_size = page_size
+        self.pages_written = 0
+
+    def _load_json(self, name: str) -> Dict[str, Any]:
+        """读取导出目录中的JSON文件，不存在或损坏时返回空字典"""
+        try:
+            with open(os.path.join(self.export_path, name), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def write_page(self, directory: str, chunk: int, items: List[Dict[str, Any]]) -> str:
+        """写入一页分片，返回相对路径（文件名包含从最旧开始的序号和内容哈希）"""
+        data = _encode(items)
+        relative_path = f"{directory}/{chunk:05d}.{_content_hash(data)}.json"
+        path = os.path.join(self.export_path, relative_path)
+        if not os.path.exists(path):
+            _write_file(path, data)
+            self.pages_written += 1
+        return relative_path
+
+    def export(self, iter_news: Callable[[], Iterable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """导出分片；iter_news每次调用返回按发布时间倒序排列的新闻，会被遍历两次。返回新的清单"""
+        os.makedirs(self.export_path, exist_ok=True)
+        previous_manifest = self._load_json("manifest.json")
+        detail_hashes: Dict[str, str] = self._load_json(DETAIL_HASHES_FILE)
+        new_detail_hashes: Dict[str, str] = {}
+        self.pages_written = 0
+
+        # 第一遍：统计总数和各标签条数，用于从最旧的新闻开始对齐分页
+        total = 0
+        tag_totals: Dict[str, int] = {}
+        for item in iter_news():
+            total += 1
+            for tag in dict.fromkeys(item.get("tags") or []):
+                tag_totals[tag] = tag_totals.get(tag, 0) + 1
+
+        # 第二遍：写出分页和详情文件
+        latest = _PageStream(self, "latest", total)
+        tag_streams = {tag: _PageStream(self, self._tag_directory(tag), count) for tag, count in tag_totals.items()}
+        details_written = 0
+        for item in iter_news():
+            # 详情文件：内容未变化时跳过写入
+            data = _encode(item)
+            item_id = str(item.get("id"))
+            digest = _content_hash(data)
+            new_detail_hashes[item_id] = digest
+            if detail_hashes.get(item_id) != digest:
+                _write_file(os.path.join(self.export_path, "items", f"{item_id}.json"), data)
+                details_written += 1
+
+            summary = _summarize(item)
+            latest.add(summary)
+            for tag in dict.fromkeys(item.get("tags") or []):
+                tag_streams[tag].add(summary)
+
+        if not latest.pages:
+            latest.flush()
+
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "generatedAt": datetime.now().isoformat(),
+            "pageSize": self.page_size,
+            "total": total,
+            "latest": latest.pages,
+            "tags": {
+                tag: {"total": tag_totals[tag], "pages": tag_streams[tag].pages}
+                for tag in sorted(tag_streams, key=lambda t: (-tag_totals[t], t))
+            },
+            "items": "items/{id}.json"
+        }
+        # 清单最后写入，保证清单引用的分片都已存在
+        _write_file(os.path.join(self.export_path, DETAIL_HASHES_FILE), _encode(new_detail_hashes))
+        _write_file(os.path.join(self.export_path, "manifest.json"), _encode(manifest))
+
+        # 删除过期的分片，保留上一版清单引用的文件，避免正在浏览的客户端404
+        removed = self._cleanup(manifest, previous_manifest, set(detail_hashes) - set(new_detail_hashes))
+        logger.info(
+            f"已导出静态分片到 {self.export_path}: {total} 条新闻, {len(tag_streams)} 个标签, "
+            f"新写入分页 {self.pages_written} 个, 更新详情 {details_written} 条, 清理 {removed} 个过期文件"
+        )
+        return manifest
+
+    @staticmethod
+    def _tag_directory(tag: str) -> str:
+        """标签分片目录（标签可能包含任意字符，使用哈希作为目录名）"""
+        return "tags/" + hashlib.sha1(tag.encode('utf-8')).hexdigest()[:12]
+
+    @staticmethod
+    def _manifest_files(manifest: Dict[str, Any]) -> Set[str]:
+        """清单引用的分页文件"""
+        files = set(manifest.get("latest", []))
+        for tag_info in manifest.get("tags", {}).values():
+            files.update(tag_info.get("pages", []))
+        return files
+
+    def _cleanup(self, manifest: Dict[str, Any], previous_manifest: Dict[str, Any], removed_ids: Set[str]) -> int:
+        """删除不再被引用的分页文件和已删除新闻的详情文件"""
+        keep = self._manifest_files(manifest) | self._manifest_files(previous_manifest)
+        removed = 0
+        for directory in ("latest", "tags"):
+            root = os.path.join(self.export_path, directory)
+            for dir_path, _, file_names in os.walk(root):
+                for file_name in file_names:
+                    path = os.path.join(dir_path, file_name)
+                    relative_path = os.path.relpath(path, self.export_path).replace(os.sep, "/")
+                    for suffix in (".gz", ".br"):
+                        if relative_path.endswith(suffix):
+                            relative_path = relative_path[:-len(suffix)]
+                    if relative_path not in keep:
+                        os.remove(path)
+                        removed += 1
+        for item_id in removed_ids:
+            for suffix in ("", ".gz", ".br"):
+                path = os.path.join(self.export_path, "items", f"{item_id}.json{suffix}")
+                if os.path.exists(path):
+                    os.remove(path)
+                    removed += 1
+        return removed
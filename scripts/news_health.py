@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+提供商的自适应并发与熔断
+
+- AdaptiveLimiter: 按AIMD调整同时进行的请求数。请求正常完成时并发上限缓慢增加（约每完成上限个请求加1），
+  遇到429/5xx、网络错误或耗时明显超过延迟基线时减半；同一时刻已发出的请求只触发一次减半
+- CircuitBreaker: 连续失败达到阈值后熔断，冷却期内直接跳过该提供商；冷却结束后放行一个试探请求，
+  其他请求等待试探结果，成功则恢复，失败则冷却时间加倍
+- ProviderHealth: 管理各提供商的限流器和熔断器，并把并发上限、延迟基线和熔断状态保存到JSON文件，
+  下次运行（如cron）直接沿用，不必重新试探
+"""
+
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+from news_metrics import metrics
+
+logger = logging.getLogger("news_scraper")
+
+# 耗时至少比基线多出该秒数才视为变慢，避免毫秒级的抖动触发降并发
+MIN_LATENCY_SLACK = 1.0
+
+# 延迟基线向较慢请求靠拢的比例：持续变慢时基线逐渐上移，不会一直降低并发
+BASELINE_DRIFT = 0.05
+
+# 恢复试探连续失败时，冷却时间最多增加到初始值的倍数
+MAX_COOLDOWN_FACTOR = 16
+
+
+class CircuitOpenError(Exception):
+    """提供商已熔断，请求未发出"""
+
+
+class AdaptiveLimiter:
+    """AIMD并发限制：正常时加性增加，过载时乘性减少"""
+
+    def __init__(self, maximum: int, limit: Optional[float] = None, baseline: Optional[float] = None,
+                 tolerance: float = 2.0):
+        """初始化限流器，limit和baseline为上次运行保存的并发上限和延迟基线"""
+        self.maximum = max(1, int(maximum))
+        self.limit = min(float(self.maximum), max(1.0, float(limit or self.maximum)))
+        self.baseline = baseline
+        self.tolerance = tolerance
+        self.in_flight = 0
+        # 最近一次减半的时间，此前发出的请求不再重复减半
+        self.decreased_at = 0.0
+        self.condition = threading.Condition()
+
+    def acquire(self) -> None:
+        """等待空闲的并发名额"""
+        with self.condition:
+            while self.in_flight >= int(self.limit):
+                self.condition.wait()
+            self.in_flight += 1
+
+    def release(self, started: float, overloaded: bool) -> None:
+        """归还名额并调整并发上限，started为请求开始的 time.monotonic()，overloaded为429/5xx或网络错误"""
+        latency = time.monotonic() - started
+        with self.condition:
+            self.in_flight -= 1
+            slow = False
+            if not overloaded:
+                if self.baseline is not None:
+                    slow = latency > max(self.baseline * self.tolerance, self.baseline + MIN_LATENCY_SLACK)
+                self._update_baseline(latency)
+            if overloaded or slow:
+                if started >= self.decreased_at:
+                    self.limit = max(1.0, self.limit / 2)
+                    self.decreased_at = time.monotonic()
+            else:
+                self.limit = min(float(self.maximum), self.limit + 1 / self.limit)
+            self.condition.notify_all()
+
+    def _update_baseline(self, latency: float) -> None:
+        """更新延迟基线：更快的请求直接作为基线，更慢的请求使基线缓慢上移"""
+        if self.baseline is None or latency < self.baseline:
+            self.baseline = latency
+        else:
+            self.baseline += (latency - self.baseline) * BASELINE_DRIFT
+
+
+class CircuitBreaker:
+    """熔断器：关闭 -> 连续失败后熔断 -> 冷却结束后放行一个试探请求 -> 成功恢复/失败继续熔断"""
+
+    def __init__(self, threshold: int, cooldown: float, failures: int = 0,
+                 open_until: float = 0.0, current_cooldown: Optional[float] = None):
+        """初始化熔断器，open_until为熔断结束的时间戳（time.time()），0为未熔断"""
+        self.threshold = max(1, int(threshold))
+        self.base_cooldown = float(cooldown)
+        self.cooldown = float(current_cooldown or cooldown)
+        self.failures = failures
+        self.open_until = open_until
+        # 正在进行试探请求的线程，其他请求在 condition 上等待试探结果
+        self.probe_thread: Optional[int] = None
+        self.condition = threading.Condition()
+
+    def is_open(self) -> bool:
+        """是否处于冷却期，冷却期内应跳过该提供商"""
+        with self.condition:
+            return self.open_until > 0 and time.time() < self.open_until
+
+    def allow(self) -> bool:
+        """请求前检查；冷却结束后只放行一个试探请求，其他请求等待试探完成后再判断"""
+        with self.condition:
+            while self.probe_thread is not None:
+                self.condition.wait()
+            if not self.open_until:
+                return True
+            if time.time() < self.open_until:
+                return False
+            self.probe_thread = threading.get_ident()
+            return True
+
+    def record(self, success: bool) -> Optional[str]:
+        """记录请求结果，状态变化时返回 "open" 或 "closed" """
+        with self.condition:
+            probe = self.probe_thread == threading.get_ident()
+            if probe:
+                self.probe_thread = None
+                self.condition.notify_all()
+            if success:
+                if not self.open_until:
+                    self.failures = 0
+                    return None
+                if not probe:
+                    # 熔断前发出的请求迟到的成功结果，不代表已恢复
+                    return None
+                self.failures = 0
+                self.open_until = 0.0
+                self.cooldown = self.base_cooldown
+                return "closed"
+
+            self.failures += 1
+            if probe:
+                self.cooldown = min(self.cooldown * 2, self.base_cooldown * MAX_COOLDOWN_FACTOR)
+                self.open_until = time.time() + self.cooldown
+                return "open"
+            if not self.open_until and self.failures >= self.threshold:
+                self.open_until = time.time() + self.cooldown
+                return "open"
+            return None
+
+    def trip(self) -> bool:
+        """立即熔断（如配额用尽），已熔断时返回False"""
+        with self.condition:
+            if self.open_until and time.time() < self.open_until:
+                return False
+            self.failures = max(self.failures, self.threshold)
+            self.open_until = time.time() + self.cooldown
+            return True
+
+
+class ProviderHealth:
+    """各提供商的自适应并发与熔断状态"""
+
+    def __init__(self, path: str, max_concurrency: Dict[str, int], adaptive: bool = True,
+                 tolerance: float = 2.0, failures: int = 5, cooldown: float = 300):
+        """加载上次运行保存的状态，max_concurrency为各提供商并发请求数的上限；
+        adaptive为False时不限制并发，failures为0时不熔断"""
+        self.path = path
+        self.lock = threading.Lock()
+        saved: Dict[str, Dict[str, Any]] = {}
+        try:
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    saved = json.load(f)
+        except Exception as e:
+            logger.warning(f"加载提供商状态失败，将重新学习并发数和熔断状态: {e}")
+
+        self.limiters: Dict[str, AdaptiveLimiter] = {}
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        for provider, maximum in max_concurrency.items():
+            state = saved.get(provider) or {}
+            if adaptive:
+                self.limiters[provider] = AdaptiveLimiter(maximum, state.get("limit"), state.get("baseline"), tolerance)
+            if failures:
+                breaker = CircuitBreaker(failures, cooldown, int(state.get("failures") or 0),
+                                         float(state.get("openUntil") or 0), state.get("cooldown"))
+                self.breakers[provider] = breaker
+                remaining = breaker.open_until - time.time()
+                if remaining > 0:
+                    logger.warning(f"{provider} 仍处于熔断状态（上次运行记录），{remaining:.0f} 秒后恢复试探")
+        # 其他提供商（如已从设置中移除）的状态原样保留
+        self.saved = saved
+
+    def before(self, provider: str) -> None:
+        """发送请求前调用：熔断时抛出 CircuitOpenError，否则等待并发名额"""
+        breaker = self.breakers.get(provider)
+        if breaker is not None and not breaker.allow():
+            metrics.inc("news_circuit_breaker_total", provider=provider, event="rejected")
+            raise CircuitOpenError(f"{provider} 已熔断，跳过请求")
+        limiter = self.limiters.get(provider)
+        if limiter is not None:
+            limiter.acquire()
+
+    def after(self, provider: str, started: float, status: Optional[int]) -> None:
+        """请求结束后调用，status为HTTP状态码，网络错误时为None"""
+        failed = status is None or status == 429 or status >= 500
+        limiter = self.limiters.get(provider)
+        if limiter is not None:
+            limiter.release(started, failed)
+            metrics.set("news_provider_concurrency_limit", int(limiter.limit), provider=provider)
+        breaker = self.breakers.get(provider)
+        if breaker is None:
+            return
+        transition = breaker.record(not failed)
+        if transition == "open":
+            logger.warning(f"{provider} 连续失败 {breaker.failures} 次，熔断 {breaker.cooldown:.0f} 秒")
+            metrics.inc("news_circuit_breaker_total", provider=provider, event="open")
+            # 立即保存，本次运行中途退出时下次运行仍会跳过
+            self.save()
+        elif transition == "closed":
+            logger.info(f"{provider} 试探请求成功，恢复请求")
+            metrics.inc("news_circuit_breaker_total", provider=provider, event="closed")
+
+    def trip(self, provider: str, reason: str) -> None:
+        """立即熔断提供商（如接口返回配额用尽）"""
+        breaker = self.breakers.get(provider)
+        if breaker is not None and breaker.trip():
+            logger.warning(f"{provider} {reason}，熔断 {breaker.cooldown:.0f} 秒")
+            metrics.inc("news_circuit_breaker_total", provider=provider, event="open")
+            self.save()
+
+    def is_open(self, provider: str) -> bool:
+        """提供商是否处于熔断中"""
+        breaker = self.breakers.get(provider)
+        return breaker is not None and breaker.is_open()
+
+    def save(self) -> None:
+        """保存各提供商的并发上限、延迟基线和熔断状态"""
+        with self.lock:
+            states = dict(self.saved)
+            for provider in sorted(set(self.limiters) | set(self.breakers)):
+                state = dict(states.get(provider) or {})
+                limiter = self.limiters.get(provider)
+                if limiter is not None:
+                    state.update({"limit": round(limiter.limit, 2), "baseline": round(limiter.baseline, 4) if limiter.baseline else None})
+                breaker = self.breakers.get(provider)
+                if breaker is not None:
+                    state.update({"failures": breaker.failures, "openUntil": breaker.open_until,
+                                  "cooldown": breaker.cooldown})
+                state["updatedAt"] = datetime.now().isoformat()
+                states[provider] = state
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=os.path.dirname(self.path) or ".")
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(states, f, ensure_ascii=False, indent=2)
+                os.replace(tmp_path, self.path)
+                self.saved = states
+            except Exception as e:
+                logger.warning(f"保存提供商状态失败: {e}")
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+新闻图片本地缓存
+
+抓取完成后并发下载新闻的 imageUrl，校验是否为有效图片，按内容哈希去重并缩放为固定宽度的缩略图，
+保存到 public/ 下按内容寻址的目录中，并将 imageUrl 改写为本地路径：
+
+    <imagePath>/<哈希前两位>/<哈希>.<宽度>.jpg
+
+imageUrl 指向最大尺寸，其余尺寸文件名只有宽度不同。文件名包含内容哈希，可长期缓存。
+URL 与图片的对应关系和访问时间记录在索引数据库中，总容量超限时按LRU淘汰。
+未安装 Pillow 时不缩放，按原格式保存原图。
+"""
+
+import io
+import os
+import time
+import hashlib
+import logging
+import sqlite3
+import tempfile
+import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+
+# Pillow为可选依赖，未安装时只校验并保存原图
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+logger = logging.getLogger("news_scraper")
+
+# 失效图片的URL记录有效期（秒），过期后重新检查
+DEAD_URL_TTL = 24 * 60 * 60
+
+# 宽或高小于该值的图片视为跟踪像素或占位图
+MIN_IMAGE_SIZE = 32
+
+# 缩略图的JPEG质量
+JPEG_QUALITY = 82
+
+# 未安装Pillow时，按文件头识别的图片格式
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+    (b"GIF87a", ".gif"),
+    (b"GIF89a", ".gif"),
+)
+
+
+class ImageError(Exception):
+    """图片无效（返回非图片内容、尺寸过小或超出大小限制），原链接不再使用"""
+
+
+def _sniff_extension(data: bytes) -> Optional[str]:
+    """根据文件头判断图片格式"""
+    for signature, extension in IMAGE_SIGNATURES:
+        if data.startswith(signature):
+            return extension
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return ".webp"
+    return None
+
+
+def _write_file(path: str, data: bytes) -> None:
+    """原子写入文件"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(path))
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class ImageCache:
+    """按内容寻址的新闻图片缓存"""
+
+    def __init__(self, cache_dir: str, index_path: str, url_prefix: str, sizes: List[int],
+                 max_bytes: int, concurrency: int = 8, max_image_bytes: int = 5 * 1024 * 1024,
+                 timeout: Tuple[float, float] = (5, 10)):
+        """初始化缓存"""
+        self.cache_dir = cache_dir
+        self.url_prefix = url_prefix.rstrip("/")
+        self.sizes = sorted(set(int(size) for size in sizes)) or [960]
+        self.max_bytes = max_bytes
+        self.concurrency = max(1, concurrency)
+        self.max_image_bytes = max_image_bytes
+        self.timeout = timeout
+
+        adapter = HTTPAdapter(pool_connections=self.concurrency, pool_maxsize=self.concurrency)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Accept": "image/*", "User-Agent": "Mozilla/5.0 (compatible; news-scraper)"})
+
+        os.makedirs(os.path.dirname(index_path) or ".", exist_ok=True)
+        # 缓存由写入线程创建和使用（守护进程每轮的写入线程不同），结束时在主线程中淘汰和关闭；同一时刻只有一个线程使用
+        self.conn = sqlite3.connect(index_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS image_urls (
+            url TEXT PRIMARY KEY,
+            hash TEXT,
+            checked_at REAL NOT NULL
+        )
+        """)
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS image_blobs (
+            hash TEXT PRIMARY KEY,
+            path TEXT NOT NULL,
+            bytes INTEGER NOT NULL,
+            accessed_at REAL NOT NULL
+        )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_image_urls_hash ON image_urls(hash)")
+        self.conn.commit()
+
+    def process(self, news_items: List[Dict[str, Any]]) -> Dict[str, int]:
+        """下载新闻图片并将 imageUrl 改写为本地路径，返回各结果的URL数"""
+        stats = {"cached": 0, "fetched": 0, "dead": 0, "error": 0}
+        urls = list(dict.fromkeys(
+            item["imageUrl"] for item in news_items
+            if (item.get("imageUrl") or "").startswith(("http://", "https://"))
+        ))
+        if not urls:
+            return stats
+
+        # 已知的URL直接使用索引中的结果
+        resolved: Dict[str, Optional[str]] = {}
+        now = time.time()
+        for url in urls:
+            row = self.conn.execute(
+                "SELECT u.hash, u.checked_at, b.path FROM image_urls AS u "
+                "LEFT JOIN image_blobs AS b ON b.hash = u.hash WHERE u.url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                continue
+            image_hash, checked_at, path = row
+            if image_hash is None and now - checked_at < DEAD_URL_TTL:
+                resolved[url] = None
+                stats["dead"] += 1
+            elif path is not None:
+                resolved[url] = path
+                stats["cached"] += 1
+
+        pending = [url for url in urls if url not in resolved]
+        if pending:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                for url, result in zip(pending, executor.map(self._fetch, pending)):
+                    if result is False:
+                        # 网络错误或服务端错误，保留原链接，下次再试
+                        stats["error"] += 1
+                        continue
+                    if result is None:
+                        stats["dead"] += 1
+                        self.conn.execute(
+                            "INSERT OR REPLACE INTO image_urls (url, hash, checked_at) VALUES (?, NULL, ?)", (url, now)
+                        )
+                    else:
+                        stats["fetched"] += 1
+                        image_hash, path, size = result
+                        self.conn.execute(
+                            "INSERT OR IGNORE INTO image_blobs (hash, path, bytes, accessed_at) VALUES (?, ?, ?, ?)",
+                            (image_hash, path, size, now)
+                        )
+                        self.conn.execute(
+                            "INSERT OR REPLACE INTO image_urls (url, hash, checked_at) VALUES (?, ?, ?)",
+                            (url, image_hash, now)
+                        )
+                        result = self.conn.execute(
+                            "SELECT path FROM image_blobs WHERE hash = ?", (image_hash,)
+                        ).fetchone()[0]
+                    resolved[url] = result
+
+        # 本轮用到的图片刷新访问时间
+        self.conn.executemany(
+            "UPDATE image_blobs SET accessed_at = ? WHERE path = ?",
+            [(now, path) for path in set(resolved.values()) if path]
+        )
+        self.conn.commit()
+
+        for item in news_items:
+            url = item.get("imageUrl") or ""
+            if url in resolved:
+                path = resolved[url]
+                # 失效的图片清空链接，前端不显示封面
+                item["imageUrl"] = f"{self.url_prefix}/{path}" if path else ""
+        return stats
+
+    def _fetch(self, url: str):
+        """下载并保存一张图片：成功返回 (哈希, 相对路径, 字节数)，图片失效返回None，可重试的错误返回False"""
+        try:
+            with self.session.get(url, timeout=self.timeout, stream=True) as response:
+                # 404、403（防盗链）等客户端错误视为图片失效
+                if 400 <= response.status_code < 500 and response.status_code != 429:
+                    return None
+                if response.status_code != 200:
+                    return False
+                # 先根据响应头校验，不下载非图片或过大的内容
+                content_type = response.headers.get("Content-Type", "")
+                if content_type and not content_type.startswith(("image/", "application/octet-stream", "binary/")):
+                    raise ImageError(f"非图片内容: {content_type}")
+                length = response.headers.get("Content-Length")
+                if length and length.isdigit() and int(length) > self.max_image_bytes:
+                    raise ImageError(f"图片过大: {length} 字节")
+                chunks = []
+                received = 0
+                for chunk in response.iter_content(64 * 1024):
+                    received += len(chunk)
+                    if received > self.max_image_bytes:
+                        raise ImageError(f"图片超过 {self.max_image_bytes} 字节")
+                    chunks.append(chunk)
+            data = b"".join(chunks)
+            return self._store(data)
+        except ImageError as e:
+            logger.info(f"图片无效 {url}: {e}")
+            return None
+        except (requests.RequestException, OSError) as e:
+            logger.warning(f"下载图片失败 {url}: {e}")
+            return False
+
+    def _store(self, data: bytes) -> Tuple[str, str, int]:
+        """按内容哈希保存图片及各尺寸缩略图，返回 (哈希, 相对路径, 写入字节数)"""
+        image_hash = hashlib.sha256(data).hexdigest()[:32]
+        directory = os.path.join(self.cache_dir, image_hash[:2])
+
+        if Image is None:
+            extension = _sniff_extension(data)
+            if extension is None:
+                raise ImageError("无法识别的图片格式")
+            name = f"{image_hash}{extension}"
+            _write_file(os.path.join(directory, name), data)
+            return image_hash, f"{image_hash[:2]}/{name}", len(data)
+
+        try:
+            image = Image.open(io.BytesIO(data))
+            image.load()
+        except Exception as e:
+            raise ImageError(f"无法解析图片: {e}")
+        if min(image.size) < MIN_IMAGE_SIZE:
+            raise ImageError(f"图片尺寸过小: {image.size[0]}x{image.size[1]}")
+
+        if image.mode != "RGB":
+            # 透明背景填充为白色
+            rgba = image.convert("RGBA")
+            image = Image.new("RGB", rgba.size, (255, 255, 255))
+            image.paste(rgba, mask=rgba.split()[3])
+
+        total = 0
+        name = ""
+        for width in self.sizes:
+            # 不放大小图，缩略图文件名仍按固定宽度命名，路径可预测
+            thumbnail = image
+            if image.width > width:
+                thumbnail = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+            buffer = io.BytesIO()
+            thumbnail.save(buffer, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+            name = f"{image_hash}.{width}.jpg"
+            _write_file(os.path.join(directory, name), buffer.getvalue())
+            total += buffer.tell()
+        return image_hash, f"{image_hash[:2]}/{name}", total
+
+    def evict(self) -> None:
+        """超出容量时按最近使用时间淘汰图片文件"""
+        total = self.conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM image_blobs").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        removed = 0
+        for image_hash, size in self.conn.execute(
+            "SELECT hash, bytes FROM image_blobs ORDER BY accessed_at"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            directory = os.path.join(self.cache_dir, image_hash[:2])
+            if os.path.isdir(directory):
+                for name in os.listdir(directory):
+                    if name.startswith(image_hash + "."):
+                        os.remove(os.path.join(directory, name))
+            self.conn.execute("DELETE FROM image_urls WHERE hash = ?", (image_hash,))
+            self.conn.execute("DELETE FROM image_blobs WHERE hash = ?", (image_hash,))
+            total -= size
+            removed += 1
+        self.conn.commit()
+        logger.info(f"图片缓存超出容量，已淘汰 {removed} 张图片")
+
+    def close(self) -> None:
+        """淘汰超量图片并关闭缓存"""
+        self.evict()
+        self.session.close()
+        self.conn.close()
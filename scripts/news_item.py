@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+紧凑的新闻条目表示
+
+抓取和API接口之间传递的新闻仍为字典（NewsItem），合并大量历史数据时改用 NewsRecord：
+固定字段使用 __slots__ 存储，来源、标签和图片链接等大量重复的字符串经过驻留只保存一份，
+标签保存为元组。JSON文件逐条解析为 NewsRecord，不会同时持有整个文件的字典对象。
+本模块不依赖抓取脚本，API提供商模块也从这里导入 NewsItem 和 parse_datetime。
+"""
+
+import re
+import sys
+import json
+import hashlib
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+
+# 定义新闻项类型
+NewsItem = Dict[str, Any]
+
+# 固定字段，顺序与写出的JSON一致
+FIELDS = ("id", "title", "source", "link", "publishedAt", "tags", "imageUrl", "content")
+FIELD_SET = frozenset(FIELDS)
+
+# 参与内容哈希的字段（标签单独按集合比较）
+HASH_FIELDS = ("title", "source", "publishedAt", "imageUrl", "content")
+
+# 增量解析JSON数组时每次读取的字符数
+READ_CHUNK_CHARS = 64 * 1024
+
+# 数组元素之间的空白和分隔符
+_SEPARATOR = re.compile(r"[\s,]*")
+
+
+def parse_datetime(value: str) -> Optional[datetime]:
+    """解析ISO格式时间，统一转换为UTC时区；无法解析时返回None"""
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def _intern(value: Any) -> Any:
+    """驻留重复率高的字符串"""
+    return sys.intern(value) if type(value) is str else value
+
+
+def _intern_tags(tags: Any) -> Tuple[Any, ...]:
+    """标签转换为驻留字符串的元组"""
+    if not isinstance(tags, (list, tuple)):
+        return ()
+    return tuple(_intern(tag) for tag in tags)
+
+
+def normalize_tags(tags: Any) -> List[str]:
+    """规范化标签：去掉首尾空白和空标签，保持首次出现的顺序去重"""
+    if not isinstance(tags, (list, tuple)):
+        return []
+    return list(dict.fromkeys(tag.strip() for tag in tags if isinstance(tag, str) and tag.strip()))
+
+
+def content_hash(item: Dict[str, Any]) -> str:
+    """新闻内容字段的哈希，用于判断再次抓取到的新闻是否有变化"""
+    payload = json.dumps([item.get(field) for field in HASH_FIELDS], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class NewsRecord:
+    """使用 __slots__ 存储的新闻条目，字典中的其他字段保存在 extra 中"""
+
+    __slots__ = FIELDS + ("extra",)
+
+    def __init__(self, id: Optional[int] = None, title: str = "", source: str = "", link: str = "",
+                 publishedAt: Optional[str] = None, tags: Tuple[str, ...] = (), imageUrl: str = "",
+                 content: str = "", extra: Optional[Dict[str, Any]] = None):
+        """初始化新闻条目"""
+        self.id = id
+        self.title = title
+        self.source = source
+        self.link = link
+        self.publishedAt = publishedAt
+        self.tags = tags
+        self.imageUrl = imageUrl
+        self.content = content
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, item: Dict[str, Any]) -> "NewsRecord":
+        """从新闻字典创建"""
+        extra = None
+        if not item.keys() <= FIELD_SET:
+            extra = {key: value for key, value in item.items() if key not in FIELD_SET}
+        return cls(
+            item.get("id"),
+            item.get("title", ""),
+            _intern(item.get("source", "")),
+            item.get("link", ""),
+            item.get("publishedAt"),
+            _intern_tags(item.get("tags", [])),
+            _intern(item.get("imageUrl", "")),
+            item.get("content", ""),
+            extra
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为新闻字典"""
+        item = {
+            "id": self.id,
+            "title": self.title,
+            "source": self.source,
+            "link": self.link,
+            "publishedAt": self.publishedAt,
+            "tags": list(self.tags),
+            "imageUrl": self.imageUrl,
+            "content": self.content
+        }
+        if self.id is None:
+            del item["id"]
+        if self.extra:
+            item.update(self.extra)
+        return item
+
+    def update(self, item: Dict[str, Any]) -> bool:
+        """用新抓取的新闻覆盖字段，标签合并（保持原有顺序），返回内容是否有变化"""
+        changed = False
+        for key, value in item.items():
+            if key == "tags" or key == "id":
+                continue
+            if key in FIELD_SET:
+                if getattr(self, key) != value:
+                    setattr(self, key, _intern(value) if key in ("source", "imageUrl") else value)
+                    changed = True
+            else:
+                if self.extra is None:
+                    self.extra = {}
+                if key not in self.extra or self.extra[key] != value:
+                    self.extra[key] = value
+                    changed = True
+        added = tuple(tag for tag in dict.fromkeys(_intern_tags(item.get("tags", []))) if tag not in self.tags)
+        if added:
+            self.tags += added
+            changed = True
+        return changed
+
+
+def iter_json_array(path: str) -> Iterator[Dict[str, Any]]:
+    """逐条解析JSON数组文件中的对象，内存占用与单条记录大小相关"""
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer = f.read(READ_CHUNK_CHARS)
+        pos = 0
+        eof = not buffer
+        started = False
+        while True:
+            # 跳过空白、数组开头和分隔符
+            pos = _SEPARATOR.match(buffer, pos).end()
+            if not started and pos < len(buffer) and buffer[pos] == "[":
+                started = True
+                pos = _SEPARATOR.match(buffer, pos + 1).end()
+            if pos >= len(buffer):
+                if eof:
+                    return
+                buffer, pos = f.read(READ_CHUNK_CHARS), 0
+                eof = not buffer
+                continue
+            if buffer[pos] == "]":
+                return
+            if not started:
+                raise ValueError(f"不是JSON数组: {path}")
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except ValueError:
+                # 记录跨越读取边界，继续读取后重新解析
+                chunk = f.read(READ_CHUNK_CHARS)
+                if not chunk:
+                    raise
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            # 数字等标量没有结束符，后面不是分隔符时可能被读取边界截断，读取更多后重新解析
+            if not eof and not isinstance(value, (dict, list, str)) and (
+                    end == len(buffer) or not (buffer[end].isspace() or buffer[end] in ",]")):
+                chunk = f.read(READ_CHUNK_CHARS)
+                eof = not chunk
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            pos = end
+            yield value
+
+
+def load_records(path: str) -> List[NewsRecord]:
+    """读取JSON数组文件为 NewsRecord 列表"""
+    return [NewsRecord.from_dict(item) for item in iter_json_array(path) if isinstance(item, dict)]
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+多关键词匹配
+
+使用 Aho-Corasick 自动机，扫描一遍文本即可找出其中出现的所有关键词，
+耗时只与文本长度和命中数有关，与关键词数量无关。
+匹配不区分大小写（casefold），结果与逐个关键词做子串判断一致。
+whole_words 为True时，英文字母和数字开头或结尾的关键词只在词边界处匹配（允许复数后缀 s/es），
+避免 "AI" 匹配到 "said"；中文等没有空格分词的文字仍按子串匹配。
+"""
+
+from collections import deque
+from typing import List, Dict, Iterable, Tuple
+
+
+class KeywordMatcher:
+    """在文本中查找多个关键词"""
+
+    def __init__(self, keywords: Iterable[str], whole_words: bool = False):
+        """根据关键词构建自动机，空关键词被忽略，重复的关键词只保留一个"""
+        self.keywords: List[str] = list(dict.fromkeys(keyword for keyword in keywords if keyword))
+        self.whole_words = whole_words
+        self.folded: List[str] = [keyword.casefold() for keyword in self.keywords]
+        # 状态转移表、失败指针，以及到达每个状态时匹配到的关键词序号
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[Tuple[int, ...]] = [()]
+
+        for index, keyword in enumerate(self.folded):
+            state = 0
+            for char in keyword:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(())
+                state = next_state
+            self.output[state] += (index,)
+
+        # 按层次计算失败指针，并把失败状态上的关键词合并到当前状态
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.output[next_state] += self.output[self.fail[next_state]]
+
+    def match(self, text: str) -> List[str]:
+        """返回文本中出现的关键词，按构建时的顺序排列"""
+        goto, fail, output = self.goto, self.fail, self.output
+        text = text.casefold()
+        found = set()
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                if self.whole_words:
+                    found.update(index for index in output[state] if self._at_boundary(text, position, index))
+                else:
+                    found.update(output[state])
+        return [self.keywords[index] for index in sorted(found)]
+
+    def _at_boundary(self, text: str, end: int, index: int) -> bool:
+        """判断在 end 处结束的关键词两侧是否为词边界"""
+        keyword = self.folded[index]
+        start = end - len(keyword) + 1
+        if _is_word_char(keyword[0]) and start > 0 and _is_word_char(text[start - 1]):
+            return False
+        if not _is_word_char(keyword[-1]):
+            return True
+        # 允许复数后缀
+        rest = text[end + 1:end + 4]
+        for suffix in ("", "s", "es"):
+            if rest.startswith(suffix) and not (len(rest) > len(suffix) and _is_word_char(rest[len(suffix)])):
+                return True
+        return False
+
+
+def _is_word_char(char: str) -> bool:
+    """英文字母和数字"""
+    return char.isascii() and char.isalnum()
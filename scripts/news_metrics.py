@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+新闻抓取运行指标
+
+线程安全的计数器、仪表和直方图，在抓取、解析和存储的热点路径上记录耗时与条数。
+指标可导出为 Prometheus 文本格式（textfile 或守护进程模式下的 /metrics 接口），
+每轮抓取结束时输出JSON摘要。
+"""
+
+import os
+import json
+import time
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Tuple, Iterator, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+# 直方图默认分桶上界（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# 指标定义：名称 -> (类型, 说明)
+METRICS: Dict[str, Tuple[str, str]] = {
+    "news_search_seconds": ("histogram", "单个关键词搜索（含多源合并）耗时"),
+    "news_fuse_seconds": ("histogram", "多源结果合并去重耗时"),
+    "news_provider_search_seconds": ("histogram", "单个提供商搜索耗时"),
+    "news_provider_items_total": ("counter", "提供商返回的新闻条数"),
+    "news_provider_kept_total": ("counter", "合并去重后保留的新闻条数"),
+    "news_provider_errors_total": ("counter", "提供商搜索失败次数"),
+    "news_http_request_seconds": ("histogram", "单次HTTP请求耗时"),
+    "news_http_requests_total": ("counter", "HTTP请求次数（按状态码）"),
+    "news_http_retries_total": ("counter", "HTTP请求重试次数"),
+    "news_http_response_bytes_total": ("counter", "下载的响应体字节数"),
+    "news_cache_requests_total": ("counter", "响应缓存查询次数（按结果）"),
+    "news_zhipu_parse_seconds": ("histogram", "智谱清言回复的JSON提取耗时"),
+    "news_zhipu_parse_total": ("counter", "智谱清言回复的JSON提取次数（按结果）"),
+    "news_zhipu_first_item_seconds": ("histogram", "智谱清言请求开始到解析出第一条新闻的耗时"),
+    "news_zhipu_batch_keywords_total": ("counter", "智谱清言批量请求覆盖和需要单独请求的关键词数"),
+    "news_query_plan_requests_total": ("counter", "合并OR查询前后计划的请求数（naive为逐个关键词请求/packed为合并后）"),
+    "news_query_plan_items_total": ("counter", "合并查询返回的新闻条数（归属到关键词/无法归属）"),
+    "news_queue_jobs_total": ("counter", "共享任务队列的任务数（领取/接管过期租约/完成/租约被接管）"),
+    "news_provider_concurrency_limit": ("gauge", "各提供商的自适应并发上限"),
+    "news_circuit_breaker_total": ("counter", "熔断器事件（熔断/恢复/拒绝的请求/跳过的关键词）"),
+    "news_storage_save_seconds": ("histogram", "保存一批新闻的耗时"),
+    "news_storage_rows_total": ("counter", "保存的新闻行数（新增/更新/无变化跳过）"),
+    "news_storage_errors_total": ("counter", "保存失败次数"),
+    "news_images_total": ("counter", "新闻图片处理结果（命中缓存/新下载/失效/下载失败）"),
+    "news_enrich_total": ("counter", "新闻原文抓取结果（新抓取/未变化/无正文/robots禁止/失效/失败）"),
+    "news_stage_seconds": ("histogram", "每轮抓取各阶段耗时（抓取/图片/保存/正文/导出）"),
+    "news_runs_total": ("counter", "抓取轮数"),
+    "news_last_run_timestamp_seconds": ("gauge", "最近一轮抓取结束的时间戳"),
+    "news_last_run_items": ("gauge", "最近一轮抓取保存的新闻条数")
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    """将标签转换为可哈希的键"""
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    """格式化Prometheus标签"""
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _summary_key(key: LabelKey) -> str:
+    """JSON摘要中的标签键，如 provider=brave,status=200"""
+    return ",".join(f"{name}={value}" for name, value in key) or "total"
+
+
+class MetricsRegistry:
+    """指标注册表，线程安全"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """初始化注册表"""
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.counters: Dict[str, Dict[LabelKey, float]] = {}
+        self.gauges: Dict[str, Dict[LabelKey, float]] = {}
+        # 直方图的值为 [各分桶计数..., 总和, 次数]
+        self.histograms: Dict[str, Dict[LabelKey, List[float]]] = {}
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        """增加计数器"""
+        key = _label_key(labels)
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels: Any) -> None:
+        """设置仪表值"""
+        with self.lock:
+            self.gauges.setdefault(name, {})[_label_key(labels)] = value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """记录一次直方图观测值"""
+        key = _label_key(labels)
+        with self.lock:
+            series = self.histograms.setdefault(name, {})
+            values = series.get(key)
+            if values is None:
+                values = series[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    values[i] += 1
+                    break
+            values[-2] += value
+            values[-1] += 1
+
+    @contextmanager
+    def timer(self, name: str, **labels: Any) -> Iterator[None]:
+        """计时上下文，结束时记录耗时（异常时同样记录）"""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(name, time.monotonic() - start, **labels)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """获取当前所有指标的副本，用于计算一轮抓取的增量"""
+        with self.lock:
+            return {
+                "counters": {name: dict(series) for name, series in self.counters.items()},
+                "histograms": {name: {key: list(values) for key, values in series.items()} for name, series in self.histograms.items()}
+            }
+
+    def _percentile(self, values: List[float], ratio: float) -> Optional[float]:
+        """根据分桶估算分位数（返回所在分桶的上界）"""
+        target = values[-1] * ratio
+        cumulative = 0.0
+        for bound, count in zip(self.buckets, values):
+            cumulative += count
+            if cumulative >= target:
+                return bound
+        return None
+
+    def summary(self, since: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """生成JSON摘要；传入snapshot()的结果时只统计此后的增量"""
+        current = self.snapshot()
+        since = since or {"counters": {}, "histograms": {}}
+        result: Dict[str, Any] = {}
+
+        for name, series in current["counters"].items():
+            previous = since["counters"].get(name, {})
+            entries = {
+                _summary_key(key): value - previous.get(key, 0)
+                for key, value in series.items()
+                if value - previous.get(key, 0)
+            }
+            if entries:
+                result[name] = entries
+
+        for name, series in current["histograms"].items():
+            previous = since["histograms"].get(name, {})
+            entries = {}
+            for key, values in series.items():
+                old = previous.get(key)
+                delta = [value - old[i] for i, value in enumerate(values)] if old else values
+                if not delta[-1]:
+                    continue
+                entries[_summary_key(key)] = {
+                    "count": int(delta[-1]),
+                    "sum": round(delta[-2], 3),
+                    "avg": round(delta[-2] / delta[-1], 4),
+                    "p95": self._percentile(delta, 0.95)
+                }
+            if entries:
+                result[name] = entries
+
+        with self.lock:
+            for name, series in self.gauges.items():
+                result[name] = {_summary_key(key): value for key, value in series.items()}
+        return result
+
+    def render_prometheus(self) -> str:
+        """导出为Prometheus文本格式"""
+        lines = []
+        with self.lock:
+            for metric_type, metrics in (("counter", self.counters), ("gauge", self.gauges), ("histogram", self.histograms)):
+                for name in sorted(metrics):
+                    help_text = METRICS.get(name, (metric_type, ""))[1]
+                    lines.append(f"# HELP {name} {help_text}")
+                    lines.append(f"# TYPE {name} {metric_type}")
+                    for key, value in sorted(metrics[name].items()):
+                        if metric_type != "histogram":
+                            lines.append(f"{name}{_format_labels(key)} {value}")
+                            continue
+                        cumulative = 0.0
+                        for bound, count in zip(self.buckets, value):
+                            cumulative += count
+                            lines.append(f"{name}_bucket{_format_labels(key, ('le', str(bound)))} {cumulative}")
+                        lines.append(f"{name}_bucket{_format_labels(key, ('le', '+Inf'))} {value[-1]}")
+                        lines.append(f"{name}_sum{_format_labels(key)} {value[-2]}")
+                        lines.append(f"{name}_count{_format_labels(key)} {value[-1]}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str) -> None:
+        """原子写入Prometheus textfile（供node_exporter的textfile收集器读取）"""
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".prom", dir=directory)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp_path, path)
+
+    def serve(self, port: int, host: str = "0.0.0.0") -> "ThreadingHTTPServer":
+        """在后台线程启动 /metrics HTTP接口"""
+        # 只有守护进程开启指标接口时才需要，不在导入时加载 http.server
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            """Prometheus抓取接口"""
+
+            def log_message(self, format, *args):
+                """不输出访问日志"""
+
+            def do_GET(self):
+                """返回指标"""
+                if self.path.split("?")[0] == "/metrics":
+                    body, status, content_type = registry.render_prometheus().encode('utf-8'), 200, "text/plain; version=0.0.4; charset=utf-8"
+                elif self.path.split("?")[0] == "/summary":
+                    body, status, content_type = json.dumps(registry.summary(), ensure_ascii=False).encode('utf-8'), 200, "application/json"
+                else:
+                    body, status, content_type = b"not found\n", 404, "text/plain"
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+# 全局注册表，API、存储和抓取器共享
+metrics = MetricsRegistry()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+抓取结果的流式写入
+
+抓取线程按关键词顺序把每个任务的新闻交给 BatchWriter，按条数或时间攒成小批，
+由后台写入线程依次完成下载图片、保存和提交增量抓取高水位，不再等全部关键词抓取完成后一次保存：
+- 内存中只保留尚未写入的小批，峰值内存与本轮的关键词数无关
+- 等待写入的小批数有上限，写入跟不上时 put 阻塞，抓取随之暂停（背压）
+- 同一任务的新闻总在同一批中，每批保存成功后才提交其中任务的高水位，
+  运行中途崩溃时已保存的新闻不会丢失，未保存的任务下次重新抓取
+"""
+
+import time
+import queue
+import logging
+import threading
+from typing import List, Any, Callable, Optional
+
+from news_item import NewsItem
+
+logger = logging.getLogger("news_scraper")
+
+
+class BatchWriter:
+    """后台写入线程，按小批调用 write(新闻, 任务列表)"""
+
+    def __init__(self, write: Callable[[List[NewsItem], List[Any]], None], batch_size: int,
+                 batch_seconds: float, max_pending: int = 2):
+        """初始化并启动写入线程，max_pending为等待写入的最大批数"""
+        self.write = write
+        self.batch_size = max(1, batch_size)
+        self.batch_seconds = batch_seconds
+        self.queue: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=max(1, max_pending))
+        self.items: List[NewsItem] = []
+        self.jobs: List[Any] = []
+        self.started_at = time.monotonic()
+        self.batches = 0
+        self.thread = threading.Thread(target=self._run, name="news-writer", daemon=True)
+        self.thread.start()
+
+    def put(self, items: List[NewsItem], job: Any) -> None:
+        """加入一个任务的新闻，达到批量条数或时间时交给写入线程，写入线程积压时阻塞"""
+        self.items.extend(items)
+        self.jobs.append(job)
+        if len(self.items) >= self.batch_size or time.monotonic() - self.started_at >= self.batch_seconds:
+            self.flush()
+
+    def flush(self) -> None:
+        """将当前小批交给写入线程"""
+        if not self.jobs:
+            return
+        self.queue.put((self.items, self.jobs))
+        self.items, self.jobs = [], []
+        self.started_at = time.monotonic()
+
+    def close(self) -> None:
+        """写入剩余的新闻并等待写入线程结束"""
+        self.flush()
+        self.queue.put(None)
+        self.thread.join()
+
+    def _run(self) -> None:
+        """写入线程：逐批调用 write，单批失败不影响后续批次"""
+        while True:
+            batch = self.queue.get()
+            if batch is None:
+                return
+            items, jobs = batch
+            self.batches += 1
+            try:
+                self.write(items, jobs)
+            except Exception as e:
+                logger.error(f"写入第 {self.batches} 批新闻失败: {e}")
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+新闻API提供商注册表
+
+每个提供商是 news_providers.base.Provider 的子类，放在单独的模块中，只有被选用时才导入，
+未使用的提供商（及其依赖）不会拖慢启动。提供商按以下顺序查找：
+    1. 设置项 providerPlugins 中的 "名称": "模块:类"（模块需在Python路径中）
+    2. 内置提供商 BUILTIN_PROVIDERS
+    3. 已安装的Python包在 news_scraper.providers 入口点组中注册的提供商
+第三方提供商只需实现 Provider 子类并通过以上任一方式注册，无需修改 NewsAPI。
+"""
+
+import logging
+import importlib
+import threading
+from typing import Dict, List, Optional, Type
+
+logger = logging.getLogger("news_scraper")
+
+# 内置提供商：名称 -> "模块:类"
+BUILTIN_PROVIDERS: Dict[str, str] = {
+    "brave": "news_providers.brave:BraveProvider",
+    "bing": "news_providers.bing:BingProvider",
+    "baidu": "news_providers.baidu:BaiduProvider",
+    "juhe": "news_providers.juhe:JuheProvider",
+    "newsapi": "news_providers.newsapi:NewsApiProvider",
+    "zhipu": "news_providers.zhipu:ZhipuProvider"
+}
+
+# 第三方包注册提供商使用的入口点组
+ENTRY_POINT_GROUP = "news_scraper.providers"
+
+# 已导入的提供商类（按 "模块:类"）和入口点的查找结果（按名称）
+_loaded: Dict[str, type] = {}
+_entry_targets: Dict[str, Optional[str]] = {}
+_lock = threading.Lock()
+
+
+def _entry_point_target(name: str) -> Optional[str]:
+    """在已安装包的入口点中查找提供商，只在内置和设置中都没有时才扫描"""
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:
+        return None
+    eps = entry_points()
+    # Python 3.10+ 支持按组筛选，之前的版本返回按组分类的字典
+    group = eps.select(group=ENTRY_POINT_GROUP) if hasattr(eps, "select") else eps.get(ENTRY_POINT_GROUP, [])
+    for ep in group:
+        if ep.name == name:
+            return ep.value
+    return None
+
+
+def provider_names(plugins: Optional[Dict[str, str]] = None) -> List[str]:
+    """内置和设置中注册的提供商名称（不扫描入口点）"""
+    return list(dict.fromkeys([*BUILTIN_PROVIDERS, *(plugins or {})]))
+
+
+def load_provider(name: str, plugins: Optional[Dict[str, str]] = None) -> Type:
+    """导入并返回提供商类，未知的提供商抛出 ValueError"""
+    with _lock:
+        target = (plugins or {}).get(name) or BUILTIN_PROVIDERS.get(name)
+        if not target:
+            if name not in _entry_targets:
+                _entry_targets[name] = _entry_point_target(name)
+            target = _entry_targets[name]
+        if not target:
+            raise ValueError(f"不支持的API提供商: {name}")
+        provider_class = _loaded.get(target)
+        if provider_class is None:
+            module_name, _, attr = target.partition(":")
+            provider_class = getattr(importlib.import_module(module_name), attr)
+            _loaded[target] = provider_class
+            logger.debug(f"已加载API提供商 {name}: {target}")
+        return provider_class
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""百度资讯搜索（模拟）"""
+
+import logging
+from datetime import datetime
+from typing import List
+
+from news_item import NewsItem
+from news_providers.base import Provider
+
+logger = logging.getLogger("news_scraper")
+
+
+class BaiduProvider(Provider):
+    """使用百度资讯搜索API（模拟）"""
+
+    label = "百度"
+    rate_limit = None
+
+    def fetch(self, keyword: str) -> List[NewsItem]:
+        """返回模拟数据"""
+        # 注意：百度没有官方新闻API，这里仅作为示例
+        # 实际使用时可能需要使用网页爬虫或其他方法
+        logger.warning("⚠️  百度搜索API为模拟实现，返回的是假数据！")
+        logger.warning("⚠️  如需真实新闻数据，请参考 JUHE_API_SETUP.md 配置聚合数据API")
+
+        results = []
+        for i in range(5):  # 模拟5条结果
+            results.append({
+                "title": f"⚠️ [假数据] 关于{keyword}的模拟新闻 #{i+1}",
+                "source": "模拟数据源（非真实）",
+                "link": f"https://example.com/fake-news/{i}",
+                "publishedAt": datetime.now().isoformat(),
+                "tags": [keyword, "模拟数据"],
+                "imageUrl": "https://via.placeholder.com/300x200/ff6b6b/ffffff?text=FAKE+DATA",
+                "content": f"⚠️ 这是模拟的假数据！关于{keyword}的虚假新闻内容。如需真实数据请配置聚合数据API。#{i+1}"
+            })
+        return results
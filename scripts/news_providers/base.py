@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+新闻API提供商基类
+
+提供商在类属性中声明默认接口地址、API密钥的环境变量、限速、读取超时、缓存有效期和最大并发数，
+这些默认值可被 settings.json 中的 apiUrls、rateLimits、readTimeout、cacheTtl、maxConcurrency 覆盖。
+分页的提供商实现 fetch_page（增量抓取和翻页由 NewsAPI.paginate 处理），
+不分页的提供商覆盖 fetch；map_item 将接口返回的单条数据转换为新闻条目。
+声明了 max_query_length 的分页提供商支持布尔OR查询：每轮抓取开始时 prepare 把关键词合并为尽量少的查询，
+合并查询的结果在本地归属回各关键词（见 news_providers.planner）。
+HTTP请求通过 NewsAPI.request 发送，共享连接池、重试、响应缓存和指标。
+"""
+
+import logging
+import threading
+from typing import List, Dict, Any, Optional
+
+from news_item import NewsItem
+from news_health import CircuitOpenError
+from news_metrics import metrics
+from news_providers.planner import QueryAttributor, QueryGroup, or_query, plan_queries
+
+logger = logging.getLogger("news_scraper")
+
+
+class Provider:
+    """新闻API提供商"""
+
+    # 日志中显示的名称
+    label = ""
+    # 默认接口地址
+    default_url = ""
+    # 读取API密钥的环境变量
+    env_key = ""
+    # 默认限速（每秒请求数），None表示不限速
+    rate_limit: Optional[float] = 1.0
+    # 默认读取超时（秒）
+    read_timeout: float = 10
+    # 默认响应缓存有效期（秒）
+    cache_ttl: int = 30 * 60
+    # 同时进行的最大请求数，None表示只受全局并发数限制
+    max_concurrency: Optional[int] = None
+    # 是否分页抓取（支持基于高水位的增量抓取）
+    paginated = False
+    # 支持布尔OR查询时单次查询的最大长度（字符），None表示不合并查询
+    max_query_length: Optional[int] = None
+    # 单次请求最多返回的条数，决定一次合并查询能容纳的关键词数
+    max_page_size: Optional[int] = None
+
+    def __init__(self, name: str, api):
+        """初始化提供商，api为发送请求的 NewsAPI"""
+        self.name = name
+        self.api = api
+        self.settings = api.settings
+        self.plan_lock = threading.Lock()
+        # 合并查询：关键词 -> 所在的查询组
+        self.groups: Dict[str, QueryGroup] = {}
+
+    @property
+    def api_key(self) -> str:
+        """API密钥"""
+        return self.api.api_keys.get(self.name, "")
+
+    @property
+    def url(self) -> str:
+        """接口地址"""
+        api_urls = self.settings.get_setting("apiUrls") or {}
+        return api_urls.get(self.name) or self.default_url
+
+    @property
+    def page_size(self) -> int:
+        """每页条数"""
+        return self.settings.get_setting("maxResults")
+
+    def prepare(self, keywords: List[str]) -> None:
+        """每轮抓取开始前调用，keywords为本轮使用该提供商的关键词，可用于合并请求；默认合并为OR查询"""
+        with self.plan_lock:
+            # 上一轮的查询计划不再有效
+            self.groups = {}
+        if not self.max_query_length or not self.settings.get_setting("queryPacking") or not self.api_key:
+            return
+
+        keywords = list(dict.fromkeys(keywords))
+        page_size = self.page_size
+        max_keywords = max(1, (self.max_page_size or page_size) // page_size)
+        plan = plan_queries(keywords, self.max_query_length, max_keywords, self.format_query)
+        groups = {}
+        for group_keywords in plan:
+            # 只有一个关键词的组按原方式请求
+            if len(group_keywords) > 1:
+                group = QueryGroup(group_keywords, self.format_query(group_keywords))
+                for keyword in group_keywords:
+                    groups[keyword] = group
+        with self.plan_lock:
+            self.groups = groups
+
+        metrics.inc("news_query_plan_requests_total", len(keywords), provider=self.name, plan="naive")
+        metrics.inc("news_query_plan_requests_total", len(plan), provider=self.name, plan="packed")
+        if len(plan) < len(keywords):
+            logger.info(f"{self.label or self.name} 合并查询: {len(keywords)} 个关键词 -> {len(plan)} 次请求，"
+                        f"比逐个关键词请求少 {len(keywords) - len(plan)} 次")
+
+    def format_query(self, keywords: List[str]) -> str:
+        """将多个关键词合并为一个查询"""
+        return or_query(keywords)
+
+    def needs_rate_limit(self, keyword: str) -> bool:
+        """搜索该关键词前是否需要获取限速令牌，已由批量请求统一限速的关键词返回False"""
+        with self.plan_lock:
+            return keyword not in self.groups
+
+    def search(self, keyword: str) -> List[NewsItem]:
+        """搜索新闻，失败时记录错误并返回空列表"""
+        try:
+            return self.fetch(keyword)
+        except CircuitOpenError as e:
+            # 请求进行中提供商被熔断，剩余的重试不再发送
+            logger.warning(f"{self.label or self.name} 搜索 '{keyword}' 中止: {e}")
+            return []
+        except Exception as e:
+            logger.error(f"{self.label or self.name} 搜索失败: {e}")
+            metrics.inc("news_provider_errors_total", provider=self.name)
+            return []
+
+    def fetch(self, keyword: str) -> List[NewsItem]:
+        """抓取新闻，默认按页抓取；已合并查询的关键词使用合并查询的结果"""
+        with self.plan_lock:
+            group = self.groups.get(keyword)
+        if group is not None:
+            results = self._fetch_group(group, keyword)
+            if results is not None:
+                return results
+            self.api.acquire(self.name)
+        return self.api.paginate(self.name, keyword, lambda page, mark: self.fetch_page(keyword, page, mark), self.page_size)
+
+    def _fetch_group(self, group: QueryGroup, keyword: str) -> Optional[List[NewsItem]]:
+        """返回合并查询中归属到该关键词的新闻，接口拒绝合并查询时返回None"""
+        with group.lock:
+            if group.results is None:
+                self.api.acquire(self.name)
+                try:
+                    group.results = self._search_group(group)
+                except Exception as e:
+                    group.results = {}
+                    metrics.inc("news_provider_errors_total", provider=self.name)
+                    status = getattr(getattr(e, "response", None), "status_code", None)
+                    if status and 400 <= status < 500 and status != 429:
+                        # 接口不接受合并的查询，同组的关键词改为单独请求
+                        group.rejected = True
+                        logger.warning(f"{self.label or self.name} 合并查询被拒绝，改为逐个关键词请求: {e}")
+                    else:
+                        # 网络或服务端错误时单独请求同样会失败，同组的关键词本轮不再重复请求
+                        logger.error(f"{self.label or self.name} 合并查询失败: {e}")
+            if group.rejected:
+                return None
+            # 每个关键词每轮只取一次，取出后释放，已保存的新闻不再留在内存中
+            return group.results.pop(keyword, [])
+
+    def _search_group(self, group: QueryGroup) -> Dict[str, List[NewsItem]]:
+        """执行合并查询，新闻归入第一个匹配的关键词（标题中出现的优先），标签为匹配的全部关键词"""
+        count = min(self.max_page_size or self.page_size, self.page_size * len(group.keywords))
+        items = self.api.paginate(self.name, group.query,
+                                  lambda page, mark: self.fetch_page(group.query, page, mark, count),
+                                  count, keywords=group.keywords)
+
+        attributor = QueryAttributor(group.keywords)
+        results: Dict[str, List[NewsItem]] = {keyword: [] for keyword in group.keywords}
+        matched_items: Dict[str, List[NewsItem]] = {keyword: [] for keyword in group.keywords}
+        unmatched = 0
+        for item in items:
+            matched = attributor.match(item)
+            if not matched:
+                # 搜索引擎可能按正文或词形变化匹配，无法确定属于哪个关键词
+                unmatched += 1
+                continue
+            item["tags"] = matched + [tag for tag in item.get("tags", []) if tag != group.query and tag not in matched]
+            results[matched[0]].append(item)
+            for keyword in matched:
+                matched_items[keyword].append(item)
+
+        # 各关键词的高水位按归属到它的新闻更新
+        if self.api.fetch_state:
+            for keyword, keyword_items in matched_items.items():
+                self.api.fetch_state.update(self.name, keyword, keyword_items)
+        metrics.inc("news_query_plan_items_total", len(items) - unmatched, provider=self.name, result="attributed")
+        metrics.inc("news_query_plan_items_total", unmatched, provider=self.name, result="unmatched")
+        logger.info(f"{self.label or self.name} 合并查询 {len(group.keywords)} 个关键词返回 {len(items)} 条新闻，"
+                    f"{unmatched} 条无法归属到关键词")
+        return results
+
+    def fetch_page(self, keyword: str, page: int, mark: Optional[Dict[str, str]],
+                   count: Optional[int] = None) -> List[NewsItem]:
+        """抓取一页新闻，mark为增量抓取的高水位（首次抓取时为None），page从0开始，
+        count为每页条数（合并查询时大于page_size，为None时使用page_size）"""
+        raise NotImplementedError
+
+    def map_item(self, keyword: str, raw: Dict[str, Any]) -> NewsItem:
+        """将接口返回的单条数据转换为新闻条目"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """释放提供商持有的资源"""
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Bing News Search API 新闻搜索"""
+
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional
+
+from news_item import NewsItem, parse_datetime
+from news_providers.base import Provider
+
+
+class BingProvider(Provider):
+    """使用Bing News Search API搜索"""
+
+    label = "Bing News API"
+    default_url = "https://api.bing.microsoft.com/v7.0/news/search"
+    env_key = "BING_API_KEY"
+    rate_limit = 3.0
+    paginated = True
+    # 查询在URL参数中，限制长度避免超出URL长度上限；每页最多100条
+    max_query_length = 500
+    max_page_size = 100
+
+    def fetch_page(self, keyword: str, page: int, mark: Optional[Dict[str, str]],
+                   count: Optional[int] = None) -> List[NewsItem]:
+        """抓取一页新闻"""
+        headers = {"Ocp-Apim-Subscription-Key": self.api_key}
+        count = count or self.page_size
+        params = {"q": keyword, "count": count, "mkt": "zh-CN"}
+        if mark:
+            # 增量抓取：按时间排序，根据高水位的时间跨度选择freshness，offset为条数
+            age = datetime.now(timezone.utc) - parse_datetime(mark["publishedAt"])
+            params["freshness"] = "Day" if age.days < 1 else "Week" if age.days < 7 else "Month"
+            params["sortBy"] = "Date"
+            params["offset"] = page * count
+
+        response = self.api.request(self.name, "GET", self.url, headers=headers, params=params)
+        response.raise_for_status()
+        return [self.map_item(keyword, item) for item in response.json().get("value", [])]
+
+    def map_item(self, keyword: str, raw: Dict[str, Any]) -> NewsItem:
+        """转换为新闻条目"""
+        return {
+            "title": raw.get("name", ""),
+            "source": raw.get("provider", [{}])[0].get("name", ""),
+            "link": raw.get("url", ""),
+            "publishedAt": raw.get("datePublished", datetime.now().isoformat()),
+            "tags": [keyword],  # 初始标签为搜索关键词
+            "imageUrl": raw.get("image", {}).get("thumbnail", {}).get("contentUrl",
+                        "https://via.placeholder.com/300x200/3b82f6/ffffff?text=News"),
+            "content": raw.get("description", "")  # 新闻内容摘要
+        }
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Brave Search API 新闻搜索"""
+
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional
+
+from news_item import NewsItem
+from news_providers.base import Provider
+from news_providers.planner import or_query
+
+
+class BraveProvider(Provider):
+    """使用Brave Search API搜索"""
+
+    label = "Brave Search API"
+    default_url = "https://api.search.brave.com/res/v1/news/search"
+    env_key = "BRAVE_API_KEY"
+    rate_limit = 1.0
+    paginated = True
+    # 查询最多400个字符，每页最多50条
+    max_query_length = 400
+    max_page_size = 50
+
+    def fetch_page(self, keyword: str, page: int, mark: Optional[Dict[str, str]],
+                   count: Optional[int] = None) -> List[NewsItem]:
+        """抓取一页新闻"""
+        headers = {"Accept": "application/json", "Accept-Encoding": "gzip", "X-Subscription-Token": self.api_key}
+        params = {"q": keyword, "count": count or self.page_size}
+        if mark:
+            # 增量抓取：只请求高水位日期之后的新闻，offset为页码
+            today = datetime.now(timezone.utc).date().isoformat()
+            params["freshness"] = f"{mark['publishedAt'][:10]}to{today}"
+            params["offset"] = page
+
+        response = self.api.request(self.name, "GET", self.url, headers=headers, params=params)
+        response.raise_for_status()
+        return [self.map_item(keyword, item) for item in response.json().get("results", [])]
+
+    def format_query(self, keywords: List[str]) -> str:
+        """合并为OR查询，Brave不支持括号分组，多个词的关键词按短语搜索"""
+        return or_query(keywords, phrase=True)
+
+    def map_item(self, keyword: str, raw: Dict[str, Any]) -> NewsItem:
+        """转换为新闻条目"""
+        return {
+            "title": raw.get("title", ""),
+            "source": raw.get("source", ""),
+            "link": raw.get("url", ""),
+            "publishedAt": raw.get("published_time", datetime.now().isoformat()),
+            "tags": [keyword],  # 初始标签为搜索关键词
+            "imageUrl": raw.get("thumbnail", {}).get("src", "https://via.placeholder.com/300x200/3b82f6/ffffff?text=News"),
+            "content": raw.get("description", raw.get("snippet", ""))  # 新闻内容摘要
+        }
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+聚合数据新闻头条API
+
+头条接口不支持关键词检索，每次返回相同的最新新闻。头条只下载一次（在缓存有效期内复用），
+再用多关键词匹配一次找出每条新闻包含的所有关键词：新闻只归入一个关键词的结果，
+标签为其匹配的全部关键词，不会因多个关键词而重复。
+"""
+
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+from news_item import NewsItem
+from news_match import KeywordMatcher
+from news_metrics import metrics
+from news_providers.base import Provider
+
+logger = logging.getLogger("news_scraper")
+
+# 每个关键词最多返回的新闻条数
+JUHE_ITEMS_PER_KEYWORD = 5
+
+# 请求次数超限的错误码（10012: 超过每日次数限制，10013: 测试KEY超过请求限制）
+JUHE_QUOTA_ERRORS = {10012, 10013}
+
+
+class JuheProvider(Provider):
+    """使用聚合数据新闻头条API"""
+
+    label = "聚合数据API"
+    default_url = "http://v.juhe.cn/toutiao/index"
+    env_key = "JUHE_API_KEY"
+    rate_limit = 1.0
+    cache_ttl = 10 * 60
+
+    def __init__(self, name: str, api):
+        """初始化提供商"""
+        super().__init__(name, api)
+        self.lock = threading.Lock()
+        # 已下载的头条、下载时间，以及按当前关键词分配好的结果
+        self.feed: Optional[List[Dict[str, Any]]] = None
+        self.feed_at = 0.0
+        self.keywords: List[str] = []
+        self.assigned: Optional[Dict[str, List[NewsItem]]] = None
+
+    def prepare(self, keywords: List[str]) -> None:
+        """记录本轮的关键词，下载头条后一次完成匹配"""
+        with self.lock:
+            self.keywords = list(dict.fromkeys(keywords))
+            self.assigned = None
+            if not self.feed:
+                # 上次下载失败或头条为空时，本轮重新下载
+                self.feed = None
+
+    def needs_rate_limit(self, keyword: str) -> bool:
+        """只在实际下载头条时限速"""
+        return False
+
+    def fetch(self, keyword: str) -> List[NewsItem]:
+        """从头条中取出分配给该关键词的新闻"""
+        if not self.api_key:
+            logger.warning("聚合数据API密钥未配置，返回模拟数据")
+            # 返回模拟数据作为备用
+            results = []
+            for i in range(5):
+                results.append({
+                    "title": f"[模拟] 关于{keyword}的新闻 #{i+1}",
+                    "source": "模拟数据源",
+                    "link": f"https://example.com/news/{i}",
+                    "publishedAt": datetime.now().isoformat(),
+                    "tags": [keyword],
+                    "imageUrl": "https://via.placeholder.com/300x200/3b82f6/ffffff?text=Mock+News",
+                    "content": f"这是关于{keyword}的模拟新闻内容摘要。这条新闻讨论了{keyword}领域的最新发展和趋势。#{i+1}"
+                })
+            return results
+
+        # 并发抓取的关键词在锁上等待同一次下载
+        with self.lock:
+            if keyword not in self.keywords:
+                # 未经 prepare 直接搜索的关键词追加到末尾，已分配的结果不变
+                self.keywords.append(keyword)
+                self.assigned = None
+            if self.feed is None or time.time() - self.feed_at >= self._feed_ttl():
+                self.feed_at = time.time()
+                self.assigned = None
+                try:
+                    self.feed = self._download_feed()
+                except Exception:
+                    # 下载失败时本轮其他关键词不再重复请求
+                    self.feed = []
+                    raise
+            if self.assigned is None:
+                self.assigned = self._assign(self.feed)
+            results = self.assigned.get(keyword, [])
+
+        logger.info(f"聚合数据API返回 {len(results)} 条新闻")
+        return results
+
+    def _feed_ttl(self) -> float:
+        """头条的复用时间，与响应缓存有效期一致"""
+        cache_ttls = self.settings.get_setting("cacheTtl") or {}
+        return float(cache_ttls.get(self.name, self.cache_ttl))
+
+    def _download_feed(self) -> List[Dict[str, Any]]:
+        """下载头条，接口返回错误时记录并返回空列表"""
+        self.api.acquire(self.name)
+        params = {
+            "type": "",  # 新闻类型，空为全部
+            "key": self.api_key  # 聚合数据API密钥
+        }
+        response = self.api.request(self.name, "GET", self.url, params=params)
+        response.raise_for_status()
+
+        data = response.json()
+        if data.get("error_code") != 0:
+            logger.error(f"聚合数据API错误: {data.get('reason', '未知错误')}")
+            metrics.inc("news_provider_errors_total", provider=self.name)
+            if data.get("error_code") in JUHE_QUOTA_ERRORS:
+                # 配额用尽时HTTP状态仍为200，直接熔断，冷却期内不再请求
+                self.api.open_circuit(self.name, "请求次数已用尽")
+            return []
+        return data.get("result", {}).get("data", [])
+
+    def _assign(self, feed: List[Dict[str, Any]]) -> Dict[str, List[NewsItem]]:
+        """一次匹配所有关键词：新闻归入第一个匹配且未满的关键词，标签为匹配的全部关键词"""
+        matcher = KeywordMatcher(self.keywords)
+        assigned: Dict[str, List[NewsItem]] = {keyword: [] for keyword in self.keywords}
+        matched_count = 0
+        for news in feed:
+            matched = matcher.match(news.get("title", ""))
+            if matched:
+                matched_count += 1
+            owner = next((keyword for keyword in matched if len(assigned[keyword]) < JUHE_ITEMS_PER_KEYWORD), None)
+            if owner is not None:
+                item = self.map_item(owner, news)
+                item["tags"] = matched
+                assigned[owner].append(item)
+
+        # 头条中没有任何关键词时取前5条，归入第一个关键词
+        if not matched_count and feed and self.keywords:
+            assigned[self.keywords[0]] = [self.map_item(self.keywords[0], news) for news in feed[:JUHE_ITEMS_PER_KEYWORD]]
+        logger.info(f"聚合数据头条 {len(feed)} 条，{matched_count} 条匹配 {len(self.keywords)} 个关键词")
+        return assigned
+
+    def map_item(self, keyword: str, raw: Dict[str, Any]) -> NewsItem:
+        """转换为新闻条目"""
+        return {
+            "title": raw.get("title", ""),
+            "source": raw.get("author_name", "聚合数据"),
+            "link": raw.get("url", ""),
+            "publishedAt": raw.get("date", datetime.now().isoformat()),
+            "tags": [keyword],
+            "imageUrl": raw.get("thumbnail_pic_s", ""),
+            "content": raw.get("title", "")  # 聚合数据API只提供标题
+        }
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""NewsAPI.org 新闻搜索"""
+
+import logging
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+from news_item import NewsItem
+from news_metrics import metrics
+from news_providers.base import Provider
+
+logger = logging.getLogger("news_scraper")
+
+
+class NewsApiProvider(Provider):
+    """使用NewsAPI.org搜索新闻"""
+
+    label = "NewsAPI.org"
+    # NewsAPI.org 的 everything 端点，支持关键词搜索
+    default_url = "https://newsapi.org/v2/everything"
+    env_key = "NEWSAPI_KEY"
+    rate_limit = 1.0
+    paginated = True
+    # 查询最多500个字符，每页最多100条
+    max_query_length = 500
+    max_page_size = 100
+
+    def fetch(self, keyword: str) -> List[NewsItem]:
+        """按页搜索新闻，未配置密钥时返回模拟数据"""
+        if not self.api_key or self.api_key.strip() == "":
+            logger.warning("NewsAPI.org API密钥未配置，返回模拟数据")
+            # 返回模拟数据作为备用
+            results = []
+            for i in range(5):
+                results.append({
+                    "title": f"[模拟] 关于{keyword}的AI新闻 #{i+1}",
+                    "source": "模拟科技媒体",
+                    "link": f"https://example.com/ai-news/{i}",
+                    "publishedAt": datetime.now().isoformat(),
+                    "tags": [keyword, "AI", "科技"],
+                    "imageUrl": "https://via.placeholder.com/300x200/3b82f6/ffffff?text=AI+News",
+                    "content": f"这是关于{keyword}的模拟AI新闻内容。讨论了人工智能和{keyword}相关的最新技术发展、行业趋势和创新应用。#{i+1}"
+                })
+            return results
+
+        results = super().fetch(keyword)
+        logger.info(f"NewsAPI.org返回 {len(results)} 条新闻")
+        return results
+
+    def fetch_page(self, keyword: str, page: int, mark: Optional[Dict[str, str]],
+                   count: Optional[int] = None) -> List[NewsItem]:
+        """抓取一页新闻"""
+        headers = {"X-API-Key": self.api_key}
+        params = {
+            "q": keyword,
+            "language": "en",  # 英文新闻
+            "sortBy": "publishedAt",  # 按发布时间排序
+            "pageSize": count or self.page_size,
+            "domains": "techcrunch.com,engadget.com,thenextweb.com,arstechnica.com,wired.com,theverge.com"  # 科技媒体
+        }
+        if mark:
+            # 增量抓取：只请求高水位时间之后的新闻，page从1开始
+            params["from"] = mark["publishedAt"]
+            params["page"] = page + 1
+
+        response = self.api.request(self.name, "GET", self.url, headers=headers, params=params)
+        response.raise_for_status()
+
+        data = response.json()
+        if data.get("status") != "ok":
+            logger.error(f"NewsAPI.org错误: {data.get('message', '未知错误')}")
+            metrics.inc("news_provider_errors_total", provider=self.name)
+            return []
+
+        # 过滤掉被移除的文章
+        return [
+            self.map_item(keyword, article)
+            for article in data.get("articles", [])
+            if article.get("title") != "[Removed]"
+        ]
+
+    def map_item(self, keyword: str, raw: Dict[str, Any]) -> NewsItem:
+        """转换为新闻条目"""
+        return {
+            "title": raw.get("title", ""),
+            "source": raw.get("source", {}).get("name", ""),
+            "link": raw.get("url", ""),
+            "publishedAt": raw.get("publishedAt", datetime.now().isoformat()),
+            "tags": [keyword, "AI", "科技"],
+            "imageUrl": raw.get("urlToImage") or "https://via.placeholder.com/300x200/3b82f6/ffffff?text=Tech+News",
+            "content": raw.get("description", raw.get("content", ""))[:200] + "..." if raw.get("description") else ""
+        }
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+合并查询计划
+
+支持布尔查询的提供商（Brave、Bing、NewsAPI）可以用一个 OR 查询同时搜索多个关键词。
+plan_queries 按关键词顺序贪心分组：每组的查询不超过提供商的长度上限，
+关键词数不超过 单次请求最大条数 // 每个关键词的条数，使每个关键词仍能分到原来的结果条数。
+合并查询的结果由 QueryAttributor 在本地归属回关键词：关键词的每个词都以完整的词出现在标题或摘要中即为匹配，
+标题中出现的关键词优先。
+"""
+
+import threading
+from typing import List, Dict, Optional, Callable
+
+from news_item import NewsItem
+from news_match import KeywordMatcher
+
+
+def or_query(keywords: List[str], phrase: bool = False) -> str:
+    """将关键词合并为OR查询，多个词的关键词加括号（phrase为True时加引号按短语搜索）"""
+    if len(keywords) == 1:
+        return keywords[0]
+    terms = []
+    for keyword in keywords:
+        keyword = keyword.strip()
+        if len(keyword.split()) > 1:
+            keyword = f'"{keyword}"' if phrase else f"({keyword})"
+        terms.append(keyword)
+    return " OR ".join(terms)
+
+
+def plan_queries(keywords: List[str], max_length: int, max_keywords: int,
+                 format_query: Callable[[List[str]], str]) -> List[List[str]]:
+    """按顺序把关键词分组，每组对应一次请求；单个关键词超出长度上限时单独成组"""
+    groups: List[List[str]] = []
+    current: List[str] = []
+    for keyword in keywords:
+        candidate = current + [keyword]
+        if current and (len(candidate) > max_keywords or len(format_query(candidate)) > max_length):
+            groups.append(current)
+            candidate = [keyword]
+        current = candidate
+    if current:
+        groups.append(current)
+    return groups
+
+
+class QueryAttributor:
+    """将合并查询返回的新闻归属到匹配的关键词"""
+
+    def __init__(self, keywords: List[str]):
+        """关键词拆分为词，所有词放入同一个匹配器"""
+        self.keywords = keywords
+        self.words = {keyword: set(keyword.split()) or {keyword} for keyword in keywords}
+        self.matcher = KeywordMatcher([word for words in self.words.values() for word in words], whole_words=True)
+
+    def match(self, item: NewsItem) -> List[str]:
+        """返回新闻匹配的关键词：标题中出现的关键词在前，其余按关键词顺序排列"""
+        in_title = set(self.matcher.match(item.get("title", "")))
+        found = in_title | set(self.matcher.match(item.get("content", "")))
+        matched = [keyword for keyword in self.keywords if self.words[keyword] <= found]
+        return sorted(matched, key=lambda keyword: not self.words[keyword] <= in_title)
+
+
+class QueryGroup:
+    """一次合并查询包含的关键词，以及归属后的结果"""
+
+    def __init__(self, keywords: List[str], query: str):
+        """初始化查询组"""
+        self.keywords = keywords
+        self.query = query
+        # 并发抓取的关键词在锁上等待同一次请求
+        self.lock = threading.Lock()
+        self.results: Optional[Dict[str, List[NewsItem]]] = None
+        # 接口拒绝了合并的查询（如语法或长度不被接受），同组的关键词改为单独请求
+        self.rejected = False
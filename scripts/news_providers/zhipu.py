@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+智谱清言AI新闻搜索
+
+通过对话接口让模型生成新闻，回复中的JSON数组边接收边解析。
+每轮抓取开始时多个关键词合并为批量请求在后台执行，批量回复未覆盖的关键词再单独请求。
+"""
+
+import json
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Iterator, Callable
+from urllib.parse import quote
+
+import requests
+
+from news_item import NewsItem
+from news_metrics import metrics
+from news_providers.base import Provider
+from news_stream import JsonArrayStream
+
+logger = logging.getLogger("news_scraper")
+
+# 智谱清言每个关键词生成的新闻条数
+ZHIPU_ITEMS_PER_KEYWORD = 5
+
+# 智谱清言批量请求时每个关键词输出token数的初始估计，之后按实际用量调整
+ZHIPU_TOKENS_PER_KEYWORD = 800
+
+# 批量请求只使用输出token上限的一部分，为估计误差留出余量
+ZHIPU_TOKEN_HEADROOM = 0.8
+
+
+class ZhipuProvider(Provider):
+    """使用智谱清言AI搜索新闻"""
+
+    label = "智谱清言AI"
+    default_url = "https://open.bigmodel.cn/api/paas/v4/chat/completions"
+    env_key = "ZHIPU_API_KEY"  # 智谱清言API密钥
+    rate_limit = 2.0
+    # 大模型生成耗时较长
+    read_timeout = 30
+    # 生成成本高，缓存更久
+    cache_ttl = 12 * 60 * 60
+
+    def __init__(self, name: str, api):
+        """初始化提供商"""
+        super().__init__(name, api)
+        self.lock = threading.Lock()
+        # 批量请求：关键词 -> 所在批次的结果
+        self.batch_executor: Optional[ThreadPoolExecutor] = None
+        self.batches: Dict[str, Future] = {}
+        self.tokens_per_keyword = float(ZHIPU_TOKENS_PER_KEYWORD)
+
+    def prepare(self, keywords: List[str]) -> None:
+        """将多个关键词合并为批量请求提交到后台执行，fetch 优先使用批量结果"""
+        keywords = list(dict.fromkeys(keywords))
+        with self.lock:
+            # 上一轮未使用的批量结果不再有效
+            self.batches = {}
+        batch_size = int(self.settings.get_setting("zhipuBatchSize") or 1)
+        if batch_size <= 1 or len(keywords) <= 1 or not self.api_key:
+            return
+
+        batch_size = self._get_batch_size()
+        with self.lock:
+            if self.batch_executor is None:
+                concurrency = max(1, int(self.settings.get_setting("concurrency") or 1))
+                self.batch_executor = ThreadPoolExecutor(max_workers=concurrency)
+        for i in range(0, len(keywords), batch_size):
+            batch = keywords[i:i + batch_size]
+            # 只剩一个关键词时按原方式单独请求
+            if len(batch) == 1:
+                continue
+            future = self.batch_executor.submit(self._search_batch, batch)
+            with self.lock:
+                for keyword in batch:
+                    self.batches[keyword] = future
+        logger.info(f"智谱清言批量请求: {len(keywords)} 个关键词, 每批 {batch_size} 个")
+
+    def _get_batch_size(self) -> int:
+        """根据输出token上限和每个关键词的token估计计算批量大小"""
+        max_size = int(self.settings.get_setting("zhipuBatchSize") or 1)
+        max_tokens = int(self.settings.get_setting("zhipuMaxTokens") or 0)
+        if not max_tokens:
+            return max_size
+        with self.lock:
+            tokens_per_keyword = self.tokens_per_keyword
+        # 预留余量，避免回复被截断
+        return max(1, min(max_size, int(max_tokens * ZHIPU_TOKEN_HEADROOM / tokens_per_keyword)))
+
+    def _update_token_estimate(self, reply: Dict[str, Any], covered: int) -> None:
+        """根据批量请求的实际输出token数调整每个关键词的token估计"""
+        completion_tokens = reply["usage"].get("completion_tokens")
+        with self.lock:
+            estimate = self.tokens_per_keyword
+            if completion_tokens and covered:
+                estimate = (estimate + completion_tokens / covered) / 2
+            if reply["finish_reason"] == "length":
+                # 回复被截断，说明估计偏小
+                estimate *= 1.5
+            self.tokens_per_keyword = estimate
+
+    def fetch(self, keyword: str) -> List[NewsItem]:
+        """使用智谱清言AI搜索新闻，已合并到批量请求的关键词优先使用批量结果"""
+        api_key = self.api_key
+        if not api_key or api_key.strip() == "":
+            logger.warning("智谱清言API密钥未配置，无法获取真实新闻数据")
+            return []
+
+        with self.lock:
+            batch = self.batches.pop(keyword, None)
+        if batch is not None:
+            results = batch.result().get(keyword)
+            if results:
+                logger.info(f"智谱清言批量请求返回 '{keyword}' 的 {len(results)} 条新闻")
+                return results
+            # 批量回复未覆盖该关键词，单独请求
+            logger.info(f"智谱清言批量请求未返回 '{keyword}' 的新闻，单独请求")
+            self.api.acquire(self.name)
+
+        try:
+            # 构建聊天请求，让AI生成关于关键词的新闻内容
+            prompt = f"请基于'{keyword}'这个主题，生成{ZHIPU_ITEMS_PER_KEYWORD}条最新的、具有时效性的新闻标题和内容摘要。请模拟2024-2025年的最新发展趋势和突破性进展。请以JSON数组格式返回，每条新闻包含以下字段：title(新闻标题，体现最新发展)、source(知名媒体来源)、content(内容摘要，100-200字，突出创新性和时效性)、publishedAt(发布时间，使用ISO格式，应为近期时间)、imageUrl(相关图片链接)。请确保新闻内容反映该领域的最新趋势、技术突破或重要进展，避免过时信息。请直接返回JSON数组，不要添加其他说明文字。"
+            results = []
+
+            def accept(item: Dict[str, Any]) -> bool:
+                results.append(self.map_item(keyword, item, len(results)))
+                return len(results) < ZHIPU_ITEMS_PER_KEYWORD
+
+            reply = self._complete(prompt, accept)
+            content = reply["content"]
+            if not results and content:
+                # 如果没有找到JSON格式，生成基于AI回复的新闻条目
+                logger.warning(f"未能从AI回复中解析出新闻JSON（{reply['result']}），使用原始内容")
+                relevant_images = self._get_relevant_images(keyword)
+                results.append({
+                    "title": f"智谱清言AI关于{keyword}的分析报告",
+                    "source": "智谱清言AI",
+                    "link": f"https://chatglm.cn/search?q={keyword}",
+                    "publishedAt": datetime.now().isoformat(),
+                    "tags": [keyword, "AI分析", "智谱清言"],
+                    "imageUrl": relevant_images[0],
+                    "content": content[:500] + "..." if len(content) > 500 else content
+                })
+
+            logger.info(f"智谱清言AI搜索返回 {len(results)} 条新闻")
+            return results
+
+        except Exception as e:
+            logger.error(f"智谱清言AI搜索失败: {e}")
+            metrics.inc("news_provider_errors_total", provider=self.name)
+            return []
+
+    def _search_batch(self, keywords: List[str]) -> Dict[str, List[NewsItem]]:
+        """一次请求生成多个关键词的新闻，按keyword字段拆分回各关键词；请求失败时返回空结果，由各关键词单独请求"""
+        self.api.acquire(self.name)
+
+        prompt = f"请分别基于以下每个主题，各生成{ZHIPU_ITEMS_PER_KEYWORD}条最新的、具有时效性的新闻标题和内容摘要，主题列表：{json.dumps(keywords, ensure_ascii=False)}。请模拟2024-2025年的最新发展趋势和突破性进展。请将所有主题的新闻按主题顺序放在同一个JSON数组中返回，每条新闻包含以下字段：keyword(所属主题，与主题列表中的文字完全一致)、title(新闻标题，体现最新发展)、source(知名媒体来源)、content(内容摘要，100-200字，突出创新性和时效性)、publishedAt(发布时间，使用ISO格式，应为近期时间)、imageUrl(相关图片链接)。请确保新闻内容反映该领域的最新趋势、技术突破或重要进展，避免过时信息。请直接返回JSON数组，不要添加其他说明文字。"
+        results: Dict[str, List[NewsItem]] = {keyword: [] for keyword in keywords}
+        # 模型返回的主题可能与原文大小写或空白不同
+        lookup = {keyword.strip().lower(): keyword for keyword in keywords}
+
+        def accept(item: Dict[str, Any]) -> bool:
+            keyword = lookup.get(str(item.get("keyword", "")).strip().lower())
+            if keyword is not None and len(results[keyword]) < ZHIPU_ITEMS_PER_KEYWORD:
+                results[keyword].append(self.map_item(keyword, item, len(results[keyword])))
+            return any(len(items) < ZHIPU_ITEMS_PER_KEYWORD for items in results.values())
+
+        try:
+            max_tokens = int(self.settings.get_setting("zhipuMaxTokens") or 0) or None
+            reply = self._complete(prompt, accept, max_tokens)
+        except Exception as e:
+            logger.error(f"智谱清言批量请求失败: {e}")
+            metrics.inc("news_provider_errors_total", provider=self.name)
+            return {}
+
+        if reply["finish_reason"] == "length":
+            # 回复被截断时，最后一个关键词的新闻可能不完整，不足条数的关键词单独请求
+            results = {keyword: items if len(items) >= ZHIPU_ITEMS_PER_KEYWORD else [] for keyword, items in results.items()}
+        covered = sum(1 for items in results.values() if items)
+        self._update_token_estimate(reply, covered)
+        metrics.inc("news_zhipu_batch_keywords_total", covered, result="covered")
+        metrics.inc("news_zhipu_batch_keywords_total", len(keywords) - covered, result="fallback")
+        logger.info(
+            f"智谱清言批量请求返回 {sum(len(items) for items in results.values())} 条新闻, "
+            f"覆盖 {covered}/{len(keywords)} 个关键词"
+            + ("（回复被截断）" if reply["finish_reason"] == "length" else "")
+        )
+        return results
+
+    def _complete(self, prompt: str, accept: Callable[[Dict[str, Any]], bool],
+                        max_tokens: Optional[int] = None) -> Dict[str, Any]:
+        """发送智谱清言对话请求，增量解析回复中的新闻对象并逐个交给accept处理，accept返回False时停止解析；
+        返回回复内容、解析结果、token用量和结束原因"""
+        # 智谱清言Chat Completions API
+        url = self.url
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        stream = bool(self.settings.get_setting("zhipuStream"))
+        payload = {
+            "model": "glm-4",
+            "messages": [
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            "stream": stream,
+            "temperature": 0.7
+        }
+        if max_tokens:
+            payload["max_tokens"] = max_tokens
+
+        # 增量解析回复中的JSON数组，每条新闻完整后立即可用
+        reply: Dict[str, Any] = {"usage": {}, "finish_reason": None}
+        parser = JsonArrayStream()
+        parts: List[str] = []
+        parsed = 0
+        wanted = True
+        start = time.monotonic()
+        parse_seconds = 0.0
+
+        if stream:
+            chunks = self._stream(url, headers, payload, reply)
+        else:
+            response = self.api.request(self.name, "POST", url, headers=headers, json=payload)
+            response.raise_for_status()
+            data = response.json()
+            choices = data.get("choices") or [{}]
+            reply["usage"] = data.get("usage") or {}
+            reply["finish_reason"] = choices[0].get("finish_reason")
+            chunks = iter([choices[0].get("message", {}).get("content", "")])
+
+        try:
+            # 读取完整回复以便写入缓存，数组结束或不再需要新闻后不再解析
+            for chunk in chunks:
+                parts.append(chunk)
+                if parser.done or not wanted:
+                    continue
+                parse_start = time.monotonic()
+                items = parser.feed(chunk)
+                parse_seconds += time.monotonic() - parse_start
+                for item in items:
+                    if not parsed:
+                        metrics.observe("news_zhipu_first_item_seconds", time.monotonic() - start, stream=stream)
+                    parsed += 1
+                    if not accept(item):
+                        wanted = False
+                        break
+        except (requests.RequestException, ValueError) as e:
+            # 流式响应中断时保留已解析完成的新闻
+            if not parsed:
+                raise
+            logger.warning(f"智谱清言流式响应中断，保留已解析的 {parsed} 条新闻: {e}")
+        finally:
+            if stream:
+                chunks.close()
+
+        content = "".join(parts)
+        logger.info(f"智谱清言AI返回内容: {content[:500]}...")
+        if parsed:
+            reply["result"] = "ok"
+        elif content:
+            reply["result"] = "invalid_json" if parser.errors else "no_json"
+        else:
+            reply["result"] = "empty"
+        metrics.observe("news_zhipu_parse_seconds", parse_seconds)
+        metrics.inc("news_zhipu_parse_total", result=reply["result"])
+        reply["content"] = content
+        return reply
+
+    def _stream(self, url: str, headers: Dict[str, str], payload: Dict[str, Any],
+                      reply: Dict[str, Any]) -> Iterator[str]:
+        """读取智谱清言的SSE流式响应，逐段产出回复内容，token用量和结束原因写入reply"""
+        for line in self.api.request_lines(self.name, "POST", url, headers=headers, json=payload):
+            if not line.startswith(b"data:"):
+                continue
+            data = line[5:].strip()
+            # 读到流结束为止，以便完整响应写入缓存
+            if data == b"[DONE]":
+                continue
+            chunk = json.loads(data)
+            if chunk.get("usage"):
+                reply["usage"] = chunk["usage"]
+            choices = chunk.get("choices") or [{}]
+            if choices[0].get("finish_reason"):
+                reply["finish_reason"] = choices[0]["finish_reason"]
+            delta = choices[0].get("delta", {}).get("content")
+            if delta:
+                yield delta
+
+    def map_item(self, keyword: str, raw: Dict[str, Any], index: int = 0) -> NewsItem:
+        """将AI返回的新闻对象转换为新闻条目"""
+        # 处理图片URL，统一使用可靠的Unsplash图片
+        image_url = raw.get("imageUrl", "")
+        # 检查是否为不可靠的图片链接，统一替换为Unsplash图片
+        # 只允许使用Unsplash图片，其他所有域名都替换
+        if not image_url or "images.unsplash.com" not in image_url:
+            relevant_images = self._get_relevant_images(keyword)
+            image_url = relevant_images[index % len(relevant_images)]
+
+        return {
+            "title": raw.get("title", f"关于{keyword}的新闻"),
+            "source": raw.get("source", "智谱清言AI"),
+            # 占位链接包含关键词，避免批量请求中不同关键词的新闻按链接合并时互相覆盖
+            "link": raw.get("link", f"https://example.com/news/{quote(keyword)}/{index}"),
+            "publishedAt": datetime.now().isoformat(),  # 始终使用当前时间确保新闻显示在最上面
+            "tags": [keyword, "AI搜索", "智谱清言"],
+            "imageUrl": image_url,
+            "content": raw.get("content", "智谱清言AI生成的新闻内容")
+        }
+
+    def _get_relevant_images(self, keyword: str) -> List[str]:
+        """根据关键词获取相关图片URL"""
+        # 定义不同主题的图片URL映射
+        image_mapping = {
+            "人工智能": [
+                "https://images.unsplash.com/photo-1677442136019-21780ecad995?w=300&h=200&fit=crop",
+                "https://images.unsplash.com/photo-1620712943543-bcc4688e7485?w=300&h=200&fit=crop",
+                "https://images.unsplash.com/photo-1555255707-c07966088b7b?w=300&h=200&fit=crop"
+            ],
+            "科技": [
+                "https://images.unsplash.com/photo-1518709268805-4e9042af2176?w=300&h=200&fit=crop",
+                "https://images.unsplash.com/photo-1581091226825-a6a2a5aee158?w=300&h=200&fit=crop",
+                "https://images.unsplash.com/photo-1504384308090-c894fdcc538d?w=300&h=200&fit=crop"
+            ],
+            "经济": [
+                "https://images.unsplash.com/photo-1611974789855-9c2a0a7236a3?w=300&h=200&fit=crop",
+                "https://images.unsplash.com/photo-1590283603385-17ffb3a7f29f?w=300&h=200&fit=crop",
+                "https://images.unsplash.com/photo-1554224155-6726b3ff858f?w=300&h=200&fit=crop"
+            ],
+            "医疗": [
+                "https://images.unsplash.com/photo-1559757148-5c350d0d3c56?w=300&h=200&fit=crop",
+                "https://images.unsplash.com/photo-1576091160399-112ba8d25d1f?w=300&h=200&fit=crop",
+                "https://images.unsplash.com/photo-1582750433449-648ed127bb54?w=300&h=200&fit=crop"
+            ]
+        }
+
+        # 检查关键词是否匹配已定义的主题
+        for topic, urls in image_mapping.items():
+            if topic in keyword:
+                return urls
+
+        # 默认返回通用新闻图片
+        return [
+            "https://images.unsplash.com/photo-1504711434969-e33886168f5c?w=300&h=200&fit=crop",
+            "https://images.unsplash.com/photo-1586339949916-3e9457bef6d3?w=300&h=200&fit=crop",
+            "https://images.unsplash.com/photo-1495020689067-958852a7765e?w=300&h=200&fit=crop"
+        ]
+
+    def needs_rate_limit(self, keyword: str) -> bool:
+        """已合并到批量请求的关键词由批次统一限速"""
+        # batches 由 prepare 和各抓取线程修改，需在锁内读取
+        with self.lock:
+            return keyword not in self.batches
+
+    def close(self) -> None:
+        """关闭批量请求线程池"""
+        if self.batch_executor is not None:
+            self.batch_executor.shutdown()
+            self.batch_executor = None
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+多实例共享的抓取任务队列
+
+每个（关键词, 提供商）组合是一条任务，保存在SQLite的租约表中，多个抓取实例（如多个容器）共享同一个数据库文件：
+- claim: 在写事务中领取一批到期且未被租用（或租约已过期）的任务，记录持有者和租约到期时间
+- heartbeat: 抓取期间后台线程定期延长租约
+- complete: 完成后释放租约、安排下一次抓取，并保存增量抓取的高水位，供之后领取该任务的实例使用
+- release: 抓取失败、收到停止信号跳过或实例退出时释放未完成的租约，任务保持原到期时间，立即可被其他实例领取
+实例崩溃后租约不再续期，到期后任务自动被其他实例重新领取，attempts 记录连续未完成的次数。
+"""
+
+import os
+import time
+import uuid
+import socket
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple
+
+from news_metrics import metrics
+
+logger = logging.getLogger("news_scraper")
+
+
+class JobQueue:
+    """基于SQLite租约表的抓取任务队列"""
+
+    def __init__(self, db_path: str, lease_seconds: float = 300, worker_id: Optional[str] = None):
+        """初始化租约表，worker_id为空时由主机名和进程号生成"""
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.lease_seconds = float(lease_seconds)
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        # 心跳线程与抓取线程共用连接；事务由 _transaction 显式开始
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.lock = threading.Lock()
+        self.heartbeat_stop = threading.Event()
+        self.heartbeat_thread: Optional[threading.Thread] = None
+
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS fetch_jobs (
+            keyword TEXT NOT NULL,
+            provider TEXT NOT NULL,
+            nextDue REAL NOT NULL,
+            leaseOwner TEXT,
+            leaseExpires REAL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            markPublishedAt TEXT,
+            markLink TEXT,
+            updatedAt REAL,
+            PRIMARY KEY (keyword, provider)
+        )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_fetch_jobs_next_due ON fetch_jobs (nextDue)")
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """写事务，开始时即获取写锁，多个实例不会领取到同一任务"""
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def sync(self, jobs: Iterable[Tuple[str, str]]) -> None:
+        """按当前设置同步任务：新增的组合立即到期，已删除且未被租用的组合从表中移除"""
+        jobs = set(jobs)
+        now = time.time()
+        with self._transaction() as conn:
+            existing = {tuple(row) for row in conn.execute("SELECT keyword, provider FROM fetch_jobs")}
+            conn.executemany(
+                "INSERT OR IGNORE INTO fetch_jobs (keyword, provider, nextDue, updatedAt) VALUES (?, ?, ?, ?)",
+                [(keyword, provider, now, now) for keyword, provider in jobs - existing]
+            )
+            conn.executemany(
+                "DELETE FROM fetch_jobs WHERE keyword = ? AND provider = ? AND (leaseExpires IS NULL OR leaseExpires < ?)",
+                [(keyword, provider, now) for keyword, provider in existing - jobs]
+            )
+
+    def claim(self, max_keywords: int) -> List[Dict[str, Any]]:
+        """领取最多 max_keywords 个关键词的到期任务，同一关键词的到期提供商一起领取以便合并去重"""
+        now = time.time()
+        with self._transaction() as conn:
+            keywords = [row[0] for row in conn.execute(
+                "SELECT keyword FROM fetch_jobs WHERE nextDue <= ? AND (leaseExpires IS NULL OR leaseExpires < ?) "
+                "GROUP BY keyword ORDER BY MIN(nextDue) LIMIT ?",
+                (now, now, max(1, max_keywords))
+            )]
+            if not keywords:
+                return []
+            placeholders = ",".join("?" * len(keywords))
+            rows = conn.execute(
+                f"SELECT keyword, provider, leaseOwner, attempts, markPublishedAt, markLink FROM fetch_jobs "
+                f"WHERE keyword IN ({placeholders}) AND nextDue <= ? AND (leaseExpires IS NULL OR leaseExpires < ?)",
+                (*keywords, now, now)
+            ).fetchall()
+            # 上一个持有者的租约已过期（实例崩溃或卡住），接管时累计未完成次数
+            conn.executemany(
+                "UPDATE fetch_jobs SET leaseOwner = ?, leaseExpires = ?, attempts = attempts + ?, updatedAt = ? "
+                "WHERE keyword = ? AND provider = ?",
+                [(self.worker_id, now + self.lease_seconds, 1 if owner else 0, now, keyword, provider)
+                 for keyword, provider, owner, _, _, _ in rows]
+            )
+
+        jobs = []
+        for keyword, provider, owner, attempts, mark_published_at, mark_link in rows:
+            if owner:
+                logger.warning(f"接管过期的抓取任务 '{keyword}'/{provider}（原持有者 {owner}，第 {attempts + 1} 次重试）")
+                metrics.inc("news_queue_jobs_total", result="reclaimed")
+            metrics.inc("news_queue_jobs_total", result="claimed")
+            mark = {"publishedAt": mark_published_at, "link": mark_link or ""} if mark_published_at else None
+            jobs.append({"keyword": keyword, "provider": provider, "mark": mark})
+        return jobs
+
+    def heartbeat(self) -> int:
+        """延长本实例持有的全部租约，返回续期的任务数"""
+        now = time.time()
+        with self.lock:
+            cursor = self.conn.execute(
+                "UPDATE fetch_jobs SET leaseExpires = ?, updatedAt = ? WHERE leaseOwner = ?",
+                (now + self.lease_seconds, now, self.worker_id)
+            )
+        return cursor.rowcount
+
+    def start_heartbeat(self) -> None:
+        """启动后台心跳线程，每三分之一租约时间续期一次"""
+        if self.heartbeat_thread is not None:
+            return
+
+        def beat():
+            while not self.heartbeat_stop.wait(self.lease_seconds / 3):
+                try:
+                    self.heartbeat()
+                except sqlite3.Error as e:
+                    logger.warning(f"任务租约续期失败: {e}")
+
+        self.heartbeat_thread = threading.Thread(target=beat, name="job-queue-heartbeat", daemon=True)
+        self.heartbeat_thread.start()
+
+    def complete(self, jobs: List[Dict[str, Any]]) -> None:
+        """释放完成的任务并安排下一次抓取，jobs包含 keyword、provider、nextDue 和可选的 mark"""
+        now = time.time()
+        with self._transaction() as conn:
+            lost = 0
+            for job in jobs:
+                mark = job.get("mark") or {}
+                cursor = conn.execute(
+                    "UPDATE fetch_jobs SET nextDue = ?, leaseOwner = NULL, leaseExpires = NULL, attempts = 0, "
+                    "markPublishedAt = COALESCE(?, markPublishedAt), markLink = COALESCE(?, markLink), updatedAt = ? "
+                    "WHERE keyword = ? AND provider = ? AND leaseOwner = ?",
+                    (job["nextDue"], mark.get("publishedAt"), mark.get("link"), now,
+                     job["keyword"], job["provider"], self.worker_id)
+                )
+                lost += 1 - cursor.rowcount
+        metrics.inc("news_queue_jobs_total", len(jobs) - lost, result="completed")
+        if lost:
+            # 租约过期后已被其他实例接管，以接管者的结果为准
+            logger.warning(f"{lost} 个抓取任务的租约已被其他实例接管")
+            metrics.inc("news_queue_jobs_total", lost, result="lost")
+
+    def release(self, jobs: Optional[Iterable[Tuple[str, str]]] = None, failed: bool = False) -> None:
+        """释放租约，任务保持原到期时间；jobs为(关键词, 提供商)，为空时释放本实例持有的全部租约，
+        failed为True时累计未完成次数"""
+        now = time.time()
+        if jobs is None:
+            with self.lock:
+                self.conn.execute(
+                    "UPDATE fetch_jobs SET leaseOwner = NULL, leaseExpires = NULL, updatedAt = ? WHERE leaseOwner = ?",
+                    (now, self.worker_id)
+                )
+            return
+        jobs = list(jobs)
+        with self._transaction() as conn:
+            conn.executemany(
+                "UPDATE fetch_jobs SET leaseOwner = NULL, leaseExpires = NULL, attempts = attempts + ?, updatedAt = ? "
+                "WHERE keyword = ? AND provider = ? AND leaseOwner = ?",
+                [(1 if failed else 0, now, keyword, provider, self.worker_id) for keyword, provider in jobs]
+            )
+        metrics.inc("news_queue_jobs_total", len(jobs), result="failed" if failed else "released")
+
+    def seconds_until_next(self) -> float:
+        """距离下一个任务可领取的秒数，被其他实例租用的任务按租约到期时间计算"""
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT MIN(CASE WHEN leaseExpires IS NOT NULL AND leaseExpires >= ? THEN MAX(nextDue, leaseExpires) "
+                "ELSE nextDue END) FROM fetch_jobs",
+                (now,)
+            ).fetchone()
+        if row[0] is None:
+            return float("inf")
+        return max(0.0, row[0] - now)
+
+    def stats(self) -> Dict[str, int]:
+        """任务统计：总数、到期待领取数、租用中的数量和持有租约的实例数"""
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT COUNT(*), "
+                "SUM(CASE WHEN nextDue <= ? AND (leaseExpires IS NULL OR leaseExpires < ?) THEN 1 ELSE 0 END), "
+                "SUM(CASE WHEN leaseExpires >= ? THEN 1 ELSE 0 END), "
+                "COUNT(DISTINCT CASE WHEN leaseExpires >= ? THEN leaseOwner END) FROM fetch_jobs",
+                (now, now, now, now)
+            ).fetchone()
+        return {"jobs": row[0], "due": row[1] or 0, "leased": row[2] or 0, "workers": row[3]}
+
+    def close(self) -> None:
+        """停止心跳，释放租约并关闭数据库"""
+        self.heartbeat_stop.set()
+        if self.heartbeat_thread is not None:
+            self.heartbeat_thread.join()
+            self.heartbeat_thread = None
+        try:
+            self.release()
+        except sqlite3.Error as e:
+            logger.warning(f"释放任务租约失败: {e}")
+        self.conn.close()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+新闻保留策略、归档与备份
+
+保留策略按发布时间、标签和最大条数判定过期新闻：
+    retentionDays     默认保留天数，0为永久保留
+    retentionTagDays  按标签覆盖保留天数，新闻有多个标签时取最长的，0为永久保留
+    retentionMaxRows  最多保留的条数，超出时从最早发布的新闻开始过期
+过期新闻按发布月份写入归档（压缩的JSONL文件或SQLite数据库），再从在线存储中删除。
+
+备份使用SQLite在线备份接口分步复制，每步之间让出数据库锁，不阻塞正在写入的抓取进程；
+数据库自上次备份以来没有变化时跳过。
+"""
+
+import os
+import json
+import gzip
+import time
+import logging
+import sqlite3
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Iterable, Tuple, Set
+
+logger = logging.getLogger("news_scraper")
+
+# 在线备份每步复制的页数
+BACKUP_PAGES_PER_STEP = 1024
+
+# 在线备份每步之间的等待时间（秒）
+BACKUP_STEP_SLEEP = 0.01
+
+# 备份目录中记录上次备份时数据库状态的文件
+BACKUP_MANIFEST = "manifest.json"
+
+# 归档数据库的表结构，与在线数据库的 news 表字段一致（不含全文索引和标签表）
+ARCHIVE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS news (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    source TEXT,
+    link TEXT UNIQUE,
+    publishedAt TEXT,
+    tags TEXT,
+    imageUrl TEXT,
+    content TEXT
+)
+"""
+
+
+def retention_cutoffs(days: int, tag_days: Dict[str, int],
+                      now: Optional[datetime] = None) -> Tuple[str, Dict[str, str]]:
+    """将保留天数换算为发布时间的截止点，发布时间早于截止点的新闻过期，永久保留时截止点为空字符串"""
+    now = now or datetime.now()
+
+    def cutoff(value: int) -> str:
+        return (now - timedelta(days=value)).isoformat() if value and value > 0 else ""
+
+    return cutoff(days), {tag: cutoff(value) for tag, value in (tag_days or {}).items()}
+
+
+def effective_cutoff(tags: Iterable[str], default_cutoff: str, tag_cutoffs: Dict[str, str]) -> str:
+    """新闻适用的截止点：匹配的标签中取保留时间最长的（截止点最早），没有匹配的标签时使用默认值"""
+    matched = [tag_cutoffs[tag] for tag in tags if tag in tag_cutoffs]
+    return min(matched) if matched else default_cutoff
+
+
+def select_expired(entries: Iterable[Tuple[Any, str, Iterable[str]]], default_cutoff: str,
+                   tag_cutoffs: Dict[str, str], max_rows: int = 0) -> Set[Any]:
+    """从 (键, 发布时间, 标签) 中选出过期新闻的键，用于JSON和JSONL存储"""
+    expired = set()
+    kept = []
+    for key, published_at, tags in entries:
+        published_at = published_at or ""
+        # 缺少发布时间的新闻无法判断，只受最大条数限制
+        if published_at and published_at < effective_cutoff(tags, default_cutoff, tag_cutoffs):
+            expired.add(key)
+        else:
+            kept.append((published_at, key))
+    if max_rows and len(kept) > max_rows:
+        kept.sort(key=lambda entry: entry[0], reverse=True)
+        expired.update(key for _, key in kept[max_rows:])
+    return expired
+
+
+def _archive_month(item: Dict[str, Any]) -> str:
+    """归档分组的月份（YYYY-MM），发布时间无法识别时为 unknown"""
+    published_at = item.get("publishedAt") or ""
+    month = published_at[:7]
+    return month if len(month) == 7 and month[4] == "-" and month.replace("-", "").isdigit() else "unknown"
+
+
+class NewsArchive:
+    """按发布月份写入的新闻归档
+
+    jsonl 格式为 news-YYYY-MM.jsonl.gz，多次归档追加为新的gzip成员，可直接用 zcat 读取；
+    sqlite 格式为 news-YYYY-MM.db，同一链接重复归档时覆盖。
+    """
+
+    def __init__(self, archive_dir: str, archive_format: str = "jsonl"):
+        """初始化归档目录"""
+        if archive_format not in ("jsonl", "sqlite"):
+            raise ValueError(f"不支持的归档格式: {archive_format}")
+        self.archive_dir = archive_dir
+        self.archive_format = archive_format
+        self.counts: Dict[str, int] = {}
+        os.makedirs(archive_dir, exist_ok=True)
+
+    def write(self, news_items: Iterable[Dict[str, Any]]) -> None:
+        """写入一批新闻，写入完成（并落盘）后才返回"""
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for item in news_items:
+            groups.setdefault(_archive_month(item), []).append(item)
+        for month, items in groups.items():
+            if self.archive_format == "jsonl":
+                self._write_jsonl(month, items)
+            else:
+                self._write_sqlite(month, items)
+            self.counts[month] = self.counts.get(month, 0) + len(items)
+
+    def _write_jsonl(self, month: str, items: List[Dict[str, Any]]) -> None:
+        """追加到压缩的JSONL文件"""
+        path = os.path.join(self.archive_dir, f"news-{month}.jsonl.gz")
+        with open(path, 'ab') as raw:
+            with gzip.GzipFile(fileobj=raw, mode='wb') as f:
+                for item in items:
+                    f.write(json.dumps(item, ensure_ascii=False).encode('utf-8') + b"\n")
+            raw.flush()
+            os.fsync(raw.fileno())
+
+    def _write_sqlite(self, month: str, items: List[Dict[str, Any]]) -> None:
+        """写入按月的归档数据库"""
+        conn = sqlite3.connect(os.path.join(self.archive_dir, f"news-{month}.db"))
+        try:
+            conn.execute(ARCHIVE_SCHEMA)
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO news (id, title, source, link, publishedAt, tags, imageUrl, content) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (item.get("id"), item.get("title", ""), item.get("source", ""), item.get("link", ""),
+                         item.get("publishedAt"), json.dumps(item.get("tags", []), ensure_ascii=False),
+                         item.get("imageUrl", ""), item.get("content", ""))
+                        for item in items
+                    ]
+                )
+        finally:
+            conn.close()
+
+
+def _db_fingerprint(db_path: str) -> List[int]:
+    """数据库文件及其WAL文件的大小和修改时间，用于判断自上次备份以来是否有变化"""
+    fingerprint = []
+    for path in (db_path, db_path + "-wal"):
+        try:
+            stat = os.stat(path)
+            fingerprint.extend([stat.st_size, stat.st_mtime_ns])
+        except OSError:
+            fingerprint.extend([0, 0])
+    return fingerprint
+
+
+def backup_database(db_path: str, backup_dir: str, keep: int = 8, force: bool = False) -> Optional[str]:
+    """使用SQLite在线备份接口备份数据库，返回备份文件路径，数据库未变化时跳过并返回None"""
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(db_path)
+    os.makedirs(backup_dir, exist_ok=True)
+    manifest_path = os.path.join(backup_dir, BACKUP_MANIFEST)
+    manifest: Dict[str, Any] = {}
+    if os.path.exists(manifest_path):
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+
+    fingerprint = _db_fingerprint(db_path)
+    last = manifest.get("last")
+    if not force and last and manifest.get("fingerprint") == fingerprint and os.path.exists(os.path.join(backup_dir, last)):
+        logger.info(f"数据库自上次备份（{last}）以来没有变化，跳过备份")
+        return None
+
+    name = f"news-{datetime.now().strftime('%Y%m%d-%H%M%S')}.db"
+    path = os.path.join(backup_dir, name)
+    tmp_path = path + ".tmp"
+    start = time.time()
+    source = sqlite3.connect(db_path)
+    target = sqlite3.connect(tmp_path)
+    try:
+        # 分步复制，每步之间释放读锁；复制期间数据库被修改时备份接口会自动重新开始
+        source.backup(target, pages=BACKUP_PAGES_PER_STEP, sleep=BACKUP_STEP_SLEEP)
+        target.execute("PRAGMA journal_mode=DELETE")
+    except BaseException:
+        target.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        source.close()
+    target.close()
+    os.replace(tmp_path, path)
+
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump({"last": name, "fingerprint": fingerprint}, f)
+
+    # 只保留最近的备份
+    backups = sorted(entry for entry in os.listdir(backup_dir) if entry.startswith("news-") and entry.endswith(".db"))
+    for old in backups[:-keep] if keep > 0 else []:
+        os.remove(os.path.join(backup_dir, old))
+    logger.info(f"已备份数据库到 {path}（{os.path.getsize(path) / 1024 / 1024:.1f} MB，用时 {time.time() - start:.1f} 秒）")
+    return path
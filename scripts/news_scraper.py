@@ -12,23 +12,34 @@
 import os
 import json
 import sqlite3
-import requests
 import argparse
 import logging
 import time
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+import random
+import signal
+import hashlib
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple, Deque, Callable, TYPE_CHECKING
 from pathlib import Path
 
-# 尝试加载.env文件中的环境变量
-try:
-    from dotenv import load_dotenv
-    # 加载项目根目录的.env文件
-    project_root = Path(__file__).parent.parent
-    load_dotenv(project_root / '.env')
-except ImportError:
-    # 如果没有安装python-dotenv，跳过
-    pass
+from news_dedup import fuse_results
+from news_health import ProviderHealth
+from news_item import NewsItem, NewsRecord, load_records, normalize_tags, content_hash, parse_datetime
+from news_metrics import metrics
+from news_pipeline import BatchWriter
+from news_providers import BUILTIN_PROVIDERS, load_provider
+from news_retention import NewsArchive, select_expired, retention_cutoffs, backup_database
+
+# requests、图片缓存（Pillow）、正文抓取和静态导出模块在用到时才导入，
+# 减少定时任务（尤其是不发送HTTP请求的 search、retention、backup 子命令）的启动时间
+if TYPE_CHECKING:
+    import requests
+    from news_enrich import ArticleStore, ArticleEnricher
+    from news_images import ImageCache
 
 # 配置日志
 logging.basicConfig(
@@ -41,9 +52,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger("news_scraper")
 
-# 定义新闻项类型
-NewsItem = Dict[str, Any]
-
 
 class NewsSettings:
     """新闻设置类，用于管理抓取配置"""
@@ -62,8 +70,78 @@ class NewsSettings:
             "apiProvider": "zhipu",  # 默认使用智谱清言AI搜索
             "storageType": "json",  # 存储类型：json或sqlite
             "maxResults": 20,  # 每次抓取的最大结果数
+            "concurrency": 4,  # 并发抓取关键词的线程数，1为串行
+            "rateLimits": {},  # 各API提供商的限速（每秒请求数），覆盖默认值
+            "connectTimeout": 5,  # HTTP连接超时（秒）
+            "readTimeout": None,  # HTTP读取超时（秒），None则使用各提供商默认值
+            "maxRetries": 3,  # 429/5xx响应的最大重试次数
+            "retryBackoff": 0.5,  # 指数退避的初始等待时间（秒）
+            "adaptiveConcurrency": True,  # 按延迟和429/5xx自动调整各API提供商的并发请求数（AIMD）
+            "latencyTolerance": 2.0,  # 请求耗时超过延迟基线的该倍数时视为过载，并发数减半
+            "breakerFailures": 5,  # API提供商连续失败（网络错误、429、5xx）达到该次数时熔断，0为不熔断
+            "breakerCooldown": 300,  # 熔断后跳过该提供商的秒数，恢复试探失败时加倍
+            "healthPath": "",  # 各提供商并发数和熔断状态的保存路径，为空时放在增量抓取状态文件所在目录
             "dbPath": "../data/news.db",  # SQLite数据库路径
-            "jsonPath": "../data/news.json"  # JSON文件路径
+            "searchDbPath": "",  # 全文索引和标签表的SQLite数据库路径（前端不下载），为空时为dbPath所在目录下的news_search.db
+            "jsonPath": "../data/news.json",  # JSON文件路径
+            "jsonlPath": "../data/news.jsonl",  # 追加式JSONL文件路径（storageType为jsonl时使用）
+            "compactRatio": 0.5,  # JSONL中过期记录占比超过该值时自动压缩
+            "cache": True,  # 是否启用跨运行的HTTP响应缓存
+            "cachePath": "../data/http_cache.db",  # 响应缓存文件路径
+            "cacheTtl": {},  # 各API提供商的缓存有效期（秒），覆盖默认值
+            "cacheMaxBytes": 50 * 1024 * 1024,  # 响应缓存最大容量（字节），超出后按LRU淘汰
+            "incremental": True,  # 是否基于高水位增量抓取（brave/bing/newsapi）
+            "maxPages": 3,  # 增量抓取时每个关键词最多翻页数
+            "statePath": "",  # 增量抓取状态文件路径，为空时放在存储文件所在目录
+            "providers": [],  # 同时查询的API提供商列表，为空时只使用apiProvider
+            "apiKeys": {},  # 各API提供商的密钥，多提供商时使用
+            "apiUrls": {},  # 各API提供商的接口地址，覆盖默认值（用于代理或本地测试）
+            "maxConcurrency": {},  # 各API提供商同时进行的最大请求数，覆盖默认值
+            "providerPlugins": {},  # 第三方API提供商，名称 -> "模块:类"，模块需在Python路径中
+            "queryPacking": True,  # 将多个关键词合并为OR查询（brave/bing/newsapi），减少请求数
+            "zhipuStream": True,  # 智谱清言使用流式响应，边接收边解析
+            "zhipuBatchSize": 8,  # 智谱清言每次请求合并的最大关键词数，1为每个关键词单独请求
+            "zhipuMaxTokens": 4096,  # 智谱清言批量请求的输出token上限，批量大小据此自动调整
+            "nearDuplicateDistance": 3,  # 多源合并时判定近似重复的SimHash汉明距离（0-3）
+            "metricsTextfile": "",  # Prometheus textfile路径，每轮抓取结束时写入，为空时不写
+            "metricsPort": 0,  # 守护进程模式下 /metrics 接口端口，0为不启动
+            "metricsSummaryPath": "",  # 每轮抓取的JSON指标摘要追加写入的文件路径（JSONL），为空时只写入日志
+            "images": False,  # 抓取后是否下载新闻图片并生成本地缩略图，imageUrl改写为本地路径
+            "imagePath": "../public/images",  # 图片缩略图保存目录
+            "imageUrlPrefix": "/images",  # 改写后的imageUrl前缀，对应前端访问imagePath的路径
+            "imageIndexPath": "../data/image_cache.db",  # 图片URL与缓存文件的索引数据库路径
+            "imageSizes": [320, 960],  # 缩略图宽度（像素），imageUrl指向最大尺寸
+            "imageConcurrency": 8,  # 并发下载图片的线程数
+            "imageCacheMaxBytes": 500 * 1024 * 1024,  # 图片缓存最大容量（字节），超出后按LRU淘汰
+            "enrich": False,  # 是否抓取内容过短的新闻原文页面并提取正文，保存到enrichPath
+            "enrichPath": "../data/articles.db",  # 新闻正文数据库路径，与列表数据分开存放
+            "enrichMinContent": 300,  # 内容少于该字数的新闻才抓取原文
+            "enrichMaxPerRun": 200,  # 每轮最多抓取的原文页面数
+            "enrichConcurrency": 8,  # 抓取原文的线程数
+            "enrichHostConcurrency": 2,  # 同一网站的最大并发请求数
+            "enrichDelay": 1.0,  # 同一网站两次请求的最短间隔（秒），robots.txt的Crawl-delay更长时以其为准
+            "enrichRevalidate": 7 * 24 * 60 * 60,  # 已抓取的原文超过该时间（秒）后用条件请求检查是否变化，0为不再检查
+            "enrichUserAgent": "Mozilla/5.0 (compatible; NewsScraperBot/1.0)",  # 抓取原文使用的User-Agent，robots.txt按其中的爬虫名称匹配
+            "retentionDays": 0,  # 新闻保留天数（按发布时间），0为永久保留
+            "retentionTagDays": {},  # 按标签覆盖保留天数，新闻有多个标签时取最长的，0为永久保留
+            "retentionMaxRows": 0,  # 最多保留的新闻条数，超出时从最早发布的开始删除，0为不限
+            "archive": True,  # 删除过期新闻前是否写入归档
+            "archivePath": "../data/archive",  # 归档目录，按发布月份分文件
+            "archiveFormat": "jsonl",  # 归档格式：jsonl（gzip压缩）或sqlite
+            "backupPath": "../data/backups",  # SQLite在线备份目录
+            "backupKeep": 8,  # 保留的备份数量，0为不删除旧备份
+            "export": False,  # 抓取完成后是否导出前端使用的静态分片
+            "exportPath": "../public/shards",  # 静态分片导出目录
+            "exportPageSize": 30,  # 静态分片每页条数
+            "saveBatchSize": 500,  # 抓取结果每攒够该条数即保存一批，不等全部关键词抓取完成
+            "saveBatchSeconds": 30,  # 距上次保存超过该秒数时也保存一批（JSON存储每批重写整个文件）
+            "scheduleInterval": 4 * 60 * 60,  # 守护进程模式下的默认抓取间隔（秒）
+            "scheduleIntervals": {},  # 按关键词或提供商覆盖抓取间隔（秒），同时匹配时取较长者
+            "scheduleJitter": 0.1,  # 抓取间隔的随机抖动比例，避免请求集中
+            "workQueue": False,  # 多个实例（容器）通过共享的租约表分配关键词任务，不重复抓取
+            "queuePath": "",  # 任务租约表的SQLite数据库路径，各实例需指向同一文件，为空时放在dbPath所在目录
+            "queueBatchSize": 10,  # 每次领取的关键词数
+            "queueLeaseSeconds": 300  # 任务租约有效期（秒），实例崩溃后超过该时间由其他实例重新领取
         }
         
         try:
@@ -91,6 +169,20 @@ class NewsSettings:
         except Exception as e:
             logger.error(f"保存设置失败: {e}")
     
+    def reload(self) -> List[str]:
+        """重新加载设置文件，返回发生变化的设置项；文件无法解析时保留当前设置"""
+        try:
+            with open(self.settings_file, 'r', encoding='utf-8') as f:
+                json.load(f)
+        except Exception as e:
+            logger.error(f"设置文件无法读取，保留当前设置: {e}")
+            return []
+        
+        settings = self._load_settings()
+        changed = sorted(key for key in set(self.settings) | set(settings) if self.settings.get(key) != settings.get(key))
+        self.settings = settings
+        return changed
+    
     def get_setting(self, key: str) -> Any:
         """获取指定设置项"""
         return self.settings.get(key)
@@ -107,28 +199,424 @@ class NewsSettings:
         return [kw.strip() for kw in keywords_str.split(",") if kw.strip()]
 
 
+# 需要重试的HTTP状态码
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Retry-After 最长等待时间（秒），避免被服务端要求长时间挂起
+MAX_RETRY_AFTER = 60
+
+
+_env_loaded = False
+
+
+def load_env() -> None:
+    """加载项目根目录.env文件中的环境变量（只加载一次），需要读取API密钥时才调用"""
+    global _env_loaded
+    if _env_loaded:
+        return
+    _env_loaded = True
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        # 如果没有安装python-dotenv，跳过
+        return
+    load_dotenv(Path(__file__).parent.parent / '.env')
+
+
+class FetchState:
+    """增量抓取状态：记录每个提供商、每个关键词已抓取到的最新新闻（高水位）。
+    抓取时推进的高水位先暂存，对应的新闻保存成功后再提交，保存前中断时下次仍会重新抓取这些新闻"""
+    
+    def __init__(self, state_path: str):
+        """初始化并加载状态文件"""
+        self.state_path = state_path
+        self.lock = threading.Lock()
+        self.marks: Dict[str, Dict[str, Dict[str, str]]] = {}
+        # 已抓取但新闻尚未保存的高水位：(提供商, 关键词) -> 高水位
+        self.pending: Dict[Tuple[str, str], Dict[str, str]] = {}
+        try:
+            if os.path.exists(state_path):
+                with open(state_path, 'r', encoding='utf-8') as f:
+                    self.marks = json.load(f)
+        except Exception as e:
+            logger.warning(f"加载增量抓取状态失败，将进行全量抓取: {e}")
+    
+    def get(self, provider: str, keyword: str) -> Optional[Dict[str, str]]:
+        """获取高水位（publishedAt, link）"""
+        with self.lock:
+            return self.marks.get(provider, {}).get(keyword)
+    
+    @staticmethod
+    def is_seen(mark: Optional[Dict[str, str]], item: NewsItem) -> bool:
+        """判断新闻是否已在之前的运行中抓取过"""
+        if not mark:
+            return False
+        if item.get("link") == mark.get("link"):
+            return True
+        published_at = parse_datetime(item.get("publishedAt", ""))
+        mark_published_at = parse_datetime(mark.get("publishedAt", ""))
+        return published_at is not None and mark_published_at is not None and published_at <= mark_published_at
+    
+    def update(self, provider: str, keyword: str, items: List[NewsItem]) -> None:
+        """用本次抓取到的最新新闻推进高水位，保存新闻后由 commit 提交"""
+        now = datetime.now(timezone.utc)
+        newest = None
+        for item in items:
+            published_at = parse_datetime(item.get("publishedAt", ""))
+            # 忽略晚于当前时间的发布时间（如缺失时间时填充的本地时间），避免高水位跑到未来
+            if published_at is None or published_at > now:
+                continue
+            if newest is None or published_at > newest[0]:
+                newest = (published_at, item.get("link", ""))
+        if newest is None:
+            return
+        
+        with self.lock:
+            mark = self.pending.get((provider, keyword)) or self.marks.get(provider, {}).get(keyword)
+            mark_published_at = parse_datetime(mark["publishedAt"]) if mark else None
+            if mark_published_at is None or newest[0] > mark_published_at:
+                self.pending[(provider, keyword)] = {
+                    "publishedAt": newest[0].isoformat(),
+                    "link": newest[1]
+                }
+    
+    def commit(self, jobs: Iterable[Tuple[str, str]]) -> int:
+        """提交已保存新闻的高水位，jobs为(提供商, 关键词)，返回提交的数量"""
+        committed = 0
+        with self.lock:
+            for provider, keyword in jobs:
+                mark = self.pending.pop((provider, keyword), None)
+                if mark is not None:
+                    self.marks.setdefault(provider, {})[keyword] = mark
+                    committed += 1
+        return committed
+    
+    def discard(self, jobs: Iterable[Tuple[str, str]]) -> None:
+        """丢弃保存失败的新闻的高水位，下次仍从上次提交的位置抓取"""
+        with self.lock:
+            for provider, keyword in jobs:
+                self.pending.pop((provider, keyword), None)
+    
+    def merge(self, provider: str, keyword: str, mark: Optional[Dict[str, str]]) -> None:
+        """合并其他实例记录的高水位，保留较新的"""
+        mark_published_at = parse_datetime(mark.get("publishedAt", "")) if mark else None
+        if mark_published_at is None:
+            return
+        with self.lock:
+            current = self.marks.get(provider, {}).get(keyword)
+            current_published_at = parse_datetime(current["publishedAt"]) if current else None
+            if current_published_at is None or mark_published_at > current_published_at:
+                self.marks.setdefault(provider, {})[keyword] = dict(mark)
+    
+    def save(self) -> None:
+        """保存已提交的高水位"""
+        with self.lock:
+            os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=os.path.dirname(self.state_path) or ".")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.marks, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.state_path)
+
+
+class TokenBucket:
+    """令牌桶限速器，线程安全"""
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """初始化令牌桶，rate为每秒补充的令牌数"""
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self) -> None:
+        """获取一个令牌，令牌不足时阻塞等待"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class ResponseCache:
+    """跨运行的HTTP响应磁盘缓存
+
+    按 (提供商, 请求方法, URL, 参数) 缓存成功响应，每个提供商单独设置有效期，
+    过期后使用 ETag / Last-Modified 条件请求重新验证，总容量超限时按LRU淘汰。
+    """
+    
+    def __init__(self, cache_path: str, ttls: Dict[str, int], max_bytes: int):
+        """初始化缓存"""
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        self.ttls = ttls
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "revalidated": 0}
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(cache_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            provider TEXT NOT NULL,
+            headers TEXT NOT NULL,
+            body BLOB NOT NULL,
+            created_at REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        )
+        """)
+        self.conn.commit()
+    
+    @staticmethod
+    def make_key(provider: str, method: str, url: str, params: Any = None, payload: Any = None) -> str:
+        """根据请求内容生成缓存键"""
+        raw = json.dumps([provider, method, url, params, payload], ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """读取缓存条目，返回包含 fresh 标记的字典"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT provider, headers, body, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if not row:
+                return None
+            provider, headers, body, created_at = row
+            self.conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self.conn.commit()
+        ttl = self.ttls.get(provider, 0)
+        return {
+            "headers": json.loads(headers),
+            "body": body,
+            "fresh": time.time() - created_at < ttl
+        }
+    
+    def put(self, key: str, provider: str, response: "requests.Response", body: Optional[bytes] = None) -> None:
+        """写入成功响应，流式读取的响应需传入已读取的响应体"""
+        headers = {
+            name: response.headers[name]
+            for name in ("Content-Type", "ETag", "Last-Modified")
+            if name in response.headers
+        }
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, provider, headers, body, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, provider, json.dumps(headers), response.content if body is None else body, now, now)
+            )
+            self.conn.commit()
+    
+    def touch(self, key: str) -> None:
+        """重新验证成功后刷新缓存时间"""
+        now = time.time()
+        with self.lock:
+            self.conn.execute("UPDATE responses SET created_at = ?, accessed_at = ? WHERE key = ?", (now, now, key))
+            self.conn.commit()
+    
+    def evict(self) -> None:
+        """超出容量时按最近访问时间淘汰"""
+        with self.lock:
+            total = self.conn.execute("SELECT COALESCE(SUM(LENGTH(body)), 0) FROM responses").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            removed = 0
+            for key, size in self.conn.execute(
+                "SELECT key, LENGTH(body) FROM responses ORDER BY accessed_at"
+            ).fetchall():
+                if total <= self.max_bytes:
+                    break
+                self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                total -= size
+                removed += 1
+            self.conn.commit()
+        logger.info(f"响应缓存超出容量，已淘汰 {removed} 条")
+    
+    @staticmethod
+    def to_response(entry: Dict[str, Any], url: str) -> "requests.Response":
+        """将缓存条目还原为 requests.Response"""
+        import requests
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.headers.update(entry["headers"])
+        response._content = entry["body"]
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers) or "utf-8"
+        return response
+    
+    def close(self) -> None:
+        """淘汰超量条目并关闭缓存"""
+        self.evict()
+        self.conn.close()
+
+
 class NewsAPI:
     """新闻API接口类"""
     
-    def __init__(self, settings: NewsSettings):
+    def __init__(self, settings: NewsSettings, use_cache: bool = True, refresh_cache: bool = False):
         """初始化API接口"""
         self.settings = settings
         self.api_provider = settings.get_setting("apiProvider")
+        # 同时查询的提供商列表，未设置时只使用apiProvider
+        self.providers: List[str] = settings.get_setting("providers") or [self.api_provider]
+        # 只导入选用的提供商，未知的提供商在搜索时记录错误
+        self.provider_classes = {provider: self._load_provider_class(provider) for provider in self.providers}
         # 优先从环境变量读取API密钥，如果没有则从设置文件读取
-        self.api_key = self._get_api_key_from_env() or settings.get_setting("apiKey")
-    
-    def _get_api_key_from_env(self) -> Optional[str]:
-        """从环境变量获取API密钥"""
-        api_provider = self.settings.get_setting("apiProvider")
-        env_key_map = {
-            "brave": "BRAVE_API_KEY",
-            "bing": "BING_API_KEY", 
-            "juhe": "JUHE_API_KEY",
-            "newsapi": "NEWSAPI_KEY",
-            "zhipu": "ZHIPU_API_KEY"  # 智谱清言API密钥
+        load_env()
+        api_keys = settings.get_setting("apiKeys") or {}
+        self.api_keys: Dict[str, str] = {
+            provider: self._get_api_key_from_env(provider) or api_keys.get(provider)
+            or (settings.get_setting("apiKey") if provider == self.api_provider else "") or ""
+            for provider in self.providers
         }
+        self.api_key = self.api_keys.get(self.api_provider) or settings.get_setting("apiKey")
+        self.search_providers = {
+            provider: provider_class(provider, self)
+            for provider, provider_class in self.provider_classes.items() if provider_class is not None
+        }
+        self.rate_limiters = {provider: self._create_rate_limiter(provider) for provider in self.providers}
+        self.semaphores = {provider: self._create_semaphore(provider) for provider in self.providers}
+        self.health = self._create_health()
+        self.provider_stats: Dict[str, Dict[str, Any]] = {}
+        self.fanout_executor: Optional[ThreadPoolExecutor] = None
+        # 每个提供商共享一个HTTP会话，复用连接
+        self.sessions: Dict[str, "requests.Session"] = {}
+        self.request_stats: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+        # refresh_cache为True时跳过读取缓存，但仍写入最新响应
+        self.refresh_cache = refresh_cache
+        self.cache = self._create_cache() if use_cache and settings.get_setting("cache") else None
+        self.fetch_state = FetchState(self._get_state_path()) if settings.get_setting("incremental") else None
+    
+    def _get_state_path(self) -> str:
+        """增量抓取状态文件路径，默认与存储文件放在同一目录"""
+        state_path = self.settings.get_setting("statePath")
+        if state_path:
+            return state_path
+        storage_key = {"sqlite": "dbPath", "jsonl": "jsonlPath"}.get(self.settings.get_setting("storageType"), "jsonPath")
+        return os.path.join(os.path.dirname(self.settings.get_setting(storage_key)), "fetch_state.json")
+    
+    def _load_provider_class(self, provider: str) -> Optional[type]:
+        """从注册表导入提供商类"""
+        try:
+            return load_provider(provider, self.settings.get_setting("providerPlugins"))
+        except Exception as e:
+            logger.error(f"加载API提供商 {provider} 失败: {e}")
+            return None
+    
+    def paginate(self, provider: str, keyword: str, fetch_page, page_size: int,
+                 keywords: Optional[List[str]] = None) -> List[NewsItem]:
+        """按页抓取新闻；有高水位时只保留更新的新闻，遇到已抓取的内容即停止翻页。
+        keyword为合并查询时，keywords为其包含的关键词：使用其中最早的高水位，高水位由调用方按关键词更新"""
+        mark = self._get_mark(provider, keywords or [keyword])
+        max_pages = max(1, int(self.settings.get_setting("maxPages") or 1)) if mark else 1
+        
+        results = []
+        for page in range(max_pages):
+            try:
+                items = fetch_page(page, mark)
+            except Exception as e:
+                if page == 0:
+                    raise
+                logger.warning(f"{provider} 第 {page + 1} 页抓取失败，保留已抓取的 {len(results)} 条: {e}")
+                break
+            
+            new_items = [item for item in items if not FetchState.is_seen(mark, item)]
+            results.extend(new_items)
+            if len(new_items) < len(items) or len(items) < page_size:
+                break
         
-        env_key = env_key_map.get(api_provider)
+        if mark:
+            logger.info(f"{provider} 增量抓取 '{keyword}': {page + 1} 页, {len(results)} 条新新闻")
+        if self.fetch_state and not keywords:
+            self.fetch_state.update(provider, keyword, results)
+        return results
+    
+    def _get_mark(self, provider: str, keywords: List[str]) -> Optional[Dict[str, str]]:
+        """多个关键词中最早的高水位，有关键词尚无高水位时返回None（完整抓取）"""
+        if not self.fetch_state:
+            return None
+        if len(keywords) == 1:
+            return self.fetch_state.get(provider, keywords[0])
+        marks = [self.fetch_state.get(provider, keyword) for keyword in keywords]
+        if not all(marks) or any(parse_datetime(mark.get("publishedAt", "")) is None for mark in marks):
+            return None
+        return min(marks, key=lambda mark: parse_datetime(mark["publishedAt"]))
+    
+    def _create_cache(self) -> Optional[ResponseCache]:
+        """根据设置创建响应缓存"""
+        try:
+            ttls = {
+                provider: provider_class.cache_ttl
+                for provider, provider_class in self.provider_classes.items() if provider_class is not None
+            }
+            ttls.update(self.settings.get_setting("cacheTtl") or {})
+            return ResponseCache(
+                self.settings.get_setting("cachePath"),
+                ttls,
+                int(self.settings.get_setting("cacheMaxBytes") or 50 * 1024 * 1024)
+            )
+        except Exception as e:
+            logger.warning(f"初始化响应缓存失败，将不使用缓存: {e}")
+            return None
+    
+    def _create_rate_limiter(self, provider: str) -> Optional[TokenBucket]:
+        """根据设置创建API提供商的限速器"""
+        rate_limits = self.settings.get_setting("rateLimits") or {}
+        provider_class = self.provider_classes.get(provider)
+        rate = rate_limits.get(provider, provider_class.rate_limit if provider_class else None)
+        if not rate:
+            return None
+        return TokenBucket(float(rate))
+    
+    def _get_max_concurrency(self, provider: str) -> Optional[int]:
+        """API提供商同时进行的最大请求数，未设置时返回None"""
+        max_concurrency = self.settings.get_setting("maxConcurrency") or {}
+        provider_class = self.provider_classes.get(provider)
+        limit = max_concurrency.get(provider, provider_class.max_concurrency if provider_class else None)
+        return int(limit) if limit else None
+    
+    def _create_semaphore(self, provider: str) -> Optional[threading.BoundedSemaphore]:
+        """根据设置创建API提供商的并发请求限制"""
+        limit = self._get_max_concurrency(provider)
+        if not limit:
+            return None
+        return threading.BoundedSemaphore(limit)
+    
+    def _create_health(self) -> ProviderHealth:
+        """创建各提供商的自适应并发限制和熔断器，并发上限为 maxConcurrency 或 concurrency"""
+        concurrency = max(1, int(self.settings.get_setting("concurrency") or 1))
+        max_concurrency = {provider: self._get_max_concurrency(provider) or concurrency for provider in self.providers}
+        health_path = self.settings.get_setting("healthPath") or os.path.join(
+            os.path.dirname(self._get_state_path()), "provider_health.json"
+        )
+        return ProviderHealth(
+            health_path,
+            max_concurrency,
+            bool(self.settings.get_setting("adaptiveConcurrency")),
+            float(self.settings.get_setting("latencyTolerance") or 2.0),
+            int(self.settings.get_setting("breakerFailures") or 0),
+            float(self.settings.get_setting("breakerCooldown") or 300)
+        )
+    
+    def open_circuit(self, provider: str, reason: str) -> None:
+        """立即熔断提供商（供能识别配额用尽等错误的提供商使用）"""
+        self.health.trip(provider, reason)
+    
+    def acquire(self, provider: str) -> None:
+        """获取提供商的限速令牌（供自行发送额外请求的提供商使用）"""
+        rate_limiter = self.rate_limiters.get(provider)
+        if rate_limiter:
+            rate_limiter.acquire()
+    
+    def _get_api_key_from_env(self, api_provider: str) -> Optional[str]:
+        """从环境变量获取API密钥"""
+        provider_class = self.provider_classes.get(api_provider)
+        env_key = provider_class.env_key if provider_class else None
         if env_key:
             api_key = os.getenv(env_key)
             if api_key:
@@ -136,388 +624,694 @@ class NewsAPI:
                 return api_key
         return None
     
-    def search_news(self, keyword: str) -> List[Dict[str, Any]]:
-        """搜索新闻"""
-        if self.api_provider == "brave":
-            return self._search_brave(keyword)
-        elif self.api_provider == "bing":
-            return self._search_bing(keyword)
-        elif self.api_provider == "baidu":
-            return self._search_baidu(keyword)
-        elif self.api_provider == "juhe":
-            return self._search_juhe(keyword)
-        elif self.api_provider == "newsapi":
-            return self._search_newsapi(keyword)
-        elif self.api_provider == "zhipu":
-            return self._search_zhipu(keyword)
-        else:
-            logger.error(f"不支持的API提供商: {self.api_provider}")
-            return []
+    def _get_session(self, provider: str) -> "requests.Session":
+        """获取提供商的共享HTTP会话（带连接池）"""
+        with self.lock:
+            session = self.sessions.get(provider)
+            if session is None:
+                pool_size = max(1, int(self.settings.get_setting("concurrency") or 1))
+                import requests
+                from requests.adapters import HTTPAdapter
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers.update({"Accept-Encoding": "gzip, deflate"})
+                self.sessions[provider] = session
+            return session
     
-    def _search_brave(self, keyword: str) -> List[Dict[str, Any]]:
-        """使用Brave Search API搜索"""
-        try:
-            url = "https://api.search.brave.com/res/v1/news/search"
-            headers = {"Accept": "application/json", "Accept-Encoding": "gzip", "X-Subscription-Token": self.api_key}
-            params = {"q": keyword, "count": self.settings.get_setting("maxResults")}
-            
-            response = requests.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            results = []
-            
-            for item in data.get("results", []):
-                news_item = {
-                    "title": item.get("title", ""),
-                    "source": item.get("source", ""),
-                    "link": item.get("url", ""),
-                    "publishedAt": item.get("published_time", datetime.now().isoformat()),
-                    "tags": [keyword],  # 初始标签为搜索关键词
-                    "imageUrl": item.get("thumbnail", {}).get("src", "https://via.placeholder.com/300x200/3b82f6/ffffff?text=News"),
-                    "content": item.get("description", item.get("snippet", ""))  # 新闻内容摘要
-                }
-                results.append(news_item)
-            
-            return results
-        except Exception as e:
-            logger.error(f"Brave Search API 搜索失败: {e}")
-            return []
+    def _get_timeout(self, provider: str) -> tuple:
+        """获取(连接超时, 读取超时)"""
+        connect_timeout = self.settings.get_setting("connectTimeout") or 5
+        provider_class = self.provider_classes.get(provider)
+        read_timeout = self.settings.get_setting("readTimeout") or (provider_class.read_timeout if provider_class else 10)
+        return (connect_timeout, read_timeout)
+    
+    def _get_retry_delay(self, response: Optional["requests.Response"], attempt: int) -> float:
+        """计算重试等待时间，优先使用Retry-After响应头"""
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                from email.utils import parsedate_to_datetime
+                try:
+                    retry_at = parsedate_to_datetime(retry_after)
+                    delay = (retry_at - datetime.now(timezone.utc)).total_seconds()
+                except (TypeError, ValueError):
+                    delay = None
+            if delay is not None:
+                return min(max(delay, 0), MAX_RETRY_AFTER)
+        
+        backoff = self.settings.get_setting("retryBackoff") or 0.5
+        return backoff * (2 ** attempt)
+    
+    def _record_attempt(self, provider: str, latency: float, retried: bool,
+                        response: Optional["requests.Response"] = None, streamed: bool = False) -> None:
+        """记录单次请求的耗时、状态码、下载字节数与重试次数（流式响应的字节数在读取时记录）"""
+        metrics.observe("news_http_request_seconds", latency, provider=provider)
+        metrics.inc("news_http_requests_total", provider=provider, status=response.status_code if response is not None else "error")
+        if response is not None and not streamed:
+            metrics.inc("news_http_response_bytes_total", len(response.content), provider=provider)
+        if retried:
+            metrics.inc("news_http_retries_total", provider=provider)
+        with self.lock:
+            stats = self.request_stats.setdefault(provider, {"requests": 0, "retries": 0, "latencies": []})
+            stats["requests"] += 1
+            stats["latencies"].append(latency)
+            if retried:
+                stats["retries"] += 1
     
-    def _search_bing(self, keyword: str) -> List[Dict[str, Any]]:
-        """使用Bing News Search API搜索"""
+    def request(self, provider: str, method: str, url: str, **kwargs) -> "requests.Response":
+        """发送HTTP请求，优先使用响应缓存，过期时进行条件请求"""
+        if self.cache is None:
+            return self._send(provider, method, url, **kwargs)
+        
+        key = ResponseCache.make_key(provider, method, url, kwargs.get("params"), kwargs.get("json"))
+        entry = None if self.refresh_cache else self.cache.get(key)
+        if entry and entry["fresh"]:
+            metrics.inc("news_cache_requests_total", provider=provider, result="hit")
+            with self.lock:
+                self.cache.stats["hits"] += 1
+            return ResponseCache.to_response(entry, url)
+        
+        if entry:
+            # 缓存已过期，带上验证器进行条件请求
+            headers = dict(kwargs.get("headers") or {})
+            if "ETag" in entry["headers"]:
+                headers["If-None-Match"] = entry["headers"]["ETag"]
+            if "Last-Modified" in entry["headers"]:
+                headers["If-Modified-Since"] = entry["headers"]["Last-Modified"]
+            kwargs["headers"] = headers
+        
+        response = self._send(provider, method, url, **kwargs)
+        if entry and response.status_code == 304:
+            self.cache.touch(key)
+            metrics.inc("news_cache_requests_total", provider=provider, result="revalidated")
+            with self.lock:
+                self.cache.stats["revalidated"] += 1
+            return ResponseCache.to_response(entry, url)
+        
+        metrics.inc("news_cache_requests_total", provider=provider, result="miss")
+        with self.lock:
+            self.cache.stats["misses"] += 1
+        if response.status_code == 200:
+            self.cache.put(key, provider, response)
+        return response
+    
+    def request_lines(self, provider: str, method: str, url: str, **kwargs) -> Iterator[bytes]:
+        """发送流式请求并逐行产出响应体；完整读取的响应写入缓存，中断的响应不缓存"""
+        key = ResponseCache.make_key(provider, method, url, kwargs.get("params"), kwargs.get("json"))
+        if self.cache is not None and not self.refresh_cache:
+            entry = self.cache.get(key)
+            if entry and entry["fresh"]:
+                metrics.inc("news_cache_requests_total", provider=provider, result="hit")
+                with self.lock:
+                    self.cache.stats["hits"] += 1
+                yield from entry["body"].splitlines()
+                return
+        
+        import requests
+        response, start = self._send_attempts(provider, method, url, stream=True, **kwargs)
+        # 读取响应体时的网络错误同样计入自适应并发和熔断
+        status = None
         try:
-            url = "https://api.bing.microsoft.com/v7.0/news/search"
-            headers = {"Ocp-Apim-Subscription-Key": self.api_key}
-            params = {"q": keyword, "count": self.settings.get_setting("maxResults"), "mkt": "zh-CN"}
-            
-            response = requests.get(url, headers=headers, params=params)
             response.raise_for_status()
-            
-            data = response.json()
-            results = []
-            
-            for item in data.get("value", []):
-                news_item = {
-                    "title": item.get("name", ""),
-                    "source": item.get("provider", [{}])[0].get("name", ""),
-                    "link": item.get("url", ""),
-                    "publishedAt": item.get("datePublished", datetime.now().isoformat()),
-                    "tags": [keyword],  # 初始标签为搜索关键词
-                    "imageUrl": item.get("image", {}).get("thumbnail", {}).get("contentUrl", 
-                                "https://via.placeholder.com/300x200/3b82f6/ffffff?text=News"),
-                    "content": item.get("description", "")  # 新闻内容摘要
-                }
-                results.append(news_item)
-            
-            return results
-        except Exception as e:
-            logger.error(f"Bing News API 搜索失败: {e}")
-            return []
+            lines = []
+            for line in response.iter_lines():
+                metrics.inc("news_http_response_bytes_total", len(line) + 1, provider=provider)
+                lines.append(line)
+                yield line
+            if self.cache is not None:
+                metrics.inc("news_cache_requests_total", provider=provider, result="miss")
+                with self.lock:
+                    self.cache.stats["misses"] += 1
+                self.cache.put(key, provider, response, b"\n".join(lines))
+            status = response.status_code
+        except requests.RequestException as e:
+            if getattr(e, "response", None) is not None:
+                status = response.status_code
+            raise
+        except GeneratorExit:
+            # 调用方提前停止读取，请求本身是正常的
+            status = response.status_code
+            raise
+        finally:
+            response.close()
+            # 响应体读取完（或中断）后才归还并发名额，耗时包含生成和传输响应体的时间
+            self.health.after(provider, start, status)
+            self._record_attempt(provider, time.monotonic() - start, False, response, True)
     
-    def _search_baidu(self, keyword: str) -> List[Dict[str, Any]]:
-        """使用百度资讯搜索API（模拟）"""
-        # 注意：百度没有官方新闻API，这里仅作为示例
-        # 实际使用时可能需要使用网页爬虫或其他方法
-        try:
-            # 这里应该是实际的百度API调用
-            # 由于没有官方API，这里返回模拟数据
-            logger.warning("⚠️  百度搜索API为模拟实现，返回的是假数据！")
-            logger.warning("⚠️  如需真实新闻数据，请参考 JUHE_API_SETUP.md 配置聚合数据API")
+    def _send(self, provider: str, method: str, url: str, **kwargs) -> "requests.Response":
+        """发送HTTP请求，对429/5xx和网络错误进行指数退避重试"""
+        return self._send_attempts(provider, method, url, **kwargs)[0]
+    
+    def _send_attempts(self, provider: str, method: str, url: str, **kwargs) -> Tuple["requests.Response", float]:
+        """发送HTTP请求并重试，返回最终的响应和该次请求开始的 time.monotonic()；
+        流式请求（stream=True）最终返回的响应仍占用并发名额，由调用方读取完响应体后调用 health.after 并记录耗时"""
+        import requests
+        stream = bool(kwargs.get("stream"))
+        session = self._get_session(provider)
+        kwargs.setdefault("timeout", self._get_timeout(provider))
+        max_retries = self.settings.get_setting("maxRetries")
+        max_retries = 3 if max_retries is None else int(max_retries)
+        
+        for attempt in range(max_retries + 1):
+            # 提供商已熔断时不再发送（包括重试），否则等待自适应并发名额
+            self.health.before(provider)
+            start = time.monotonic()
+            response = None
+            held = False
+            try:
+                response = session.request(method, url, **kwargs)
+                held = stream and not (response.status_code in RETRY_STATUS_CODES and attempt < max_retries)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                # POST（如智谱清言对话补全）不是幂等的：读取超时时服务端可能已在生成并计费，只在连接阶段失败时重试
+                read_timeout = isinstance(e, requests.ReadTimeout) and method.upper() == "POST"
+                if attempt >= max_retries or read_timeout:
+                    self._record_attempt(provider, time.monotonic() - start, False)
+                    raise
+                logger.warning(f"{provider} 请求失败: {e}，准备第 {attempt + 1} 次重试")
+            finally:
+                # 按耗时和状态码调整并发上限，429/5xx和网络错误计入熔断
+                if not held:
+                    self.health.after(provider, start, response.status_code if response is not None else None)
+            if held:
+                return response, start
             
-            results = []
-            for i in range(5):  # 模拟5条结果
-                news_item = {
-                    "title": f"⚠️ [假数据] 关于{keyword}的模拟新闻 #{i+1}",
-                    "source": "模拟数据源（非真实）",
-                    "link": f"https://example.com/fake-news/{i}",
-                    "publishedAt": datetime.now().isoformat(),
-                    "tags": [keyword, "模拟数据"],
-                    "imageUrl": "https://via.placeholder.com/300x200/ff6b6b/ffffff?text=FAKE+DATA",
-                    "content": f"⚠️ 这是模拟的假数据！关于{keyword}的虚假新闻内容。如需真实数据请配置聚合数据API。#{i+1}"
-                }
-                results.append(news_item)
+            should_retry = response is None or (response.status_code in RETRY_STATUS_CODES and attempt < max_retries)
+            self._record_attempt(provider, time.monotonic() - start, should_retry, response, stream)
+            if not should_retry:
+                return response, start
             
-            return results
-        except Exception as e:
-            logger.error(f"百度搜索失败: {e}")
-            return []
+            delay = self._get_retry_delay(response, attempt)
+            if response is not None:
+                # 释放未读取的响应（流式请求时连接才能复用）
+                response.close()
+                logger.warning(f"{provider} 返回 {response.status_code}，{delay:.1f} 秒后第 {attempt + 1} 次重试")
+            time.sleep(delay)
+        
+        return response, start
     
-    def _search_juhe(self, keyword: str) -> List[Dict[str, Any]]:
-        """使用聚合数据新闻头条API"""
-        try:
-            # 聚合数据新闻头条API
-            url = "http://v.juhe.cn/toutiao/index"
-            params = {
-                "type": "",  # 新闻类型，空为全部
-                "key": self.api_key  # 聚合数据API密钥
-            }
-            
-            if not self.api_key:
-                logger.warning("聚合数据API密钥未配置，返回模拟数据")
-                # 返回模拟数据作为备用
-                results = []
-                for i in range(5):
-                    news_item = {
-                        "title": f"[模拟] 关于{keyword}的新闻 #{i+1}",
-                        "source": "模拟数据源",
-                        "link": f"https://example.com/news/{i}",
-                        "publishedAt": datetime.now().isoformat(),
-                        "tags": [keyword],
-                        "imageUrl": "https://via.placeholder.com/300x200/3b82f6/ffffff?text=Mock+News",
-                        "content": f"这是关于{keyword}的模拟新闻内容摘要。这条新闻讨论了{keyword}领域的最新发展和趋势。#{i+1}"
-                    }
-                    results.append(news_item)
+    def close(self) -> None:
+        """关闭提供商、HTTP会话和响应缓存"""
+        if self.fanout_executor is not None:
+            self.fanout_executor.shutdown()
+            self.fanout_executor = None
+        for search_provider in self.search_providers.values():
+            search_provider.close()
+        for session in self.sessions.values():
+            session.close()
+        self.sessions.clear()
+        # 保存学到的并发数和熔断状态，下次运行直接沿用
+        self.health.save()
+        if self.cache is not None:
+            stats = self.cache.stats
+            logger.info(f"响应缓存统计: 命中 {stats['hits']} 次, 未命中 {stats['misses']} 次, 重新验证 {stats['revalidated']} 次")
+            self.cache.close()
+            self.cache = None
+    
+    def log_request_stats(self) -> None:
+        """输出各提供商的请求次数、重试次数和耗时统计"""
+        for provider, stats in self.provider_stats.items():
+            avg = stats["latency"] / stats["calls"] if stats["calls"] else 0
+            logger.info(
+                f"{provider} 抓取统计: 调用 {stats['calls']} 次, 平均耗时 {avg:.3f}s, "
+                f"返回 {stats['items']} 条, 去重后保留 {stats['kept']} 条"
+                + (f", 熔断跳过 {stats['skipped']} 个关键词" if stats["skipped"] else "")
+            )
+        for provider, stats in self.request_stats.items():
+            latencies = sorted(stats["latencies"])
+            if not latencies:
+                continue
+            avg = sum(latencies) / len(latencies)
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            limiter = self.health.limiters.get(provider)
+            logger.info(
+                f"{provider} 请求统计: 请求 {stats['requests']} 次, 重试 {stats['retries']} 次, "
+                f"平均耗时 {avg:.3f}s, P95 {p95:.3f}s, 最大 {latencies[-1]:.3f}s"
+                + (f", 并发上限 {int(limiter.limit)}/{limiter.maximum}" if limiter is not None else "")
+            )
+    
+    def prepare(self, jobs: List[Tuple[str, Optional[List[str]]]]) -> None:
+        """每轮抓取开始前通知各提供商本轮的关键词（如智谱清言将多个关键词合并为批量请求）"""
+        for provider, search_provider in self.search_providers.items():
+            search_provider.prepare([keyword for keyword, providers in jobs if provider in (providers or self.providers)])
+    
+    def search_news(self, keyword: str, providers: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """搜索新闻，providers为空时查询所有提供商"""
+        providers = providers or self.providers
+        with metrics.timer("news_search_seconds"):
+            if len(providers) == 1:
+                results = self._search_provider(providers[0], keyword)
+                metrics.inc("news_provider_kept_total", len(results), provider=providers[0])
+                with self.lock:
+                    self.provider_stats[providers[0]]["kept"] += len(results)
                 return results
-            
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            if data.get("error_code") != 0:
-                logger.error(f"聚合数据API错误: {data.get('reason', '未知错误')}")
-                return []
-            
-            results = []
-            news_list = data.get("result", {}).get("data", [])
-            
-            # 过滤包含关键词的新闻
-            filtered_news = []
-            for news in news_list:
-                title = news.get("title", "")
-                if keyword.lower() in title.lower():
-                    filtered_news.append(news)
-            
-            # 如果没有匹配的新闻，取前5条
-            if not filtered_news:
-                filtered_news = news_list[:5]
-            
-            for news in filtered_news[:5]:  # 最多返回5条
-                news_item = {
-                    "title": news.get("title", ""),
-                    "source": news.get("author_name", "聚合数据"),
-                    "link": news.get("url", ""),
-                    "publishedAt": news.get("date", datetime.now().isoformat()),
-                    "tags": [keyword],
-                    "imageUrl": news.get("thumbnail_pic_s", ""),
-                    "content": news.get("title", "")  # 聚合数据API只提供标题
-                }
-                results.append(news_item)
-            
-            logger.info(f"聚合数据API返回 {len(results)} 条新闻")
-            return results
-            
-        except Exception as e:
-            logger.error(f"聚合数据API调用失败: {e}")
-            return []
+            return self._search_fanout(providers, keyword)
     
-    def _search_newsapi(self, keyword: str) -> List[Dict[str, Any]]:
-        """使用NewsAPI.org搜索新闻"""
+    def _search_fanout(self, providers: List[str], keyword: str) -> List[Dict[str, Any]]:
+        """多个提供商并发搜索并合并结果"""
+        # 多个提供商并发查询，合并结果并折叠重复新闻
+        with self.lock:
+            if self.fanout_executor is None:
+                concurrency = max(1, int(self.settings.get_setting("concurrency") or 1))
+                self.fanout_executor = ThreadPoolExecutor(max_workers=len(self.providers) * concurrency)
+        futures = [
+            (provider, self.fanout_executor.submit(self._search_provider, provider, keyword))
+            for provider in providers
+        ]
+        result_lists = [(provider, future.result()) for provider, future in futures]
+        
+        with metrics.timer("news_fuse_seconds"):
+            # 0表示只合并指纹完全相同的新闻，不能当作未设置
+            distance = self.settings.get_setting("nearDuplicateDistance")
+            fused, kept = fuse_results(result_lists, 3 if distance is None else int(distance))
+        with self.lock:
+            for provider, count in kept.items():
+                metrics.inc("news_provider_kept_total", count, provider=provider)
+                self.provider_stats[provider]["kept"] += count
+        logger.info(f"'{keyword}' 多源合并: {sum(len(items) for _, items in result_lists)} 条 -> {len(fused)} 条")
+        return fused
+    
+    def _search_provider(self, provider: str, keyword: str) -> List[Dict[str, Any]]:
+        """使用指定提供商搜索新闻，并记录耗时和返回条数"""
+        search_provider = self.search_providers.get(provider)
+        if self.health.is_open(provider):
+            # 熔断中的提供商直接跳过，不再等待限速令牌和请求超时
+            logger.debug(f"{provider} 已熔断，跳过关键词 '{keyword}'")
+            metrics.inc("news_circuit_breaker_total", provider=provider, event="skipped")
+            with self.lock:
+                self._get_provider_stats(provider)["skipped"] += 1
+            return []
+        
+        # 按提供商限速，避免触发API限制；已合并到批量请求的关键词由批次统一限速
+        rate_limiter = self.rate_limiters.get(provider)
+        if rate_limiter and search_provider.needs_rate_limit(keyword):
+            rate_limiter.acquire()
+        
+        semaphore = self.semaphores.get(provider)
+        if semaphore is not None:
+            semaphore.acquire()
+        start = time.monotonic()
         try:
-            # NewsAPI.org 的 everything 端点，支持关键词搜索
-            url = "https://newsapi.org/v2/everything"
-            headers = {"X-API-Key": self.api_key}
-            params = {
-                "q": keyword,
-                "language": "en",  # 英文新闻
-                "sortBy": "publishedAt",  # 按发布时间排序
-                "pageSize": self.settings.get_setting("maxResults"),
-                "domains": "techcrunch.com,engadget.com,thenextweb.com,arstechnica.com,wired.com,theverge.com"  # 科技媒体
-            }
-            
-            if not self.api_key or self.api_key.strip() == "":
-                logger.warning("NewsAPI.org API密钥未配置，返回模拟数据")
-                # 返回模拟数据作为备用
+            if search_provider is None:
+                logger.error(f"不支持的API提供商: {provider}")
                 results = []
-                for i in range(5):
-                    news_item = {
-                        "title": f"[模拟] 关于{keyword}的AI新闻 #{i+1}",
-                        "source": "模拟科技媒体",
-                        "link": f"https://example.com/ai-news/{i}",
-                        "publishedAt": datetime.now().isoformat(),
-                        "tags": [keyword, "AI", "科技"],
-                        "imageUrl": "https://via.placeholder.com/300x200/3b82f6/ffffff?text=AI+News",
-                        "content": f"这是关于{keyword}的模拟AI新闻内容。讨论了人工智能和{keyword}相关的最新技术发展、行业趋势和创新应用。#{i+1}"
-                    }
-                    results.append(news_item)
-                return results
-            
-            response = requests.get(url, headers=headers, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            if data.get("status") != "ok":
-                logger.error(f"NewsAPI.org错误: {data.get('message', '未知错误')}")
-                return []
-            
-            results = []
-            articles = data.get("articles", [])
-            
-            for article in articles:
-                # 过滤掉被移除的文章
-                if article.get("title") == "[Removed]":
-                    continue
-                    
-                news_item = {
-                    "title": article.get("title", ""),
-                    "source": article.get("source", {}).get("name", ""),
-                    "link": article.get("url", ""),
-                    "publishedAt": article.get("publishedAt", datetime.now().isoformat()),
-                    "tags": [keyword, "AI", "科技"],
-                    "imageUrl": article.get("urlToImage") or "https://via.placeholder.com/300x200/3b82f6/ffffff?text=Tech+News",
-                    "content": article.get("description", article.get("content", ""))[:200] + "..." if article.get("description") else ""
-                }
-                results.append(news_item)
-            
-            logger.info(f"NewsAPI.org返回 {len(results)} 条新闻")
-            return results
-            
-        except Exception as e:
-            logger.error(f"NewsAPI.org调用失败: {e}")
-            return []
+            else:
+                results = search_provider.search(keyword)
+        finally:
+            if semaphore is not None:
+                semaphore.release()
+        
+        latency = time.monotonic() - start
+        metrics.observe("news_provider_search_seconds", latency, provider=provider)
+        metrics.inc("news_provider_items_total", len(results), provider=provider)
+        with self.lock:
+            stats = self._get_provider_stats(provider)
+            stats["calls"] += 1
+            stats["latency"] += latency
+            stats["items"] += len(results)
+        return results
+    
+    def _get_provider_stats(self, provider: str) -> Dict[str, Any]:
+        """获取提供商的抓取统计（调用方持有 self.lock）"""
+        return self.provider_stats.setdefault(provider, {"calls": 0, "latency": 0.0, "items": 0, "kept": 0, "skipped": 0})
+
+
+# SQLite表结构迁移，按版本号顺序执行，当前版本记录在 PRAGMA user_version 中
+SCHEMA_MIGRATIONS: List[Tuple[int, str]] = [
+    (1, """
+    CREATE TABLE IF NOT EXISTS news (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        source TEXT,
+        link TEXT UNIQUE,
+        publishedAt TEXT,
+        tags TEXT,
+        imageUrl TEXT,
+        content TEXT
+    );
+    """),
+    (2, """
+    -- 按发布时间排序的列表查询
+    CREATE INDEX IF NOT EXISTS idx_news_publishedAt ON news (publishedAt);
+    
+    -- 规范化的标签表，由触发器与 news.tags 保持同步；冗余发布时间以便按标签分页
+    CREATE TABLE IF NOT EXISTS news_tags (
+        news_id INTEGER NOT NULL,
+        tag TEXT NOT NULL,
+        publishedAt TEXT,
+        PRIMARY KEY (news_id, tag)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_news_tags_tag ON news_tags (tag, publishedAt);
+    
+    -- 全文索引（trigram分词，支持中文子串检索）
+    CREATE VIRTUAL TABLE IF NOT EXISTS news_fts USING fts5(
+        title, content, content='news', content_rowid='id', tokenize='trigram'
+    );
+    
+    CREATE TRIGGER IF NOT EXISTS news_after_insert AFTER INSERT ON news BEGIN
+        INSERT INTO news_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+        INSERT OR IGNORE INTO news_tags (news_id, tag, publishedAt)
+            SELECT new.id, value, new.publishedAt FROM json_each(CASE WHEN json_valid(new.tags) THEN new.tags ELSE '[]' END);
+    END;
+    
+    CREATE TRIGGER IF NOT EXISTS news_after_delete AFTER DELETE ON news BEGIN
+        INSERT INTO news_fts (news_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+        DELETE FROM news_tags WHERE news_id = old.id;
+    END;
+    
+    CREATE TRIGGER IF NOT EXISTS news_after_update AFTER UPDATE ON news BEGIN
+        INSERT INTO news_fts (news_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO news_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+        DELETE FROM news_tags WHERE news_id = old.id;
+        INSERT OR IGNORE INTO news_tags (news_id, tag, publishedAt)
+            SELECT new.id, value, new.publishedAt FROM json_each(CASE WHEN json_valid(new.tags) THEN new.tags ELSE '[]' END);
+    END;
+    
+    -- 为已有数据建立索引
+    INSERT INTO news_fts (news_fts) VALUES ('rebuild');
+    INSERT OR IGNORE INTO news_tags (news_id, tag, publishedAt)
+        SELECT news.id, tags.value, news.publishedAt FROM news, json_each(CASE WHEN json_valid(news.tags) THEN news.tags ELSE '[]' END) AS tags;
+    """),
+    (3, """
+    -- 内容字段的哈希，再次抓取到内容相同的新闻时跳过更新
+    ALTER TABLE news ADD COLUMN contentHash TEXT;
     
-    def _search_zhipu(self, keyword: str) -> List[Dict[str, Any]]:
-        """使用智谱清言AI搜索新闻"""
+    -- 全文索引和标签表只在相关字段变化时重建
+    DROP TRIGGER IF EXISTS news_after_update;
+    CREATE TRIGGER IF NOT EXISTS news_after_update_text AFTER UPDATE OF title, content ON news
+    WHEN old.title IS NOT new.title OR old.content IS NOT new.content BEGIN
+        INSERT INTO news_fts (news_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO news_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+    END;
+    CREATE TRIGGER IF NOT EXISTS news_after_update_tags AFTER UPDATE OF tags, publishedAt ON news
+    WHEN old.tags IS NOT new.tags OR old.publishedAt IS NOT new.publishedAt BEGIN
+        DELETE FROM news_tags WHERE news_id = old.id;
+        -- 外层UPSERT语句的冲突处理会覆盖 OR IGNORE，重复标签需先去重
+        INSERT OR IGNORE INTO news_tags (news_id, tag, publishedAt)
+            SELECT DISTINCT new.id, value, new.publishedAt FROM json_each(CASE WHEN json_valid(new.tags) THEN new.tags ELSE '[]' END);
+    END;
+    """),
+    (4, """
+    -- 前端通过sql.js整体下载 news.db，全文索引和标签表移到单独的检索数据库（见 SEARCH_SCHEMA_MIGRATIONS）
+    DROP TRIGGER IF EXISTS news_after_insert;
+    DROP TRIGGER IF EXISTS news_after_delete;
+    DROP TRIGGER IF EXISTS news_after_update;
+    DROP TRIGGER IF EXISTS news_after_update_text;
+    DROP TRIGGER IF EXISTS news_after_update_tags;
+    DROP TABLE IF EXISTS news_fts;
+    DROP TABLE IF EXISTS news_tags;
+    """)
+]
+
+# 检索数据库（以 search 附加到 news.db 的连接上）的表结构迁移，版本记录在 PRAGMA search.user_version 中
+SEARCH_SCHEMA_MIGRATIONS: List[Tuple[int, str]] = [
+    (1, """
+    -- 规范化的标签表；冗余发布时间以便按标签分页
+    CREATE TABLE IF NOT EXISTS search.news_tags (
+        news_id INTEGER NOT NULL,
+        tag TEXT NOT NULL,
+        publishedAt TEXT,
+        PRIMARY KEY (news_id, tag)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS search.idx_news_tags_tag ON news_tags (tag, publishedAt);
+    
+    -- 全文索引（trigram分词，支持中文子串检索）；不保存原文，rowid 对应 news.id
+    CREATE VIRTUAL TABLE IF NOT EXISTS search.news_fts USING fts5(
+        title, content, content='', tokenize='trigram'
+    );
+    """)
+]
+
+# 触发器与 news 表跨数据库同步检索数据库，只有TEMP触发器可以写入其他数据库，每个连接打开时创建
+SEARCH_TRIGGERS = """
+CREATE TEMP TRIGGER IF NOT EXISTS news_after_insert AFTER INSERT ON main.news BEGIN
+    INSERT INTO news_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+    INSERT OR IGNORE INTO news_tags (news_id, tag, publishedAt)
+        SELECT DISTINCT new.id, value, new.publishedAt FROM json_each(CASE WHEN json_valid(new.tags) THEN new.tags ELSE '[]' END);
+END;
+
+CREATE TEMP TRIGGER IF NOT EXISTS news_after_delete AFTER DELETE ON main.news BEGIN
+    INSERT INTO news_fts (news_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+    DELETE FROM news_tags WHERE news_id = old.id;
+END;
+
+-- 全文索引和标签表只在相关字段变化时重建
+CREATE TEMP TRIGGER IF NOT EXISTS news_after_update_text AFTER UPDATE OF title, content ON main.news
+WHEN old.title IS NOT new.title OR old.content IS NOT new.content BEGIN
+    INSERT INTO news_fts (news_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+    INSERT INTO news_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+END;
+
+CREATE TEMP TRIGGER IF NOT EXISTS news_after_update_tags AFTER UPDATE OF tags, publishedAt ON main.news
+WHEN old.tags IS NOT new.tags OR old.publishedAt IS NOT new.publishedAt BEGIN
+    DELETE FROM news_tags WHERE news_id = old.id;
+    -- 外层UPSERT语句的冲突处理会覆盖 OR IGNORE，重复标签需先去重
+    INSERT OR IGNORE INTO news_tags (news_id, tag, publishedAt)
+        SELECT DISTINCT new.id, value, new.publishedAt FROM json_each(CASE WHEN json_valid(new.tags) THEN new.tags ELSE '[]' END);
+END;
+"""
+
+# 按 news 表重建检索数据库（新建、被删除或与 news 表不一致时）
+SEARCH_REBUILD = """
+DELETE FROM search.news_tags;
+INSERT INTO search.news_fts (news_fts) VALUES ('delete-all');
+INSERT INTO search.news_fts (rowid, title, content) SELECT id, title, content FROM main.news;
+INSERT OR IGNORE INTO search.news_tags (news_id, tag, publishedAt)
+    SELECT news.id, tags.value, news.publishedAt FROM main.news, json_each(CASE WHEN json_valid(news.tags) THEN news.tags ELSE '[]' END) AS tags;
+"""
+
+
+def migrate_schema(conn: sqlite3.Connection, migrations: List[Tuple[int, str]] = SCHEMA_MIGRATIONS,
+                   schema: str = "main") -> int:
+    """将数据库表结构升级到最新版本，返回升级前的版本"""
+    version = conn.execute(f"PRAGMA {schema}.user_version").fetchone()[0]
+    for target, script in migrations:
+        if target <= version:
+            continue
+        logger.info(f"正在升级{'检索' if schema == 'search' else ''}数据库表结构到版本 {target}")
         try:
-            # 智谱清言Chat Completions API
-            url = "https://open.bigmodel.cn/api/paas/v4/chat/completions"
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            if not self.api_key or self.api_key.strip() == "":
-                logger.warning("智谱清言API密钥未配置，无法获取真实新闻数据")
-                return []
-            
-            # 构建聊天请求，让AI生成关于关键词的新闻内容
-            payload = {
-                "model": "glm-4",
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": f"请基于'{keyword}'这个主题，生成5条最新的、具有时效性的新闻标题和内容摘要。请模拟2024-2025年的最新发展趋势和突破性进展。请以JSON数组格式返回，每条新闻包含以下字段：title(新闻标题，体现最新发展)、source(知名媒体来源)、content(内容摘要，100-200字，突出创新性和时效性)、publishedAt(发布时间，使用ISO格式，应为近期时间)、imageUrl(相关图片链接)。请确保新闻内容反映该领域的最新趋势、技术突破或重要进展，避免过时信息。请直接返回JSON数组，不要添加其他说明文字。"
-                    }
-                ],
-                "stream": False,
-                "temperature": 0.7
-            }
-            
-            response = requests.post(url, headers=headers, json=payload, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            results = []
-            
-            # 解析智谱清言返回的搜索结果
-            if "choices" in data and len(data["choices"]) > 0:
-                content = data["choices"][0].get("message", {}).get("content", "")
-                logger.info(f"智谱清言AI返回内容: {content[:500]}...")
-                
-                # 尝试解析AI返回的JSON格式内容
-                try:
-                    import json
-                    import re
-                    
-                    # 尝试从回复中提取JSON内容
-                    json_match = re.search(r'\[.*\]', content, re.DOTALL)
-                    if json_match:
-                        json_str = json_match.group(0)
-                        news_data = json.loads(json_str)
-                        
-                        for item in news_data[:5]:  # 最多取5条
-                            if isinstance(item, dict):
-                                # 处理图片URL，统一使用可靠的Unsplash图片
-                                image_url = item.get("imageUrl", "")
-                                # 检查是否为不可靠的图片链接，统一替换为Unsplash图片
-                                # 只允许使用Unsplash图片，其他所有域名都替换
-                                if not image_url or "images.unsplash.com" not in image_url:
-                                    relevant_images = self._get_relevant_images(keyword)
-                                    image_url = relevant_images[len(results) % len(relevant_images)]
-                                
-                                news_item = {
-                                    "title": item.get("title", f"关于{keyword}的新闻"),
-                                    "source": item.get("source", "智谱清言AI"),
-                                    "link": item.get("link", f"https://example.com/news/{len(results)}"),
-                                    "publishedAt": datetime.now().isoformat(),  # 始终使用当前时间确保新闻显示在最上面
-                                    "tags": [keyword, "AI搜索", "智谱清言"],
-                                    "imageUrl": image_url,
-                                    "content": item.get("content", "智谱清言AI生成的新闻内容")
-                                }
-                                results.append(news_item)
-                    else:
-                        # 如果没有找到JSON格式，生成基于AI回复的新闻条目
-                        relevant_images = self._get_relevant_images(keyword)
-                        news_item = {
-                            "title": f"智谱清言AI关于{keyword}的分析报告",
-                            "source": "智谱清言AI",
-                            "link": f"https://chatglm.cn/search?q={keyword}",
-                            "publishedAt": datetime.now().isoformat(),
-                            "tags": [keyword, "AI分析", "智谱清言"],
-                            "imageUrl": relevant_images[0],
-                            "content": content[:500] + "..." if len(content) > 500 else content
-                        }
-                        results.append(news_item)
-                        
-                except (json.JSONDecodeError, AttributeError) as e:
-                    logger.warning(f"解析AI返回的JSON失败: {e}，使用原始内容")
-                    # 生成基于AI回复的新闻条目
-                    relevant_images = self._get_relevant_images(keyword)
-                    news_item = {
-                        "title": f"智谱清言AI关于{keyword}的分析报告",
-                        "source": "智谱清言AI",
-                        "link": f"https://chatglm.cn/search?q={keyword}",
-                        "publishedAt": datetime.now().isoformat(),
-                        "tags": [keyword, "AI分析", "智谱清言"],
-                        "imageUrl": relevant_images[0],
-                        "content": content[:500] + "..." if len(content) > 500 else content
-                    }
-                    results.append(news_item)
-            
-            logger.info(f"智谱清言AI搜索返回 {len(results)} 条新闻")
-            return results
+            conn.executescript(f"BEGIN;\n{script}\nPRAGMA {schema}.user_version = {target};\nCOMMIT;")
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.rollback()
+            # 多个实例同时启动时，其他实例可能已完成升级
+            if conn.execute(f"PRAGMA {schema}.user_version").fetchone()[0] >= target:
+                continue
+            raise
+    return version
+
+
+# 保留策略按批读取过期新闻写入归档的条数
+RETENTION_BATCH_SIZE = 1000
+
+
+def atomic_write_json(path: str, records: Iterable[Any]) -> None:
+    """以流式方式写出JSON数组，写入临时文件后原子替换，避免中途崩溃损坏文件"""
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write("[")
+            for i, record in enumerate(records):
+                f.write(",\n  " if i else "\n  ")
+                f.write(json.dumps(record, ensure_ascii=False))
+            f.write("\n]\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class JsonlNewsStore:
+    """追加式JSONL新闻存储
+
+    新增或变更的记录只追加到文件末尾，通过SQLite旁路索引（link -> id, offset）
+    去重，单次保存的开销与本批数据量成正比。过期记录比例过高时自动压缩。
+    """
+    
+    def __init__(self, jsonl_path: str, compact_ratio: float = 0.5):
+        """初始化存储并打开旁路索引"""
+        self.jsonl_path = jsonl_path
+        self.index_path = jsonl_path + ".idx"
+        self.compact_ratio = compact_ratio
+        os.makedirs(os.path.dirname(jsonl_path) or ".", exist_ok=True)
+        
+        # 由后台写入线程创建，本轮结束后在主线程导出；同一时间只有一个线程访问
+        self.index = sqlite3.connect(self.index_path, check_same_thread=False)
+        self.index.execute("CREATE TABLE IF NOT EXISTS links (link TEXT PRIMARY KEY, id INTEGER NOT NULL, offset INTEGER NOT NULL)")
+        self.index.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        self.index.commit()
+        
+        if not os.path.exists(self.jsonl_path) or self._get_meta("size") == 0:
+            self._rebuild_index()
+        else:
+            self._recover()
+    
+    def _get_meta(self, key: str) -> int:
+        """读取索引元数据"""
+        row = self.index.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+    
+    def _set_meta(self, key: str, value: int) -> None:
+        """写入索引元数据"""
+        self.index.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+    
+    def _recover(self) -> None:
+        """根据索引记录的文件长度恢复上次崩溃前的一致状态"""
+        size = self._get_meta("size")
+        file_size = os.path.getsize(self.jsonl_path)
+        if file_size < size:
+            # 压缩后替换了文件但索引未提交，重建索引
+            logger.warning(f"JSONL文件与索引不一致，正在重建索引: {self.jsonl_path}")
+            self._rebuild_index()
+        elif file_size > size:
+            # 已写入文件但未提交到索引的尾部数据，截断
+            logger.warning(f"检测到未提交的JSONL尾部数据，截断到 {size} 字节: {self.jsonl_path}")
+            with open(self.jsonl_path, 'r+b') as f:
+                f.truncate(size)
+    
+    def _rebuild_index(self) -> None:
+        """扫描JSONL文件重建索引（索引缺失或损坏时使用）"""
+        with self.index:
+            self.index.execute("DELETE FROM links")
+            self.index.execute("DELETE FROM meta")
+            if not os.path.exists(self.jsonl_path):
+                open(self.jsonl_path, 'ab').close()
+                return
             
-        except Exception as e:
-            logger.error(f"智谱清言AI搜索失败: {e}")
-            return []
+            lines = 0
+            max_id = 0
+            size = 0
+            with open(self.jsonl_path, 'rb') as f:
+                offset = 0
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # 不完整的尾行，丢弃
+                        break
+                    self.index.execute(
+                        "INSERT OR REPLACE INTO links (link, id, offset) VALUES (?, ?, ?)",
+                        (record.get("link", ""), record["id"], offset)
+                    )
+                    max_id = max(max_id, record["id"])
+                    lines += 1
+                    offset += len(line)
+                    size = offset
+            self._set_meta("maxId", max_id)
+            self._set_meta("lines", lines)
+            self._set_meta("size", size)
+        self._recover()
     
-    def _get_relevant_images(self, keyword: str) -> List[str]:
-        """根据关键词获取相关图片URL"""
-        # 定义不同主题的图片URL映射
-        image_mapping = {
-            "人工智能": [
-                "https://images.unsplash.com/photo-1677442136019-21780ecad995?w=300&h=200&fit=crop",
-                "https://images.unsplash.com/photo-1620712943543-bcc4688e7485?w=300&h=200&fit=crop",
-                "https://images.unsplash.com/photo-1555255707-c07966088b7b?w=300&h=200&fit=crop"
-            ],
-            "科技": [
-                "https://images.unsplash.com/photo-1518709268805-4e9042af2176?w=300&h=200&fit=crop",
-                "https://images.unsplash.com/photo-1581091226825-a6a2a5aee158?w=300&h=200&fit=crop",
-                "https://images.unsplash.com/photo-1504384308090-c894fdcc538d?w=300&h=200&fit=crop"
-            ],
-            "经济": [
-                "https://images.unsplash.com/photo-1611974789855-9c2a0a7236a3?w=300&h=200&fit=crop",
-                "https://images.unsplash.com/photo-1590283603385-17ffb3a7f29f?w=300&h=200&fit=crop",
-                "https://images.unsplash.com/photo-1554224155-6726b3ff858f?w=300&h=200&fit=crop"
-            ],
-            "医疗": [
-                "https://images.unsplash.com/photo-1559757148-5c350d0d3c56?w=300&h=200&fit=crop",
-                "https://images.unsplash.com/photo-1576091160399-112ba8d25d1f?w=300&h=200&fit=crop",
-                "https://images.unsplash.com/photo-1582750433449-648ed127bb54?w=300&h=200&fit=crop"
-            ]
-        }
+    def _read_at(self, f, offset: int) -> Dict[str, Any]:
+        """读取指定偏移处的记录"""
+        f.seek(offset)
+        return json.loads(f.readline())
+    
+    def save(self, news_items: List[NewsItem]) -> Tuple[int, int]:
+        """保存一批新闻，返回实际追加的 (新增数, 更新数)，内容未变化的新闻不追加"""
+        max_id = self._get_meta("maxId")
+        lines = self._get_meta("lines")
+        inserted = 0
+        updated = 0
         
-        # 检查关键词是否匹配已定义的主题
-        for topic, urls in image_mapping.items():
-            if topic in keyword:
-                return urls
+        with open(self.jsonl_path, 'r+b') as f:
+            f.seek(0, os.SEEK_END)
+            with self.index:
+                for item in news_items:
+                    link = item.get("link", "")
+                    row = self.index.execute("SELECT id, offset FROM links WHERE link = ?", (link,)).fetchone()
+                    if row:
+                        # 如果存在，合并标签（保留原ID），内容未变化则跳过
+                        record_id, offset = row
+                        existing = self._read_at(f, offset)
+                        f.seek(0, os.SEEK_END)
+                        tags = existing.get("tags", [])
+                        merged_tags = tags + [tag for tag in item.get("tags", []) if tag not in tags]
+                        record = {**existing, **item, "id": record_id, "tags": merged_tags}
+                        if record == existing:
+                            continue
+                        updated += 1
+                    else:
+                        # 如果不存在，分配新ID
+                        max_id += 1
+                        record = {**item, "id": max_id}
+                        inserted += 1
+                    
+                    offset = f.tell()
+                    f.write(json.dumps(record, ensure_ascii=False).encode('utf-8') + b"\n")
+                    self.index.execute(
+                        "INSERT OR REPLACE INTO links (link, id, offset) VALUES (?, ?, ?)",
+                        (link, record["id"], offset)
+                    )
+                    lines += 1
+                
+                # 先落盘数据文件，再提交索引
+                f.flush()
+                os.fsync(f.fileno())
+                self._set_meta("maxId", max_id)
+                self._set_meta("lines", lines)
+                self._set_meta("size", f.tell())
         
-        # 默认返回通用新闻图片
-        return [
-            "https://images.unsplash.com/photo-1504711434969-e33886168f5c?w=300&h=200&fit=crop",
-            "https://images.unsplash.com/photo-1586339949916-3e9457bef6d3?w=300&h=200&fit=crop",
-            "https://images.unsplash.com/photo-1495020689067-958852a7765e?w=300&h=200&fit=crop"
-        ]
+        live = self.count()
+        if lines - live > max(live, 1) * self.compact_ratio:
+            self.compact()
+        return inserted, updated
+    
+    def delete(self, links: List[str]) -> None:
+        """删除指定链接的记录，文件中的旧行在压缩时清除"""
+        with self.index:
+            self.index.executemany("DELETE FROM links WHERE link = ?", [(link,) for link in links])
+    
+    def count(self) -> int:
+        """当前有效记录数"""
+        return self.index.execute("SELECT COUNT(*) FROM links").fetchone()[0]
+    
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """按ID顺序逐条读取有效记录"""
+        with open(self.jsonl_path, 'rb') as f:
+            for (offset,) in self.index.execute("SELECT offset FROM links ORDER BY id"):
+                yield self._read_at(f, offset)
+    
+    def compact(self) -> None:
+        """压缩JSONL文件，只保留每个链接的最新记录"""
+        directory = os.path.dirname(self.jsonl_path) or "."
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".jsonl", dir=directory)
+        offsets = []
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                for record in self.iter_records():
+                    offsets.append((out.tell(), record.get("link", "")))
+                    out.write(json.dumps(record, ensure_ascii=False).encode('utf-8') + b"\n")
+                out.flush()
+                os.fsync(out.fileno())
+                size = out.tell()
+            
+            with self.index:
+                self.index.executemany("UPDATE links SET offset = ? WHERE link = ?", offsets)
+                self._set_meta("lines", len(offsets))
+                self._set_meta("size", size)
+                os.replace(tmp_path, self.jsonl_path)
+            logger.info(f"已压缩JSONL文件: {self.jsonl_path}（{len(offsets)} 条记录）")
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    
+    def export_json(self, json_path: str) -> None:
+        """导出前端使用的JSON数组文件"""
+        os.makedirs(os.path.dirname(json_path) or ".", exist_ok=True)
+        atomic_write_json(json_path, self.iter_records())
+    
+    def close(self) -> None:
+        """关闭旁路索引"""
+        self.index.close()
 
 
 class NewsStorage:
@@ -527,20 +1321,40 @@ class NewsStorage:
         """初始化存储"""
         self.settings = settings
         self.storage_type = settings.get_setting("storageType")
+        self.conn: Optional[sqlite3.Connection] = None
+        self.jsonl_store: Optional[JsonlNewsStore] = None
+        # JSONL存储中已追加但尚未导出到JSON文件的变更
+        self.export_pending = False
     
-    def save_news(self, news_items: List[NewsItem]) -> bool:
-        """保存新闻数据"""
+    def save_news(self, news_items: List[NewsItem], export: bool = True) -> bool:
+        """保存新闻数据；export为False时JSONL存储只追加，导出JSON推迟到 finish"""
         if not news_items:
             logger.warning("没有新闻数据需要保存")
             return False
         
-        if self.storage_type == "json":
-            return self._save_to_json(news_items)
-        elif self.storage_type == "sqlite":
-            return self._save_to_sqlite(news_items)
-        else:
-            logger.error(f"不支持的存储类型: {self.storage_type}")
-            return False
+        # 标签规范化为去重、保持顺序的列表，保证合并结果稳定
+        for item in news_items:
+            item["tags"] = normalize_tags(item.get("tags"))
+        
+        with metrics.timer("news_storage_save_seconds", storage=self.storage_type):
+            if self.storage_type == "json":
+                success = self._save_to_json(news_items)
+            elif self.storage_type == "sqlite":
+                success = self._save_to_sqlite(news_items)
+            elif self.storage_type == "jsonl":
+                success = self._save_to_jsonl(news_items, export)
+            else:
+                logger.error(f"不支持的存储类型: {self.storage_type}")
+                success = False
+        if not success:
+            metrics.inc("news_storage_errors_total", storage=self.storage_type)
+        return success
+    
+    def _record_rows(self, inserted: int, updated: int, skipped: int = 0) -> None:
+        """记录新增、更新和内容未变化而跳过的行数"""
+        metrics.inc("news_storage_rows_total", inserted, storage=self.storage_type, action="inserted")
+        metrics.inc("news_storage_rows_total", updated, storage=self.storage_type, action="updated")
+        metrics.inc("news_storage_rows_total", skipped, storage=self.storage_type, action="skipped")
     
     def _save_to_json(self, news_items: List[NewsItem]) -> bool:
         """保存到JSON文件"""
@@ -549,137 +1363,656 @@ class NewsStorage:
             # 确保目录存在
             os.makedirs(os.path.dirname(json_path), exist_ok=True)
             
-            # 加载现有数据
-            existing_data = []
+            # 加载现有数据（逐条解析为紧凑的 NewsRecord，不同时持有整个文件的字典）
+            existing_data: List[NewsRecord] = []
             if os.path.exists(json_path):
                 try:
-                    with open(json_path, 'r', encoding='utf-8') as f:
-                        existing_data = json.load(f)
-                except:
+                    existing_data = load_records(json_path)
+                except Exception:
                     existing_data = []
             
             # 创建链接到数据的映射
-            existing_map = {item.get("link"): item for item in existing_data}
-            max_id = max([item.get("id", 0) for item in existing_data], default=0)
+            existing_map = {record.link: record for record in existing_data}
+            max_id = max((record.id or 0 for record in existing_data), default=0)
+            inserted = 0
+            updated = 0
             
             # 覆盖式更新：基于链接判断，存在则更新，不存在则插入
             for item in news_items:
                 link = item.get("link", "")
                 if link in existing_map:
-                    # 如果存在，更新记录（保持原ID）
-                    existing_item = existing_map[link]
-                    existing_tags = existing_item.get("tags", [])
-                    new_tags = item.get("tags", [])
-                    merged_tags = list(set(existing_tags + new_tags))
-                    
-                    # 更新现有记录
-                    existing_item.update(item)
-                    existing_item["tags"] = merged_tags
+                    # 如果存在，更新记录（保持原ID，合并标签）
+                    if existing_map[link].update(item):
+                        updated += 1
                 else:
-                    # 如果不存在，分配新ID并添加
+                    # 如果不存在，分配新ID并添加；同一批中再次出现的链接按更新处理
                     max_id += 1
                     item["id"] = max_id
-                    existing_data.append(item)
+                    record = NewsRecord.from_dict(item)
+                    existing_data.append(record)
+                    existing_map[link] = record
+                    inserted += 1
+            
+            skipped = len(news_items) - inserted - updated
+            self._record_rows(inserted, updated, skipped)
+            if not inserted and not updated:
+                logger.info(f"{len(news_items)} 条新闻均无变化，不重写 JSON 文件: {json_path}")
+                return True
             
-            # 保存合并后的数据
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(existing_data, f, ensure_ascii=False, indent=2)
+            # 保存合并后的数据（原子替换，避免写入中途崩溃损坏文件）
+            atomic_write_json(json_path, (record.to_dict() for record in existing_data))
             
-            logger.info(f"已保存 {len(news_items)} 条新闻到 JSON 文件: {json_path}")
+            logger.info(f"已保存 {len(news_items)} 条新闻到 JSON 文件: {json_path}（新增 {inserted} 条，更新 {updated} 条，无变化 {skipped} 条）")
             return True
         except Exception as e:
             logger.error(f"保存到JSON失败: {e}")
             return False
     
-    def _save_to_sqlite(self, news_items: List[NewsItem]) -> bool:
-        """保存到SQLite数据库"""
+    def _save_to_jsonl(self, news_items: List[NewsItem], export: bool = True) -> bool:
+        """追加保存到JSONL文件，并导出前端使用的JSON数组"""
+        try:
+            if self.jsonl_store is None:
+                self.jsonl_store = JsonlNewsStore(
+                    self.settings.get_setting("jsonlPath"),
+                    float(self.settings.get_setting("compactRatio") or 0.5)
+                )
+            inserted, updated = self.jsonl_store.save(news_items)
+            self._record_rows(inserted, updated, len(news_items) - inserted - updated)
+            json_path = self.settings.get_setting("jsonPath")
+            if not inserted and not updated and os.path.exists(json_path):
+                logger.info(f"{len(news_items)} 条新闻均无变化，不重新导出 {json_path}")
+                return True
+            if not export:
+                self.export_pending = True
+                logger.info(f"已追加 {inserted + updated} 条新增或变更的新闻到 JSONL 文件: {self.jsonl_store.jsonl_path}")
+                return True
+            
+            self.jsonl_store.export_json(json_path)
+            self.export_pending = False
+            
+            logger.info(f"已追加 {inserted + updated} 条新增或变更的新闻到 JSONL 文件: {self.jsonl_store.jsonl_path}，并导出到 {json_path}")
+            return True
+        except Exception as e:
+            logger.error(f"保存到JSONL失败: {e}")
+            return False
+    
+    def finish(self) -> bool:
+        """导出推迟的JSON文件（JSONL存储分批保存后调用）"""
+        if not self.export_pending or self.jsonl_store is None:
+            return True
         try:
+            json_path = self.settings.get_setting("jsonPath")
+            self.jsonl_store.export_json(json_path)
+            self.export_pending = False
+            logger.info(f"已将 JSONL 文件导出到 {json_path}")
+            return True
+        except Exception as e:
+            logger.error(f"导出JSON失败: {e}")
+            metrics.inc("news_storage_errors_total", storage=self.storage_type)
+            return False
+    
+    def _get_connection(self) -> sqlite3.Connection:
+        """获取SQLite连接，每次运行只打开一次并初始化表结构"""
+        if self.conn is None:
             db_path = self.settings.get_setting("dbPath")
             # 确保目录存在
             os.makedirs(os.path.dirname(db_path), exist_ok=True)
             
-            # 连接数据库
-            conn = sqlite3.connect(db_path)
-            cursor = conn.cursor()
+            # 多个实例共享数据库时等待其他实例的写事务完成；
+            # 连接由后台写入线程创建，写入线程结束后在主线程中刷新和关闭
+            conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+            # WAL模式下读写互不阻塞，NORMAL同步级别在WAL下仍可保证一致性
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
             
-            # 创建表（如果不存在）
-            cursor.execute("""
-            CREATE TABLE IF NOT EXISTS news (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
+            # 创建或升级表结构
+            version = migrate_schema(conn)
+            if 2 <= version < 4:
+                # 全文索引和标签表已移出，回收空间后前端下载的文件才会变小
+                logger.info("正在压缩数据库（全文索引和标签表已移到检索数据库）")
+                conn.execute("VACUUM")
+            self._attach_search_db(conn)
+            # 暂存表，用于批量合并
+            conn.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS news_staging (
+                seq INTEGER PRIMARY KEY,
                 title TEXT NOT NULL,
                 source TEXT,
-                link TEXT UNIQUE,
+                link TEXT,
                 publishedAt TEXT,
                 tags TEXT,
                 imageUrl TEXT,
-                content TEXT
+                content TEXT,
+                contentHash TEXT
             )
             """)
+            self.conn = conn
+        return self.conn
+    
+    def _attach_search_db(self, conn: sqlite3.Connection) -> None:
+        """附加检索数据库（全文索引和标签表），创建同步触发器；与 news 表行数不一致时重建"""
+        db_path = self.settings.get_setting("dbPath")
+        search_path = self.settings.get_setting("searchDbPath") or os.path.join(
+            os.path.dirname(db_path), "news_search.db"
+        )
+        conn.execute("ATTACH DATABASE ? AS search", (search_path,))
+        # journal_mode 和 wal_checkpoint 不指定数据库时作用于所有附加的数据库
+        conn.execute("PRAGMA search.journal_mode=WAL")
+        conn.execute("PRAGMA search.synchronous=NORMAL")
+        migrate_schema(conn, SEARCH_SCHEMA_MIGRATIONS, "search")
+        conn.executescript(SEARCH_TRIGGERS)
+        
+        # 两个数据库分别提交，中途崩溃或单独删除、还原其中一个时可能不一致
+        news_count = conn.execute("SELECT COUNT(*) FROM main.news").fetchone()[0]
+        indexed_count = conn.execute("SELECT COUNT(*) FROM search.news_fts_docsize").fetchone()[0]
+        if news_count != indexed_count:
+            logger.info(f"正在重建检索数据库 {search_path}（{news_count} 条新闻，已索引 {indexed_count} 条）")
+            try:
+                conn.executescript(f"BEGIN IMMEDIATE;\n{SEARCH_REBUILD}\nCOMMIT;")
+            except sqlite3.Error:
+                if conn.in_transaction:
+                    conn.rollback()
+                raise
+    
+    def flush(self) -> None:
+        """将WAL内容合并到数据库主文件，连接保持打开（守护进程每轮抓取结束时调用）"""
+        if self.conn is not None:
+            # 前端通过sql.js直接加载数据库文件，切回回滚日志模式，确保WAL内容已合并到主文件
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            try:
+                self.conn.execute("PRAGMA journal_mode=DELETE")
+            except sqlite3.OperationalError as e:
+                # 其他实例仍打开着数据库时无法切换，由最后关闭的实例切换
+                logger.info(f"数据库正被其他连接使用，保持WAL模式: {e}")
+    
+    def close(self) -> None:
+        """关闭数据库连接"""
+        if self.conn is not None:
+            self.flush()
+            self.conn.close()
+            self.conn = None
+        if self.jsonl_store is not None:
+            self.jsonl_store.close()
+            self.jsonl_store = None
+    
+    def iter_news(self) -> Iterator[NewsItem]:
+        """按发布时间倒序遍历所有新闻"""
+        if self.storage_type == "sqlite":
+            conn = self._get_connection()
+            for row in conn.execute(
+                "SELECT id, title, source, link, publishedAt, tags, imageUrl, content FROM news "
+                "ORDER BY publishedAt DESC, id DESC"
+            ):
+                yield self._row_to_item(row)
+            return
+        
+        if self.storage_type == "jsonl":
+            if self.jsonl_store is None:
+                self.jsonl_store = JsonlNewsStore(
+                    self.settings.get_setting("jsonlPath"),
+                    float(self.settings.get_setting("compactRatio") or 0.5)
+                )
+            items = list(self.jsonl_store.iter_records())
+            items.sort(key=lambda item: (item.get("publishedAt") or "", item.get("id", 0)), reverse=True)
+            yield from items
+            return
+        
+        json_path = self.settings.get_setting("jsonPath")
+        if not os.path.exists(json_path):
+            return
+        records = load_records(json_path)
+        records.sort(key=lambda record: (record.publishedAt or "", record.id or 0), reverse=True)
+        for record in records:
+            yield record.to_dict()
+    
+    @staticmethod
+    def _row_to_item(row: tuple) -> NewsItem:
+        """将news表的一行转换为新闻字典"""
+        try:
+            tags = json.loads(row[5]) if row[5] else []
+        except ValueError:
+            tags = []
+        return {
+            "id": row[0],
+            "title": row[1],
+            "source": row[2],
+            "link": row[3],
+            "publishedAt": row[4],
+            "tags": tags,
+            "imageUrl": row[6],
+            "content": row[7]
+        }
+    
+    def query_news(self, text: Optional[str] = None, tag: Optional[str] = None,
+                   since: Optional[str] = None, until: Optional[str] = None,
+                   page: int = 1, page_size: int = 20) -> Dict[str, Any]:
+        """查询SQLite中的新闻，支持全文检索、标签、发布时间范围和分页
+        
+        返回 {"total": 总条数, "page": 页码, "pageSize": 每页条数, "items": 新闻列表}
+        """
+        conn = self._get_connection()
+        conditions = []
+        params: List[Any] = []
+        
+        if tag:
+            # 按标签查询时从标签表出发，利用 (tag, publishedAt) 索引排序分页
+            from_clause = "FROM news_tags JOIN news ON news.id = news_tags.news_id"
+            order_column = "news_tags.publishedAt"
+            conditions.append("news_tags.tag = ?")
+            params.append(tag)
+        else:
+            from_clause = "FROM news"
+            order_column = "news.publishedAt"
+        
+        if text:
+            if len(text) >= 3:
+                # trigram分词要求检索词至少3个字符，按短语匹配
+                conditions.append("news.id IN (SELECT rowid FROM news_fts WHERE news_fts MATCH ?)")
+                params.append('"' + text.replace('"', '""') + '"')
+            else:
+                conditions.append("(news.title LIKE ? OR news.content LIKE ?)")
+                params.extend([f"%{text}%", f"%{text}%"])
+        if since:
+            conditions.append(f"{order_column} >= ?")
+            params.append(since)
+        if until:
+            conditions.append(f"{order_column} < ?")
+            params.append(until)
+        
+        where_clause = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+        if tag and not text:
+            # 只按标签和时间筛选时，直接在标签表的索引上计数
+            total = conn.execute(f"SELECT COUNT(*) FROM news_tags {where_clause}", params).fetchone()[0]
+        elif text and len(text) >= 3 and len(conditions) == 1:
+            # 只有全文检索条件时，直接在全文索引上计数
+            total = conn.execute("SELECT COUNT(*) FROM news_fts WHERE news_fts MATCH ?", params).fetchone()[0]
+        else:
+            total = conn.execute(f"SELECT COUNT(*) {from_clause} {where_clause}", params).fetchone()[0]
+        
+        page = max(1, page)
+        rows = conn.execute(
+            f"SELECT news.id, news.title, news.source, news.link, news.publishedAt, news.tags, news.imageUrl, news.content "
+            f"{from_clause} {where_clause} ORDER BY {order_column} DESC LIMIT ? OFFSET ?",
+            params + [page_size, (page - 1) * page_size]
+        ).fetchall()
+        
+        items = [self._row_to_item(row) for row in rows]
+        return {"total": total, "page": page, "pageSize": page_size, "items": items}
+    
+    @staticmethod
+    def _staging_row(seq: int, item: NewsItem) -> tuple:
+        """将新闻转换为暂存表的一行，附带内容哈希"""
+        item = {**item, "publishedAt": item.get("publishedAt", datetime.now().isoformat())}
+        return (
+            seq,
+            item.get("title", ""),
+            item.get("source", ""),
+            item.get("link", ""),
+            item["publishedAt"],
+            json.dumps(item.get("tags", []), ensure_ascii=False),
+            item.get("imageUrl", ""),
+            item.get("content", ""),
+            content_hash(item)
+        )
+    
+    def _save_to_sqlite(self, news_items: List[NewsItem]) -> bool:
+        """保存到SQLite数据库"""
+        try:
+            db_path = self.settings.get_setting("dbPath")
+            conn = self._get_connection()
+            # 上一轮flush后连接处于回滚日志模式，写入前切回WAL
+            conn.execute("PRAGMA journal_mode=WAL")
             
-            # 覆盖式更新：基于链接判断，存在则更新，不存在则插入
-            for item in news_items:
-                # 检查新闻链接是否已存在
-                cursor.execute("SELECT id, tags FROM news WHERE link = ?", (item.get("link", ""),))
-                existing = cursor.fetchone()
+            # 逐行生成参数，不在内存中保留整批的元组
+            rows = (self._staging_row(seq, item) for seq, item in enumerate(news_items))
+            
+            with conn:
+                # 开始时即获取写锁：先读后写的事务在其他实例提交后无法升级为写事务
+                conn.execute("BEGIN IMMEDIATE")
+                # 批量写入暂存表
+                conn.execute("DELETE FROM news_staging")
+                conn.executemany(
+                    "INSERT INTO news_staging (seq, title, source, link, publishedAt, tags, imageUrl, content, contentHash) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                inserted = conn.execute(
+                    "SELECT COUNT(DISTINCT link) FROM news_staging AS s WHERE NOT EXISTS (SELECT 1 FROM news WHERE news.link = s.link)"
+                ).fetchone()[0]
                 
-                if existing:
-                    # 如果存在，更新记录
-                    existing_id, existing_tags_str = existing
-                    try:
-                        existing_tags = json.loads(existing_tags_str) if existing_tags_str else []
-                    except:
-                        existing_tags = []
-                    
-                    # 合并标签
-                    new_tags = item.get("tags", [])
-                    merged_tags = list(set(existing_tags + new_tags))
-                    
-                    cursor.execute(
-                        "UPDATE news SET title=?, source=?, publishedAt=?, tags=?, imageUrl=?, content=? WHERE id=?",
-                        (
-                            item.get("title", ""),
-                            item.get("source", ""),
-                            item.get("publishedAt", datetime.now().isoformat()),
-                            json.dumps(merged_tags, ensure_ascii=False),
-                            item.get("imageUrl", ""),
-                            item.get("content", ""),
-                            existing_id
-                        )
-                    )
-                else:
-                    # 如果不存在，插入新记录
-                    cursor.execute(
-                        "INSERT INTO news (title, source, link, publishedAt, tags, imageUrl, content) VALUES (?, ?, ?, ?, ?, ?, ?)",
-                        (
-                            item.get("title", ""),
-                            item.get("source", ""),
-                            item.get("link", ""),
-                            item.get("publishedAt", datetime.now().isoformat()),
-                            json.dumps(item.get("tags", []), ensure_ascii=False),
-                            item.get("imageUrl", ""),
-                            item.get("content", "")
+                # 覆盖式更新：基于链接判断，存在则更新（保留原ID，在SQL中按原顺序追加新标签），不存在则插入；
+                # 内容哈希相同且没有新标签的新闻不更新，不触发全文索引和标签表的重建
+                conn.execute("""
+                INSERT INTO news (title, source, link, publishedAt, tags, imageUrl, content, contentHash)
+                SELECT title, source, link, publishedAt, tags, imageUrl, content, contentHash
+                FROM news_staging WHERE true ORDER BY seq
+                ON CONFLICT(link) DO UPDATE SET
+                    title = excluded.title,
+                    source = excluded.source,
+                    publishedAt = excluded.publishedAt,
+                    tags = CASE
+                        WHEN news.tags = excluded.tags OR NOT json_valid(news.tags) THEN excluded.tags
+                        ELSE (
+                            SELECT json_group_array(value) FROM (
+                                SELECT value FROM (
+                                    SELECT value, 0 AS part, key FROM json_each(news.tags)
+                                    UNION ALL
+                                    SELECT value, 1 AS part, key FROM json_each(excluded.tags)
+                                )
+                                GROUP BY value ORDER BY MIN(part * 1000000 + key)
+                            )
                         )
+                    END,
+                    imageUrl = excluded.imageUrl,
+                    content = excluded.content,
+                    contentHash = excluded.contentHash
+                WHERE news.contentHash IS NOT excluded.contentHash
+                    OR EXISTS (
+                        SELECT 1 FROM json_each(excluded.tags) AS t
+                        WHERE NOT EXISTS (SELECT 1 FROM news_tags WHERE news_tags.news_id = news.id AND news_tags.tag = t.value)
                     )
+                """)
+                written = conn.execute("SELECT changes()").fetchone()[0]
+                conn.execute("DELETE FROM news_staging")
+            skipped = len(news_items) - written
+            self._record_rows(inserted, written - inserted, skipped)
             
-            # 提交事务
-            conn.commit()
-            conn.close()
-            
-            logger.info(f"已保存 {len(news_items)} 条新闻到 SQLite 数据库: {db_path}")
+            logger.info(f"已保存 {len(news_items)} 条新闻到 SQLite 数据库: {db_path}（新增 {inserted} 条，更新 {written - inserted} 条，无变化 {skipped} 条）")
             return True
         except Exception as e:
             logger.error(f"保存到SQLite失败: {e}")
             return False
+    
+    def prune_news(self, default_cutoff: str, tag_cutoffs: Dict[str, str], max_rows: int = 0,
+                   archive: Optional[NewsArchive] = None, dry_run: bool = False) -> List[str]:
+        """按保留策略删除过期新闻，删除前写入归档，返回过期新闻的链接
+        
+        default_cutoff 和 tag_cutoffs 为 retention_cutoffs 计算的发布时间截止点，dry_run 时只统计不删除
+        """
+        if self.storage_type == "sqlite":
+            return self._prune_sqlite(default_cutoff, tag_cutoffs, max_rows, archive, dry_run)
+        if self.storage_type == "jsonl":
+            return self._prune_jsonl(default_cutoff, tag_cutoffs, max_rows, archive, dry_run)
+        if self.storage_type == "json":
+            return self._prune_json(default_cutoff, tag_cutoffs, max_rows, archive, dry_run)
+        raise ValueError(f"不支持的存储类型: {self.storage_type}")
+    
+    def _prune_sqlite(self, default_cutoff: str, tag_cutoffs: Dict[str, str], max_rows: int,
+                      archive: Optional[NewsArchive], dry_run: bool) -> List[str]:
+        """删除SQLite中的过期新闻"""
+        conn = self._get_connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS retention_tags (tag TEXT PRIMARY KEY, cutoff TEXT NOT NULL)")
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS news_expired (id INTEGER PRIMARY KEY)")
+        with conn:
+            conn.execute("DELETE FROM retention_tags")
+            conn.execute("DELETE FROM news_expired")
+            conn.executemany("INSERT INTO retention_tags (tag, cutoff) VALUES (?, ?)", tag_cutoffs.items())
+            
+            # 先用发布时间索引缩小范围，再按标签取保留时间最长的截止点
+            latest_cutoff = max([default_cutoff, *tag_cutoffs.values()])
+            if latest_cutoff:
+                conn.execute("""
+                INSERT INTO news_expired (id)
+                SELECT id FROM news
+                WHERE publishedAt < :latest AND publishedAt != '' AND publishedAt < COALESCE(
+                    (SELECT MIN(r.cutoff) FROM news_tags AS t JOIN retention_tags AS r ON r.tag = t.tag
+                     WHERE t.news_id = news.id),
+                    :default
+                )
+                """, {"latest": latest_cutoff, "default": default_cutoff})
+            if max_rows:
+                conn.execute("""
+                INSERT OR IGNORE INTO news_expired (id)
+                SELECT id FROM news WHERE id NOT IN (SELECT id FROM news_expired)
+                ORDER BY publishedAt DESC, id DESC LIMIT -1 OFFSET ?
+                """, (max_rows,))
+        
+        cursor = conn.execute(
+            "SELECT id, title, source, link, publishedAt, tags, imageUrl, content FROM news "
+            "WHERE id IN (SELECT id FROM news_expired) ORDER BY publishedAt"
+        )
+        links = []
+        while True:
+            rows = cursor.fetchmany(RETENTION_BATCH_SIZE)
+            if not rows:
+                break
+            items = [self._row_to_item(row) for row in rows]
+            links.extend(item["link"] for item in items)
+            if archive is not None and not dry_run:
+                archive.write(items)
+        
+        if links and not dry_run:
+            # 触发器同步删除全文索引和标签表中的记录
+            with conn:
+                conn.execute("DELETE FROM news WHERE id IN (SELECT id FROM news_expired)")
+                conn.execute("DELETE FROM news_expired")
+        return links
+    
+    def _prune_json(self, default_cutoff: str, tag_cutoffs: Dict[str, str], max_rows: int,
+                    archive: Optional[NewsArchive], dry_run: bool) -> List[str]:
+        """删除JSON文件中的过期新闻"""
+        json_path = self.settings.get_setting("jsonPath")
+        if not os.path.exists(json_path):
+            return []
+        records = load_records(json_path)
+        expired = select_expired(
+            ((i, record.publishedAt, record.tags) for i, record in enumerate(records)),
+            default_cutoff, tag_cutoffs, max_rows
+        )
+        links = [records[i].link for i in sorted(expired)]
+        if not expired or dry_run:
+            return links
+        
+        if archive is not None:
+            archive.write(records[i].to_dict() for i in sorted(expired))
+        atomic_write_json(json_path, (record.to_dict() for i, record in enumerate(records) if i not in expired))
+        return links
+    
+    def _prune_jsonl(self, default_cutoff: str, tag_cutoffs: Dict[str, str], max_rows: int,
+                     archive: Optional[NewsArchive], dry_run: bool) -> List[str]:
+        """删除JSONL存储中的过期新闻，压缩文件并重新导出JSON"""
+        if self.jsonl_store is None:
+            self.jsonl_store = JsonlNewsStore(
+                self.settings.get_setting("jsonlPath"),
+                float(self.settings.get_setting("compactRatio") or 0.5)
+            )
+        expired = select_expired(
+            ((record["id"], record.get("publishedAt"), record.get("tags", [])) for record in self.jsonl_store.iter_records()),
+            default_cutoff, tag_cutoffs, max_rows
+        )
+        if not expired:
+            return []
+        
+        # 第二遍读取过期记录写入归档，不在内存中保留全部记录
+        links = []
+        batch = []
+        for record in self.jsonl_store.iter_records():
+            if record["id"] not in expired:
+                continue
+            links.append(record.get("link", ""))
+            batch.append(record)
+            if len(batch) >= RETENTION_BATCH_SIZE:
+                if archive is not None and not dry_run:
+                    archive.write(batch)
+                batch = []
+        if dry_run:
+            return links
+        if batch and archive is not None:
+            archive.write(batch)
+        
+        self.jsonl_store.delete(links)
+        self.jsonl_store.compact()
+        self.jsonl_store.export_json(self.settings.get_setting("jsonPath"))
+        return links
+    
+    def compact_database(self) -> None:
+        """回收SQLite中已删除数据占用的空间并更新查询统计信息"""
+        if self.storage_type != "sqlite":
+            return
+        conn = self._get_connection()
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            # 首次运行时切换为增量回收模式，需要完整VACUUM一次重建文件
+            logger.info("正在将数据库切换为增量回收模式（需要完整VACUUM一次）")
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")
+        else:
+            conn.execute("PRAGMA incremental_vacuum")
+        # 合并全文索引的分段（检索数据库不被前端下载，不压缩）
+        conn.execute("INSERT INTO news_fts (news_fts) VALUES ('optimize')")
+        conn.commit()
+        conn.execute("ANALYZE")
+        conn.commit()
+
+
+# 守护进程模式下无需重建API会话和数据库连接即可生效的设置项
+# （concurrency 决定连接池大小、多源并发查询的线程数和自适应并发上限，修改后需要重建NewsAPI）
+HOT_RELOAD_SETTINGS = {
+    "keywords", "maxResults", "maxPages", "nearDuplicateDistance",
+    "export", "exportPath", "exportPageSize", "scheduleInterval", "scheduleIntervals", "scheduleJitter"
+}
+
+# 守护进程检查设置文件变化的最长间隔（秒）
+SETTINGS_POLL_INTERVAL = 10
+
+
+class FetchSchedule:
+    """守护进程的抓取计划，每个关键词与提供商的组合按各自的间隔调度"""
+    
+    def __init__(self, settings: NewsSettings):
+        """初始化抓取计划"""
+        self.settings = settings
+        self.next_due: Dict[Tuple[str, str], float] = {}
+        self.rng = random.Random()
+    
+    def _get_interval(self, keyword: str, provider: str) -> float:
+        """获取抓取间隔（加随机抖动），关键词和提供商都设置了间隔时取较长者"""
+        intervals = self.settings.get_setting("scheduleIntervals") or {}
+        overrides = [intervals[key] for key in (keyword, provider) if key in intervals]
+        interval = float(max(overrides) if overrides else self.settings.get_setting("scheduleInterval"))
+        jitter = float(self.settings.get_setting("scheduleJitter") or 0)
+        return interval * (1 + self.rng.uniform(-jitter, jitter))
+    
+    def sync(self, keywords: List[str], providers: List[str]) -> None:
+        """按当前设置更新抓取计划，新增的组合立即抓取，已删除的组合不再调度"""
+        jobs = {(keyword, provider) for keyword in keywords for provider in providers}
+        now = time.time()
+        self.next_due = {job: self.next_due.get(job, now) for job in jobs}
+    
+    def due(self) -> Dict[str, List[str]]:
+        """获取到期的抓取任务，按关键词分组，同一关键词的提供商一起查询以便合并去重"""
+        now = time.time()
+        due: Dict[str, List[str]] = {}
+        for (keyword, provider), next_due in self.next_due.items():
+            if next_due <= now:
+                due.setdefault(keyword, []).append(provider)
+        return due
+    
+    def reschedule(self, due: Dict[str, List[str]]) -> None:
+        """安排已完成任务的下一次抓取"""
+        now = time.time()
+        for keyword, providers in due.items():
+            for provider in providers:
+                if (keyword, provider) in self.next_due:
+                    self.next_due[(keyword, provider)] = now + self._get_interval(keyword, provider)
+    
+    def release(self, due: Dict[str, List[str]], failed: bool) -> None:
+        """放弃未完成的任务：失败的任务同样按间隔重新调度，避免持续重试；收到停止信号跳过的任务不变"""
+        if failed:
+            self.reschedule(due)
+    
+    def seconds_until_next(self) -> float:
+        """距离下一个任务到期的秒数"""
+        if not self.next_due:
+            return float("inf")
+        return max(0.0, min(self.next_due.values()) - time.time())
+    
+    def close(self) -> None:
+        """释放抓取计划持有的资源"""
+
+
+class SharedFetchSchedule(FetchSchedule):
+    """多个实例共享的抓取计划：任务保存在 JobQueue 的租约表中，每次领取一批到期的关键词"""
+    
+    def __init__(self, settings: NewsSettings, get_fetch_state: Callable[[], Optional[FetchState]]):
+        """初始化任务队列并启动租约心跳，get_fetch_state返回当前的增量抓取状态"""
+        from news_queue import JobQueue
+        
+        super().__init__(settings)
+        self.get_fetch_state = get_fetch_state
+        queue_path = settings.get_setting("queuePath") or os.path.join(
+            os.path.dirname(settings.get_setting("dbPath")), "fetch_queue.db"
+        )
+        self.queue = JobQueue(queue_path, float(settings.get_setting("queueLeaseSeconds") or 300))
+        self.queue.start_heartbeat()
+        logger.info(f"使用共享任务队列: {queue_path}，实例: {self.queue.worker_id}")
+    
+    def sync(self, keywords: List[str], providers: List[str]) -> None:
+        """按当前设置同步任务表"""
+        self.queue.sync((keyword, provider) for keyword in keywords for provider in providers)
+    
+    def due(self) -> Dict[str, List[str]]:
+        """领取一批到期的任务，其他实例记录的高水位合并到本地的增量抓取状态"""
+        jobs = self.queue.claim(int(self.settings.get_setting("queueBatchSize") or 1))
+        fetch_state = self.get_fetch_state()
+        due: Dict[str, List[str]] = {}
+        for job in jobs:
+            due.setdefault(job["keyword"], []).append(job["provider"])
+            if fetch_state:
+                fetch_state.merge(job["provider"], job["keyword"], job["mark"])
+        if jobs:
+            stats = self.queue.stats()
+            logger.info(
+                f"领取 {len(due)} 个关键词的 {len(jobs)} 个抓取任务，队列中还有 {stats['due']} 个到期任务，"
+                f"{stats['workers']} 个实例持有 {stats['leased']} 个租约"
+            )
+        return due
+    
+    def reschedule(self, due: Dict[str, List[str]]) -> None:
+        """完成任务：释放租约，安排下一次抓取并保存高水位"""
+        if not due:
+            return
+        fetch_state = self.get_fetch_state()
+        next_due = time.time()
+        self.queue.complete([
+            {
+                "keyword": keyword,
+                "provider": provider,
+                "nextDue": next_due + self._get_interval(keyword, provider),
+                "mark": fetch_state.get(provider, keyword) if fetch_state else None
+            }
+            for keyword, providers in due.items() for provider in providers
+        ])
+    
+    def release(self, due: Dict[str, List[str]], failed: bool) -> None:
+        """释放未完成任务的租约，保持原到期时间，其他实例可以立即领取；失败时累计未完成次数"""
+        self.queue.release(((keyword, provider) for keyword, providers in due.items() for provider in providers), failed)
+    
+    def seconds_until_next(self) -> float:
+        """距离下一个任务可领取的秒数"""
+        return self.queue.seconds_until_next()
+    
+    def close(self) -> None:
+        """停止心跳并释放未完成的租约"""
+        self.queue.close()
 
 
 class NewsScraper:
     """新闻抓取器主类"""
     
-    def __init__(self, settings_file: str = "settings.json"):
-        """初始化抓取器"""
-        self.settings = NewsSettings(settings_file)
-        self.api = NewsAPI(self.settings)
+    def __init__(self, settings_file: str = "settings.json", use_cache: bool = True, refresh_cache: bool = False,
+                 settings: Optional[NewsSettings] = None):
+        """初始化抓取器，settings为已加载（如已应用命令行参数）的设置，为空时从settings_file加载"""
+        self.use_cache = use_cache
+        self.refresh_cache = refresh_cache
+        self.settings = settings or NewsSettings(settings_file)
+        self.api = NewsAPI(self.settings, use_cache, refresh_cache)
         self.storage = NewsStorage(self.settings)
+        self.image_cache: Optional["ImageCache"] = None
+        self.article_store: Optional["ArticleStore"] = None
+        self.enricher: Optional["ArticleEnricher"] = None
+        self.stop_event = threading.Event()
     
     def run(self) -> None:
         """运行抓取任务"""
@@ -692,32 +2025,478 @@ class NewsScraper:
             return
         
         logger.info(f"将使用以下关键词抓取: {', '.join(keywords)}")
+        self._check_api_key()
         
-        # 检查API密钥
-        api_key = self.settings.get_setting("apiKey")
-        if not api_key and self.settings.get_setting("apiProvider") != "baidu":
-            logger.warning(f"未设置API密钥，{self.settings.get_setting('apiProvider')}搜索可能会失败")
-        
-        # 抓取每个关键词的新闻
-        all_news = []
-        for keyword in keywords:
-            logger.info(f"正在抓取关键词: {keyword}")
-            news_items = self.api.search_news(keyword)
-            logger.info(f"找到 {len(news_items)} 条关于 '{keyword}' 的新闻")
-            all_news.extend(news_items)
-            
-            # 避免API限制，添加延迟
-            time.sleep(1)
-        
-        # 保存所有新闻
-        if all_news:
-            success = self.storage.save_news(all_news)
-            if success:
-                logger.info(f"成功保存了 {len(all_news)} 条新闻")
-            else:
-                logger.error("保存新闻数据失败")
+        start = time.monotonic()
+        if self.settings.get_setting("workQueue"):
+            self._run_queue(keywords)
         else:
+            self._run_cycle([(keyword, None) for keyword in keywords])
+        logger.info(f"本次抓取耗时 {time.monotonic() - start:.2f}s")
+        
+        self.close()
+    
+    def _run_queue(self, keywords: List[str]) -> None:
+        """从共享任务队列领取到期的任务直到没有剩余，其他实例已完成或正在抓取的任务不会重复抓取"""
+        schedule = SharedFetchSchedule(self.settings, lambda: self.api.fetch_state)
+        try:
+            schedule.sync(keywords, self.api.providers)
+            cycles = 0
+            while not self.stop_event.is_set():
+                due = schedule.due()
+                if not due:
+                    break
+                outcome: Dict[str, List[Tuple[str, Optional[List[str]]]]] = {}
+                try:
+                    self._run_cycle(list(due.items()), outcome)
+                finally:
+                    self._finish_jobs(schedule, due, outcome)
+                cycles += 1
+            if not cycles:
+                logger.info("没有到期的抓取任务，其他实例已完成或正在抓取")
+        finally:
+            schedule.close()
+    
+    def _finish_jobs(self, schedule: FetchSchedule, due: Dict[str, List[str]],
+                     outcome: Dict[str, List[Tuple[str, Optional[List[str]]]]]) -> bool:
+        """只完成新闻已保存的任务，收到停止信号后跳过的任务原样放回，其余（抓取或保存失败）按失败放回；
+        返回是否有失败的任务"""
+        done = {keyword for keyword, _ in outcome.get("completed", [])}
+        skipped = {keyword for keyword, _ in outcome.get("skipped", [])}
+        schedule.reschedule({keyword: providers for keyword, providers in due.items() if keyword in done})
+        released = {keyword: providers for keyword, providers in due.items() if keyword in skipped}
+        if released:
+            schedule.release(released, False)
+        failed = {keyword: providers for keyword, providers in due.items() if keyword not in done | skipped}
+        if failed:
+            schedule.release(failed, True)
+        return bool(failed)
+    
+    def _create_schedule(self) -> FetchSchedule:
+        """创建守护进程的抓取计划，启用 workQueue 时与其他实例共享"""
+        if self.settings.get_setting("workQueue"):
+            return SharedFetchSchedule(self.settings, lambda: self.api.fetch_state)
+        return FetchSchedule(self.settings)
+    
+    def run_daemon(self) -> None:
+        """以守护进程方式运行：保持HTTP会话、数据库连接和缓存，按计划抓取，设置文件变化时自动重新加载"""
+        wake_event = threading.Event()
+        reload_event = threading.Event()
+        
+        def handle_stop(signum, frame):
+            logger.info(f"收到信号 {signal.Signals(signum).name}，完成当前抓取后退出")
+            self.stop_event.set()
+            wake_event.set()
+        
+        def handle_reload(signum, frame):
+            reload_event.set()
+            wake_event.set()
+        
+        signal.signal(signal.SIGTERM, handle_stop)
+        signal.signal(signal.SIGINT, handle_stop)
+        # SIGHUP立即重新加载设置文件
+        if hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, handle_reload)
+        
+        metrics_port = int(self.settings.get_setting("metricsPort") or 0)
+        metrics_server = None
+        if metrics_port:
+            try:
+                metrics_server = metrics.serve(metrics_port)
+                logger.info(f"指标接口已启动: http://0.0.0.0:{metrics_port}/metrics")
+            except OSError as e:
+                logger.error(f"启动指标接口失败: {e}")
+        
+        schedule = self._create_schedule()
+        schedule.sync(self.settings.get_keywords(), self.api.providers)
+        settings_mtime = self._get_settings_mtime()
+        self._check_api_key()
+        logger.info(f"守护进程已启动，关键词: {', '.join(self.settings.get_keywords())}，提供商: {', '.join(self.api.providers)}")
+        
+        while not self.stop_event.is_set():
+            mtime = self._get_settings_mtime()
+            if mtime != settings_mtime or reload_event.is_set():
+                reload_event.clear()
+                settings_mtime = mtime
+                self._reload_settings()
+                schedule.sync(self.settings.get_keywords(), self.api.providers)
+            
+            due = schedule.due()
+            if due:
+                start = time.monotonic()
+                outcome: Dict[str, List[Tuple[str, Optional[List[str]]]]] = {}
+                try:
+                    count = self._run_cycle(list(due.items()), outcome)
+                    self.storage.flush()
+                except Exception as e:
+                    logger.error(f"本轮抓取失败: {e}")
+                    count = 0
+                failed = self._finish_jobs(schedule, due, outcome)
+                logger.info(
+                    f"本轮抓取完成: {len(due)} 个关键词, {sum(len(p) for p in due.values())} 个抓取任务"
+                    f"（{len(outcome.get('completed', []))} 个关键词已保存）, {count} 条新闻, 耗时 {time.monotonic() - start:.2f}s, "
+                    f"下一轮在 {schedule.seconds_until_next():.0f}s 后"
+                )
+                if failed:
+                    # 共享队列中失败的任务立即可被领取，稍等片刻再领取，优先交给其他实例重试
+                    wake_event.wait(SETTINGS_POLL_INTERVAL)
+                    wake_event.clear()
+                continue
+            
+            wake_event.wait(min(schedule.seconds_until_next(), SETTINGS_POLL_INTERVAL))
+            wake_event.clear()
+        
+        schedule.close()
+        if metrics_server is not None:
+            metrics_server.shutdown()
+        self.close()
+        logger.info("守护进程已退出")
+    
+    def close(self) -> None:
+        """关闭存储、图片缓存、正文抓取器和API会话，其中一项失败时仍关闭其余各项（如保存提供商状态）"""
+        for name, step in (("存储", self.storage.close), ("图片缓存", self._close_image_cache),
+                           ("正文抓取器", self._close_enricher), ("请求统计", self.api.log_request_stats),
+                           ("API会话", self.api.close)):
+            try:
+                step()
+            except Exception as e:
+                logger.error(f"关闭{name}失败: {e}")
+    
+    def _check_api_key(self) -> None:
+        """检查每个选用的API提供商的密钥（环境变量、apiKeys、apiKey，与NewsAPI的查找顺序相同）"""
+        for provider in self.api.providers:
+            provider_class = self.api.provider_classes.get(provider)
+            # 不需要密钥的提供商（如百度）未声明环境变量名
+            if provider_class is not None and provider_class.env_key and not self.api.api_keys.get(provider):
+                logger.warning(f"未设置API密钥，{provider}搜索可能会失败")
+    
+    def _get_settings_mtime(self) -> Optional[int]:
+        """获取设置文件的修改时间"""
+        try:
+            return os.stat(self.settings.settings_file).st_mtime_ns
+        except OSError:
+            return None
+    
+    def _reload_settings(self) -> None:
+        """重新加载设置文件，涉及API或存储的设置变化时重建对应对象"""
+        changed = self.settings.reload()
+        if not changed:
+            return
+        logger.info(f"设置文件已变化，重新加载: {', '.join(changed)}")
+        if set(changed) - HOT_RELOAD_SETTINGS:
+            self.storage.close()
+            self.api.close()
+            self.api = NewsAPI(self.settings, self.use_cache, self.refresh_cache)
+            self.storage = NewsStorage(self.settings)
+            # 图片缓存和正文抓取器在下一轮按新设置重新创建
+            self._close_image_cache()
+            self._close_enricher()
+    
+    def _run_cycle(self, jobs: List[Tuple[str, Optional[List[str]]]],
+                   outcome: Optional[Dict[str, List[Tuple[str, Optional[List[str]]]]]] = None) -> int:
+        """抓取一轮新闻并分批保存，jobs为(关键词, 提供商列表)，返回保存的新闻条数；
+        outcome不为空时记录新闻已保存的任务（completed）和收到停止信号后跳过的任务（skipped），中途出错时同样保留"""
+        snapshot = metrics.snapshot()
+        
+        # 并发抓取每个关键词的新闻，限速由NewsAPI的令牌桶控制
+        concurrency = max(1, int(self.settings.get_setting("concurrency") or 1))
+        logger.info(f"并发数: {concurrency}")
+        progress = {"fetched": 0, "saved": 0, "enrich": [], "completed": [], "skipped": []}
+        if outcome is not None:
+            outcome.update(completed=progress["completed"], skipped=progress["skipped"])
+        writer = BatchWriter(
+            lambda items, batch_jobs: self._write_batch(items, batch_jobs, progress),
+            int(self.settings.get_setting("saveBatchSize") or 1),
+            float(self.settings.get_setting("saveBatchSeconds") or 0)
+        )
+        try:
+            with metrics.timer("news_stage_seconds", stage="fetch"), ThreadPoolExecutor(max_workers=concurrency) as executor:
+                # 智谱清言的多个关键词合并为批量请求，与其他提供商的请求并行执行
+                self.api.prepare(jobs)
+                # 按关键词顺序交给写入线程，保证存储顺序与串行抓取一致；
+                # 最多提前提交两倍并发数的任务，写入积压时抓取随之暂停
+                pending: Deque[Tuple[Tuple[str, Optional[List[str]]], Future]] = deque()
+                for job in jobs:
+                    pending.append((job, executor.submit(self._fetch_keyword, *job)))
+                    while len(pending) >= concurrency * 2 or (pending and pending[0][1].done()):
+                        self._hand_over(writer, *pending.popleft(), progress)
+                while pending:
+                    self._hand_over(writer, *pending.popleft(), progress)
+        finally:
+            # 中途出错时已抓取的新闻同样写入
+            writer.close()
+            self.storage.finish()
+        
+        saved = progress["saved"]
+        if saved:
+            logger.info(f"成功保存了 {saved} 条新闻（{writer.batches} 批）")
+        elif not progress["fetched"]:
             logger.warning("没有找到任何新闻")
+        
+        # 补全内容过短的新闻正文，只抓取新链接
+        if progress["enrich"] and self.settings.get_setting("enrich"):
+            with metrics.timer("news_stage_seconds", stage="enrich"):
+                self._enrich_articles(progress["enrich"])
+        
+        if self.settings.get_setting("export"):
+            with metrics.timer("news_stage_seconds", stage="export"):
+                self._export_shards()
+        
+        metrics.inc("news_runs_total")
+        metrics.set("news_last_run_timestamp_seconds", time.time())
+        metrics.set("news_last_run_items", saved)
+        self._write_metrics(snapshot)
+        return saved
+    
+    def _hand_over(self, writer: BatchWriter, job: Tuple[str, Optional[List[str]]], future: Future,
+                   progress: Dict[str, Any]) -> None:
+        """等待任务抓取完成，将结果交给写入线程"""
+        news_items = future.result()
+        if news_items is None:
+            # 收到停止信号后跳过的任务不写入，也不算完成
+            progress["skipped"].append(job)
+            return
+        progress["fetched"] += len(news_items)
+        writer.put(news_items, job)
+    
+    def _write_batch(self, news_items: List[NewsItem], jobs: List[Tuple[str, Optional[List[str]]]],
+                     progress: Dict[str, Any]) -> None:
+        """写入一批新闻：下载图片、保存，保存成功后提交这些任务的高水位"""
+        fetch_state = self.api.fetch_state
+        job_keys = [(provider, keyword) for keyword, providers in jobs for provider in providers or self.api.providers]
+        if news_items:
+            # 下载图片并改写为本地缩略图路径
+            if self.settings.get_setting("images"):
+                with metrics.timer("news_stage_seconds", stage="images"):
+                    self._cache_images(news_items)
+            with metrics.timer("news_stage_seconds", stage="save"):
+                success = self.storage.save_news(news_items, export=False)
+            if not success:
+                logger.error("保存新闻数据失败")
+                if fetch_state:
+                    fetch_state.discard(job_keys)
+                return
+            progress["saved"] += len(news_items)
+            # 正文补全在本轮结束后进行，只保留需要补全的新闻
+            if self.settings.get_setting("enrich"):
+                min_content = int(self.settings.get_setting("enrichMinContent") or 0)
+                progress["enrich"].extend(
+                    {"link": item.get("link"), "content": item.get("content")}
+                    for item in news_items if len(item.get("content") or "") < min_content
+                )
+        
+        # 新闻保存成功后再推进高水位，避免保存失败或中途退出时丢失数据
+        if fetch_state and fetch_state.commit(job_keys):
+            fetch_state.save()
+        progress["completed"].extend(jobs)
+    
+    def _write_metrics(self, snapshot: Dict[str, Any]) -> None:
+        """输出本轮抓取的JSON指标摘要，并写入Prometheus textfile"""
+        try:
+            summary = metrics.summary(since=snapshot)
+            logger.info(f"本轮指标: {json.dumps(summary, ensure_ascii=False)}")
+            summary_path = self.settings.get_setting("metricsSummaryPath")
+            if summary_path:
+                # 每轮追加一行，便于对比多次运行
+                with open(summary_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({"timestamp": datetime.now().isoformat(), **summary}, ensure_ascii=False) + "\n")
+            textfile = self.settings.get_setting("metricsTextfile")
+            if textfile:
+                metrics.write_textfile(textfile)
+        except Exception as e:
+            logger.error(f"写入运行指标失败: {e}")
+    
+    def _cache_images(self, news_items: List[NewsItem]) -> None:
+        """下载新闻图片到本地缓存，imageUrl改写为缩略图路径，失效的图片清空链接"""
+        try:
+            if self.image_cache is None:
+                from news_images import ImageCache
+                self.image_cache = ImageCache(
+                    self.settings.get_setting("imagePath"),
+                    self.settings.get_setting("imageIndexPath"),
+                    self.settings.get_setting("imageUrlPrefix"),
+                    self.settings.get_setting("imageSizes") or [960],
+                    int(self.settings.get_setting("imageCacheMaxBytes")),
+                    int(self.settings.get_setting("imageConcurrency") or 1),
+                    timeout=(self.settings.get_setting("connectTimeout") or 5, 10)
+                )
+            stats = self.image_cache.process(news_items)
+            for result, count in stats.items():
+                metrics.inc("news_images_total", count, result=result)
+            logger.info(
+                f"图片缓存: 命中 {stats['cached']} 张, 新下载 {stats['fetched']} 张, "
+                f"失效 {stats['dead']} 张, 下载失败 {stats['error']} 张"
+            )
+            self.image_cache.evict()
+        except Exception as e:
+            logger.error(f"缓存新闻图片失败: {e}")
+    
+    def _close_image_cache(self) -> None:
+        """关闭图片缓存"""
+        if self.image_cache is not None:
+            image_cache, self.image_cache = self.image_cache, None
+            image_cache.close()
+    
+    def _enrich_articles(self, news_items: List[NewsItem]) -> None:
+        """抓取内容过短的新闻原文并保存正文"""
+        try:
+            if self.article_store is None:
+                from news_enrich import ArticleStore, ArticleEnricher
+                self.article_store = ArticleStore(self.settings.get_setting("enrichPath"))
+                self.enricher = ArticleEnricher(
+                    self.settings.get_setting("enrichUserAgent"),
+                    int(self.settings.get_setting("enrichConcurrency") or 1),
+                    int(self.settings.get_setting("enrichHostConcurrency") or 1),
+                    float(self.settings.get_setting("enrichDelay") or 0),
+                    timeout=(self.settings.get_setting("connectTimeout") or 5, 15)
+                )
+            min_content = int(self.settings.get_setting("enrichMinContent") or 0)
+            links = [
+                item["link"] for item in news_items
+                if (item.get("link") or "").startswith(("http://", "https://"))
+                and len(item.get("content") or "") < min_content
+            ]
+            jobs = self.article_store.pending(links, float(self.settings.get_setting("enrichRevalidate") or 0))
+            jobs = jobs[:int(self.settings.get_setting("enrichMaxPerRun") or len(jobs))]
+            if not jobs:
+                return
+            
+            counts: Dict[str, int] = {}
+            for result in self.enricher.fetch_all(jobs):
+                status = result["status"]
+                if status == 304:
+                    outcome = "not_modified"
+                elif status == 200:
+                    outcome = "fetched" if result.get("text") else "empty"
+                elif status == -1:
+                    outcome = "disallowed"
+                elif status == 0 or status == 429 or status >= 500:
+                    # 网络错误和服务端错误不记录，下一轮重试
+                    outcome = "failed"
+                else:
+                    outcome = "gone"
+                counts[outcome] = counts.get(outcome, 0) + 1
+                metrics.inc("news_enrich_total", result=outcome)
+                if outcome != "failed":
+                    self.article_store.save(result)
+            self.article_store.commit()
+            logger.info(f"正文补全: {len(jobs)} 个链接, {', '.join(f'{name} {count}' for name, count in sorted(counts.items()))}")
+        except Exception as e:
+            logger.error(f"补全新闻正文失败: {e}")
+    
+    def _close_enricher(self) -> None:
+        """关闭正文数据库和抓取器"""
+        article_store, self.article_store = self.article_store, None
+        enricher, self.enricher = self.enricher, None
+        try:
+            if article_store is not None:
+                article_store.close()
+        finally:
+            if enricher is not None:
+                enricher.close()
+    
+    def _export_shards(self) -> None:
+        """导出前端使用的静态分片"""
+        try:
+            from news_export import ShardExporter
+            exporter = ShardExporter(
+                self.settings.get_setting("exportPath"),
+                int(self.settings.get_setting("exportPageSize") or 30)
+            )
+            exporter.export(self.storage.iter_news)
+        except Exception as e:
+            logger.error(f"导出静态分片失败: {e}")
+    
+    def _fetch_keyword(self, keyword: str, providers: Optional[List[str]] = None) -> Optional[List[NewsItem]]:
+        """抓取单个关键词的新闻，收到停止信号后跳过时返回None"""
+        # 收到停止信号后跳过尚未开始的关键词，已抓取的结果仍会保存
+        if self.stop_event.is_set():
+            return None
+        logger.info(f"正在抓取关键词: {keyword}")
+        news_items = self.api.search_news(keyword, providers)
+        logger.info(f"找到 {len(news_items)} 条关于 '{keyword}' 的新闻")
+        return news_items
+
+
+def search(args: argparse.Namespace) -> None:
+    """search子命令：检索SQLite数据库中的新闻"""
+    settings = NewsSettings(args.settings)
+    storage = NewsStorage(settings)
+    try:
+        result = storage.query_news(args.text, args.tag, args.since, args.until, args.page, args.page_size)
+    finally:
+        storage.close()
+    
+    if args.article:
+        # 正文保存在单独的数据库中，只在需要时读取
+        from news_enrich import ArticleStore
+        article_store = ArticleStore(settings.get_setting("enrichPath"))
+        try:
+            texts = article_store.get_texts([item["link"] for item in result["items"]])
+        finally:
+            article_store.close()
+        for item in result["items"]:
+            item["article"] = texts.get(item["link"])
+    
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+        return
+    
+    print(f"共 {result['total']} 条，第 {result['page']} 页")
+    for item in result["items"]:
+        print(f"[{item['id']}] {item['publishedAt']}  {item['title']}（{item['source']}）  {', '.join(item['tags'])}")
+        print(f"    {item['link']}")
+        if item.get("article"):
+            print("    " + item["article"].replace("\n", "\n    "))
+
+
+def retention(args: argparse.Namespace) -> None:
+    """retention子命令：按保留策略归档并删除过期新闻，然后压缩数据库"""
+    settings = NewsSettings(args.settings)
+    days = int(settings.get_setting("retentionDays") or 0)
+    tag_days = settings.get_setting("retentionTagDays") or {}
+    max_rows = int(settings.get_setting("retentionMaxRows") or 0)
+    if not days and not max_rows and not any(tag_days.values()):
+        logger.info("未配置保留策略（retentionDays、retentionTagDays、retentionMaxRows），不删除任何新闻")
+        return
+    
+    default_cutoff, tag_cutoffs = retention_cutoffs(days, tag_days)
+    archive = None
+    if settings.get_setting("archive") and not args.dry_run:
+        archive = NewsArchive(settings.get_setting("archivePath"), settings.get_setting("archiveFormat") or "jsonl")
+    
+    storage = NewsStorage(settings)
+    try:
+        links = storage.prune_news(default_cutoff, tag_cutoffs, max_rows, archive, args.dry_run)
+        if args.dry_run:
+            print(f"将删除 {len(links)} 条过期新闻")
+            return
+        if links:
+            logger.info(f"已删除 {len(links)} 条过期新闻" + (f"，归档到 {archive.archive_dir}: {archive.counts}" if archive else ""))
+        storage.compact_database()
+        
+        # 同时删除过期新闻的正文
+        enrich_path = settings.get_setting("enrichPath")
+        if links and os.path.exists(enrich_path):
+            from news_enrich import ArticleStore
+            article_store = ArticleStore(enrich_path)
+            try:
+                article_store.delete(links)
+            finally:
+                article_store.close()
+        
+        if links and settings.get_setting("export"):
+            from news_export import ShardExporter
+            ShardExporter(settings.get_setting("exportPath"), int(settings.get_setting("exportPageSize") or 30)).export(storage.iter_news)
+    finally:
+        storage.close()
+
+
+def backup(args: argparse.Namespace) -> None:
+    """backup子命令：在线备份SQLite数据库"""
+    settings = NewsSettings(args.settings)
+    keep = args.keep if args.keep is not None else int(settings.get_setting("backupKeep") or 0)
+    backup_database(settings.get_setting("dbPath"), args.dir or settings.get_setting("backupPath"), keep, args.force)
 
 
 def main():
@@ -725,30 +2504,72 @@ def main():
     parser = argparse.ArgumentParser(description="新闻数据抓取脚本")
     parser.add_argument("-s", "--settings", default="settings.json", help="设置文件路径")
     parser.add_argument("-k", "--keywords", help="覆盖设置文件中的关键词（逗号分隔）")
-    parser.add_argument("-t", "--storage-type", choices=["json", "sqlite"], help="存储类型（json或sqlite）")
-    parser.add_argument("-a", "--api", choices=["brave", "bing", "baidu", "juhe", "newsapi", "zhipu"], help="API提供商")
+    parser.add_argument("-t", "--storage-type", choices=["json", "jsonl", "sqlite"], help="存储类型（json、jsonl或sqlite）")
+    parser.add_argument("-a", "--api", help=f"API提供商（内置: {', '.join(BUILTIN_PROVIDERS)}，或 providerPlugins 中注册的名称）")
     parser.add_argument("--api-key", help="API密钥")
+    parser.add_argument("-c", "--concurrency", type=int, help="并发抓取的线程数")
+    parser.add_argument("--no-cache", action="store_true", help="不使用HTTP响应缓存")
+    parser.add_argument("--refresh", action="store_true", help="忽略已缓存的响应，强制重新请求并更新缓存")
+    parser.add_argument("--daemon", action="store_true", help="以守护进程方式运行，按 scheduleInterval 定时抓取")
+    
+    subparsers = parser.add_subparsers(dest="command", help="子命令（不指定时执行抓取）")
+    search_parser = subparsers.add_parser("search", help="检索SQLite数据库中的新闻")
+    search_parser.add_argument("text", nargs="?", help="全文检索关键词")
+    search_parser.add_argument("--tag", help="按标签筛选")
+    search_parser.add_argument("--since", help="发布时间不早于（ISO格式，如 2024-01-01）")
+    search_parser.add_argument("--until", help="发布时间早于（ISO格式）")
+    search_parser.add_argument("--page", type=int, default=1, help="页码（从1开始）")
+    search_parser.add_argument("--page-size", type=int, default=20, help="每页条数")
+    search_parser.add_argument("--json", action="store_true", help="以JSON格式输出")
+    search_parser.add_argument("--article", action="store_true", help="同时输出补全的新闻正文")
+    
+    retention_parser = subparsers.add_parser("retention", help="按保留策略归档并删除过期新闻，然后压缩数据库")
+    retention_parser.add_argument("--dry-run", action="store_true", help="只统计过期新闻数量，不删除")
+    
+    backup_parser = subparsers.add_parser("backup", help="在线备份SQLite数据库（数据库未变化时跳过）")
+    backup_parser.add_argument("--dir", help="备份目录，覆盖设置中的 backupPath")
+    backup_parser.add_argument("--keep", type=int, help="保留的备份数量，覆盖设置中的 backupKeep")
+    backup_parser.add_argument("--force", action="store_true", help="数据库未变化时也备份")
     
     args = parser.parse_args()
     
-    # 创建抓取器
-    scraper = NewsScraper(args.settings)
+    if args.command == "search":
+        search(args)
+        return
+    
+    if args.command == "retention":
+        retention(args)
+        return
+    
+    if args.command == "backup":
+        backup(args)
+        return
     
-    # 应用命令行参数覆盖设置
+    # 应用命令行参数覆盖设置；需在创建抓取器之前，API会话的连接池、并发上限和存储都按覆盖后的设置创建
+    settings = NewsSettings(args.settings)
     if args.keywords:
-        scraper.settings.update_setting("keywords", args.keywords)
+        settings.update_setting("keywords", args.keywords)
     
     if args.storage_type:
-        scraper.settings.update_setting("storageType", args.storage_type)
+        settings.update_setting("storageType", args.storage_type)
     
     if args.api:
-        scraper.settings.update_setting("apiProvider", args.api)
+        settings.update_setting("apiProvider", args.api)
     
     if args.api_key:
-        scraper.settings.update_setting("apiKey", args.api_key)
+        settings.update_setting("apiKey", args.api_key)
+    
+    if args.concurrency:
+        settings.update_setting("concurrency", args.concurrency)
+    
+    # 创建抓取器
+    scraper = NewsScraper(args.settings, use_cache=not args.no_cache, refresh_cache=args.refresh, settings=settings)
     
     # 运行抓取器
-    scraper.run()
+    if args.daemon:
+        scraper.run_daemon()
+    else:
+        scraper.run()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+大模型回复的增量JSON解析
+
+智谱清言等大模型按要求返回新闻JSON数组，但回复前后常带有说明文字或代码块标记，
+流式输出时内容分多次到达，也可能在中途被截断。JsonArrayStream 逐块接收文本，
+每个字符只扫描一次，数组中的对象一旦完整即返回，截断前已完成的对象仍然可用。
+"""
+
+import json
+from typing import List, Dict, Any
+
+
+class JsonArrayStream:
+    """增量解析文本中第一个对象数组的元素"""
+
+    def __init__(self):
+        """初始化解析器"""
+        # 0: 数组外；1: 数组内、对象外；>=2: 对象内
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        # 已遇到 '['，等待确认后面是否为对象
+        self.pending_array = False
+        self.done = False
+        self.buffer: List[str] = []
+        self.errors = 0
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """输入一段文本，返回其中新完成的对象"""
+        items: List[Dict[str, Any]] = []
+        for ch in text:
+            if self.done:
+                break
+
+            if self.depth == 0:
+                # 只有 '[' 后紧跟 '{' 才视为新闻数组，跳过说明文字中的方括号
+                if self.pending_array and not ch.isspace():
+                    self.pending_array = False
+                    if ch == "{":
+                        self.depth = 2
+                        self.buffer = [ch]
+                        continue
+                if ch == "[":
+                    self.pending_array = True
+                continue
+
+            if self.depth == 1:
+                if ch == "{":
+                    self.depth = 2
+                    self.buffer = [ch]
+                elif ch == "]":
+                    self.done = True
+                continue
+
+            self.buffer.append(ch)
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == "\"":
+                    self.in_string = False
+            elif ch == "\"":
+                self.in_string = True
+            elif ch in "{[":
+                self.depth += 1
+            elif ch in "}]":
+                self.depth -= 1
+                if self.depth == 1:
+                    self._emit(items)
+        return items
+
+    def _emit(self, items: List[Dict[str, Any]]) -> None:
+        """解析缓冲区中的完整对象"""
+        try:
+            # 大模型输出的字符串中可能含有未转义的换行，使用非严格模式
+            item = json.loads("".join(self.buffer), strict=False)
+            if isinstance(item, dict):
+                items.append(item)
+        except ValueError:
+            self.errors += 1
+        self.buffer = []
+
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+NewsStorage 保存测试
+
+运行方法（在 scripts 目录下）：
+    python -m pytest tests
+"""
+
+import os
+import sys
+import json
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from news_scraper import NewsSettings, NewsStorage  # noqa: E402
+
+
+def make_storage(tmp_path, storage_type: str) -> NewsStorage:
+    """创建使用临时目录的存储"""
+    settings_file = tmp_path / "settings.json"
+    settings_file.write_text(json.dumps({
+        "storageType": storage_type,
+        "dbPath": str(tmp_path / "news.db"),
+        "jsonPath": str(tmp_path / "news.json"),
+        "jsonlPath": str(tmp_path / "news.jsonl")
+    }), encoding="utf-8")
+    return NewsStorage(NewsSettings(str(settings_file)))
+
+
+def make_item(link: str, title: str, tags) -> dict:
+    """生成一条新闻"""
+    return {"title": title, "source": "测试", "link": link, "publishedAt": "2024-01-01T00:00:00",
+            "tags": tags, "imageUrl": "", "content": "内容"}
+
+
+@pytest.mark.parametrize("storage_type", ["json", "jsonl", "sqlite"])
+def test_duplicate_link_in_one_batch_is_saved_once(tmp_path, storage_type):
+    """同一批中重复出现的链接只保存一条，后出现的字段覆盖、标签合并；再次保存同一批结果不变"""
+    storage = make_storage(tmp_path, storage_type)
+    batch = [
+        make_item("https://example.com/a", "第一次", ["AI"]),
+        make_item("https://example.com/b", "另一条", ["AI"]),
+        make_item("https://example.com/a", "第二次", ["芯片"])
+    ]
+    try:
+        assert storage.save_news([dict(item) for item in batch])
+        first = sorted(storage.iter_news(), key=lambda item: item["link"])
+        assert storage.save_news([dict(item) for item in batch])
+        second = sorted(storage.iter_news(), key=lambda item: item["link"])
+    finally:
+        storage.close()
+
+    assert [item["link"] for item in first] == ["https://example.com/a", "https://example.com/b"]
+    assert first[0]["title"] == "第二次"
+    assert first[0]["tags"] == ["AI", "芯片"]
+    assert second == first
@@ -12,6 +12,9 @@ const { Title, Paragraph, Text } = Typography;
 const HomePage: React.FC = () => {
   const [news, setNews] = useState<NewsItem[]>([]);
   const [loading, setLoading] = useState(true);
+  const [page, setPage] = useState(1);
+  const [hasMore, setHasMore] = useState(false);
+  const [loadingMore, setLoadingMore] = useState(false);
   const navigate = useNavigate();
 
   useEffect(() => {
@@ -25,8 +28,9 @@ const HomePage: React.FC = () => {
         console.log('当前数据源状态:', status);
         
         // 加载新闻数据
-        const newsData = await newsService.loadNews();
+        const newsData = await newsService.loadNews(1);
         setNews(newsData);
+        setHasMore(await newsService.hasMoreNews(newsData.length));
         
         if (newsData.length > 0) {
           message.success(`成功从 ${status.dataSource} 加载了 ${newsData.length} 条新闻`);
@@ -44,6 +48,24 @@ const HomePage: React.FC = () => {
     fetchNews();
   }, []);
 
+  // 加载下一页（静态分片数据源）
+  const loadMore = async () => {
+    try {
+      setLoadingMore(true);
+      const nextPage = page + 1;
+      const newsData = await newsService.loadNews(nextPage);
+      const merged = [...news, ...newsData];
+      setNews(merged);
+      setPage(nextPage);
+      setHasMore(newsData.length > 0 && await newsService.hasMoreNews(merged.length));
+    } catch (error) {
+      console.error('加载更多新闻失败:', error);
+      message.error('加载更多新闻失败，请稍后重试');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   return (
       <Spin spinning={loading} size="large">
         <List
@@ -57,6 +79,13 @@ const HomePage: React.FC = () => {
             xxl: 3 
           }}
           dataSource={news}
+          loadMore={hasMore && (
+            <div style={{ textAlign: 'center', marginTop: '32px' }}>
+              <Button onClick={loadMore} loading={loadingMore}>
+                加载更多
+              </Button>
+            </div>
+          )}
           renderItem={(item) => (
             <List.Item>
               <Card
@@ -23,8 +23,7 @@ const NewsDetail: React.FC = () => {
 
       try {
         setLoading(true);
-        const newsData = await newsService.loadNews();
-        const newsItem = newsData.find(item => item.id === parseInt(id));
+        const newsItem = await newsService.getNewsById(parseInt(id));
         
         if (newsItem) {
           setNews(newsItem);
@@ -1,11 +1,12 @@
 import type { NewsItem } from '../types';
 import { loadFromJson, getNewsById as getNewsByIdFromJson, getNewsByTag as getNewsByTagFromJson } from './jsonDataService';
 import { loadFromSqlite, getNewsByIdFromSqlite, insertNewsToSqlite } from './sqliteDataService';
+import { loadFromShards, getNewsByIdFromShards, getNewsByTagFromShards, getShardTotal } from './shardDataService';
 
 /**
  * 数据源类型
  */
-type DataSource = 'json' | 'sqlite';
+type DataSource = 'json' | 'sqlite' | 'shards';
 
 /**
  * 新闻服务类 - 根据环境配置动态选择数据源
@@ -37,24 +38,32 @@ class NewsService {
   }
 
   /**
-   * 加载所有新闻数据
+   * 加载新闻数据
+   * JSON和SQLite数据源第一页即返回全部新闻，之后的页为空；静态分片按页加载
+   * @param page 页码（从1开始）
    * @returns Promise<NewsItem[]> 新闻数据数组
    */
-  async loadNews(): Promise<NewsItem[]> {
+  async loadNews(page = 1): Promise<NewsItem[]> {
     try {
-      console.log(`正在从 ${this.dataSource} 加载新闻数据...`);
+      console.log(`正在从 ${this.dataSource} 加载第 ${page} 页新闻数据...`);
       
       switch (this.dataSource) {
         case 'json':
-          return await loadFromJson();
+          return page === 1 ? await loadFromJson() : [];
         case 'sqlite':
-          return await loadFromSqlite();
+          return page === 1 ? await loadFromSqlite() : [];
+        case 'shards':
+          return await loadFromShards(page);
         default:
           console.warn(`未知的数据源类型: ${this.dataSource}，回退到JSON`);
-          return await loadFromJson();
+          return page === 1 ? await loadFromJson() : [];
       }
     } catch (error) {
       console.error('加载新闻数据失败:', error);
+      if (page > 1) {
+        // 后续页加载失败时不回退，避免与已加载的新闻重复
+        throw error;
+      }
       // 如果当前数据源失败，尝试回退到JSON
       if (this.dataSource !== 'json') {
         console.log('尝试回退到JSON数据源...');
@@ -68,6 +77,23 @@ class NewsService {
     }
   }
 
+  /**
+   * 是否还有未加载的新闻（只有静态分片按页加载）
+   * @param loaded 已加载的新闻条数
+   * @returns Promise<boolean> 是否还有下一页
+   */
+  async hasMoreNews(loaded: number): Promise<boolean> {
+    if (this.dataSource !== 'shards') {
+      return false;
+    }
+    try {
+      return loaded < await getShardTotal();
+    } catch {
+      // 分片清单不可用（已回退到JSON数据源）
+      return false;
+    }
+  }
+
   /**
    * 根据ID获取单条新闻
    * @param id 新闻ID
@@ -80,6 +106,8 @@ class NewsService {
           return await getNewsByIdFromJson(id);
         case 'sqlite':
           return await getNewsByIdFromSqlite(id);
+        case 'shards':
+          return await getNewsByIdFromShards(id);
         default:
           return await getNewsByIdFromJson(id);
       }
@@ -104,6 +132,8 @@ class NewsService {
           const allNews = await loadFromSqlite();
           return allNews.filter(news => news.tags.includes(tag));
         }
+        case 'shards':
+          return await getNewsByTagFromShards(tag);
         default:
           return await getNewsByTagFromJson(tag);
       }
@@ -0,0 +1,145 @@
+import type { NewsItem } from '../types';
+
+/**
+ * 静态分片清单（由 scripts/news_export.py 生成）
+ */
+interface ShardManifest {
+  version: number;
+  generatedAt: string;
+  pageSize: number;
+  total: number;
+  latest: string[];
+  tags: Record<string, { total: number; pages: string[] }>;
+  items: string;
+}
+
+// 分片目录，与 settings.json 中的 exportPath 对应
+const SHARD_BASE = import.meta.env.VITE_SHARD_BASE || '/shards';
+
+let manifestPromise: Promise<ShardManifest> | null = null;
+
+/**
+ * 加载分片清单（每次页面加载只请求一次，清单本身不缓存）
+ * @returns Promise<ShardManifest> 分片清单
+ */
+const loadManifest = (): Promise<ShardManifest> => {
+  if (!manifestPromise) {
+    manifestPromise = fetch(`${SHARD_BASE}/manifest.json`, { cache: 'no-cache' })
+      .then(response => {
+        if (!response.ok) {
+          throw new Error(`无法读取分片清单: ${response.statusText}`);
+        }
+        return response.json() as Promise<ShardManifest>;
+      })
+      .catch(error => {
+        manifestPromise = null;
+        throw error;
+      });
+  }
+  return manifestPromise;
+};
+
+/**
+ * 加载一页分片（文件名包含内容哈希，可长期缓存）
+ * @param path 分片相对路径
+ * @returns Promise<NewsItem[]> 新闻数据数组
+ */
+const loadPage = async (path: string | undefined): Promise<NewsItem[]> => {
+  if (!path) {
+    return [];
+  }
+  const response = await fetch(`${SHARD_BASE}/${path}`);
+  if (!response.ok) {
+    throw new Error(`无法读取分片: ${response.statusText}`);
+  }
+  return response.json();
+};
+
+/**
+ * 从分页序列中加载第 page 页（每页 pageSize 条，从最新的新闻开始计）
+ *
+ * 分片从最旧的新闻开始对齐，最新的分片只有 total % pageSize 条（整除时为满页），
+ * 因此一页可能跨越相邻的两个分片
+ * @param pages 分片路径（最新在前）
+ * @param total 新闻总数
+ * @param pageSize 每页条数
+ * @param page 页码（从1开始）
+ * @returns Promise<NewsItem[]> 新闻数据数组
+ */
+const loadAlignedPage = async (pages: string[], total: number, pageSize: number, page: number): Promise<NewsItem[]> => {
+  const start = (page - 1) * pageSize;
+  const end = Math.min(start + pageSize, total);
+  if (!pages.length || start >= end) {
+    return [];
+  }
+  const newestSize = total - (pages.length - 1) * pageSize;
+  const shardIndex = (offset: number) => (offset < newestSize ? 0 : 1 + Math.floor((offset - newestSize) / pageSize));
+  const first = shardIndex(start);
+  const last = shardIndex(end - 1);
+  const chunks = await Promise.all(pages.slice(first, last + 1).map(loadPage));
+  const firstOffset = first === 0 ? 0 : newestSize + (first - 1) * pageSize;
+  return chunks.flat().slice(start - firstOffset, end - firstOffset);
+};
+
+/**
+ * 按发布时间倒序加载一页新闻，加载失败时抛出异常，由 NewsService 回退到其他数据源
+ * @param page 页码（从1开始）
+ * @returns Promise<NewsItem[]> 新闻数据数组
+ */
+export const loadFromShards = async (page = 1): Promise<NewsItem[]> => {
+  try {
+    const manifest = await loadManifest();
+    return await loadAlignedPage(manifest.latest, manifest.total, manifest.pageSize, page);
+  } catch (error) {
+    console.error('从静态分片加载数据失败:', error);
+    throw error;
+  }
+};
+
+/**
+ * 获取最新列表的新闻总数
+ * @returns Promise<number> 新闻总数
+ */
+export const getShardTotal = async (): Promise<number> => {
+  const manifest = await loadManifest();
+  return manifest.total;
+};
+
+/**
+ * 获取单条新闻详情
+ * @param id 新闻ID
+ * @returns Promise<NewsItem | null> 新闻数据或null
+ */
+export const getNewsByIdFromShards = async (id: number): Promise<NewsItem | null> => {
+  try {
+    const manifest = await loadManifest();
+    const response = await fetch(`${SHARD_BASE}/${manifest.items.replace('{id}', String(id))}`);
+    if (!response.ok) {
+      return null;
+    }
+    return await response.json();
+  } catch (error) {
+    console.error('从静态分片获取新闻详情失败:', error);
+    return null;
+  }
+};
+
+/**
+ * 按标签加载一页新闻
+ * @param tag 标签名称
+ * @param page 页码（从1开始）
+ * @returns Promise<NewsItem[]> 筛选后的新闻数组
+ */
+export const getNewsByTagFromShards = async (tag: string, page = 1): Promise<NewsItem[]> => {
+  try {
+    const manifest = await loadManifest();
+    const tagPages = manifest.tags[tag];
+    if (!tagPages) {
+      return [];
+    }
+    return await loadAlignedPage(tagPages.pages, tagPages.total, manifest.pageSize, page);
+  } catch (error) {
+    console.error('从静态分片按标签筛选新闻失败:', error);
+    return [];
+  }
+};